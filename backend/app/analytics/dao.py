@@ -0,0 +1,370 @@
+from collections.abc import Collection
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    ARRAY,
+    BigInteger,
+    BindParameter,
+    Date,
+    DateTime,
+    Float,
+    Row,
+    and_,
+    any_,
+    bindparam,
+    cast,
+    delete,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dao.base import BaseDAO
+from app.database import execute_read, session_scope
+from app.enums import AnalyticsPeriod, OrderStatus, VehicleType
+from app.models import (
+    AnalyticsDirtyDay,
+    Order,
+    OrderDailyStats,
+    OrderStatusTotals,
+    TripSheet,
+    Vehicle,
+    VehicleDailyUsage,
+)
+from app.trip_sheets.dao import TripSheetDAO
+
+DAY = timedelta(days=1)
+SECONDS_PER_DAY = 86400
+
+
+def _days_param(days: Collection[date]) -> BindParameter:
+    return bindparam("days", list(days), type_=ARRAY(Date), unique=True)
+
+
+def _days_table(days: Collection[date]):
+    """Дни из параметра-массива как таблица ``d(day)`` для соединения."""
+    return func.unnest(_days_param(days)).table_valued("day").render_derived("d")
+
+
+class AnalyticsDirtyDayDAO(BaseDAO):
+    model = AnalyticsDirtyDay
+
+    @classmethod
+    async def has_pending(cls, session: AsyncSession | None = None) -> bool:
+        async with session_scope(session) as db_session:
+            result = await db_session.execute(select(select(cls.model.id).exists()))
+            return result.scalar_one()
+
+    @classmethod
+    async def pop_all(cls, session: AsyncSession | None = None) -> dict[str, set[date]]:
+        """
+        Забрать из журнала все видимые транзакции записи.
+
+        Записи транзакций, ещё не зафиксированных к началу запроса, остаются
+        в журнале до следующего пересчёта.
+
+        :param session: Сессия текущего запроса.
+        :return: Устаревшие дни по источникам (таблицам).
+        """
+        async with session_scope(session) as db_session:
+            result = await db_session.execute(
+                delete(cls.model).returning(cls.model.source, cls.model.day)
+            )
+            days: dict[str, set[date]] = {}
+            for source, day in result:
+                days.setdefault(source, set()).add(day)
+            return days
+
+
+class OrderDailyStatsDAO(BaseDAO):
+    model = OrderDailyStats
+
+    @classmethod
+    async def rebuild(cls, session: AsyncSession | None = None) -> int:
+        """
+        Пересобрать сводку заказов целиком по таблице orders.
+
+        В обычной работе сводку поддерживает триггер на orders; пересборка
+        нужна, если они разошлись (например, после TRUNCATE orders). Сводка
+        собирается в полосу 0.
+
+        :param session: Сессия текущего запроса.
+        :return: Количество строк сводки.
+        """
+        day = cast(Order.order_date, Date)
+        query = select(day, Order.status, func.count(), func.sum(Order.cost)).group_by(
+            day, Order.status
+        )
+        async with session_scope(session) as db_session:
+            await db_session.execute(delete(cls.model))
+            result = await db_session.execute(
+                insert(cls.model).from_select(
+                    ["day", "status", "orders_count", "revenue"], query
+                )
+            )
+            return result.rowcount
+
+    @classmethod
+    async def revenue(
+        cls,
+        period: AnalyticsPeriod,
+        date_from: date,
+        date_to: date,
+        status: OrderStatus | None = None,
+        session: AsyncSession | None = None,
+    ) -> list[Row[Any]]:
+        """
+        Выручка по дням, неделям или месяцам с нарастающим итогом.
+
+        Читаются только дневные строки сводки, поэтому стоимость запроса
+        зависит от длины периода, а не от числа заказов. Полосы сводки
+        складываются; интервал, в котором заказы взаимно погасились по
+        полосам, не выводится, как и без полос.
+
+        :param period: Размер интервала группировки.
+        :param date_from: Первый день выборки.
+        :param date_to: Последний день выборки.
+        :param status: Учитывать только заказы в этом статусе.
+        :param session: Сессия текущего запроса.
+        :return: Строки RevenueBucket по возрастанию period_start.
+        """
+        # Единица date_trunc подставляется литералом: выражение группировки
+        # должно совпадать с выражением в SELECT, а разные параметры $1 и $2
+        # PostgreSQL одинаковыми не считает.
+        unit = bindparam("unit", period.value, literal_execute=True)
+        bucket = cast(func.date_trunc(unit, cast(cls.model.day, DateTime)), Date)
+        revenue = func.sum(cls.model.revenue)
+        query = (
+            select(
+                bucket.label("period_start"),
+                cast(func.sum(cls.model.orders_count), BigInteger).label(
+                    "orders_count"
+                ),
+                cast(revenue, BigInteger).label("revenue"),
+                cast(func.sum(revenue).over(order_by=bucket), BigInteger).label(
+                    "cumulative_revenue"
+                ),
+            )
+            .where(cls.model.day.between(date_from, date_to))
+            .group_by(bucket)
+            .having(func.sum(cls.model.orders_count) != 0)
+            .order_by(bucket)
+        )
+        if status is not None:
+            query = query.where(cls.model.status == status)
+
+        async with session_scope(session) as db_session:
+            result = await execute_read(db_session, query)
+            return list(result.all())
+
+    @classmethod
+    async def status_summary(
+        cls, date_from: date, date_to: date, session: AsyncSession | None = None
+    ) -> list[Row[Any]]:
+        """
+        Количество и стоимость заказов по статусам с долей от общего числа.
+
+        :param date_from: Первый день выборки.
+        :param date_to: Последний день выборки.
+        :param session: Сессия текущего запроса.
+        :return: Строки OrderStatusSummary.
+        """
+        orders_count = func.sum(cls.model.orders_count)
+        query = (
+            select(
+                cls.model.status,
+                cast(orders_count, BigInteger).label("orders_count"),
+                cast(func.sum(cls.model.revenue), BigInteger).label("revenue"),
+                cast(orders_count / func.sum(orders_count).over(), Float).label(
+                    "share"
+                ),
+            )
+            .where(cls.model.day.between(date_from, date_to))
+            .group_by(cls.model.status)
+            .having(orders_count != 0)
+            .order_by(cls.model.status)
+        )
+        async with session_scope(session) as db_session:
+            result = await execute_read(db_session, query)
+            return list(result.all())
+
+
+class OrderStatusTotalsDAO(BaseDAO):
+    model = OrderStatusTotals
+
+    @classmethod
+    async def rebuild(cls, session: AsyncSession | None = None) -> None:
+        """
+        Пересобрать итоги по статусам из сводки order_daily_stats.
+
+        :param session: Сессия текущего запроса.
+        """
+        daily = OrderDailyStats
+        query = select(
+            daily.status, func.sum(daily.orders_count), func.sum(daily.revenue)
+        ).group_by(daily.status)
+        async with session_scope(session) as db_session:
+            await db_session.execute(delete(cls.model))
+            await db_session.execute(
+                insert(cls.model).from_select(
+                    ["status", "orders_count", "revenue"], query
+                )
+            )
+
+    @classmethod
+    async def dashboard(
+        cls, today: date, session: AsyncSession | None = None
+    ) -> Row[Any]:
+        """
+        Показатели для плиток дашборда.
+
+        Читается не больше трёх строк сводки за день и трёх строк итогов по
+        статусам, поэтому время ответа не зависит от числа заказов.
+
+        :param today: День, за который считаются заказы «сегодня».
+        :param session: Сессия текущего запроса.
+        :return: Строка DashboardTiles.
+        """
+        daily = OrderDailyStats
+
+        def today_total(column):
+            return cast(
+                select(func.coalesce(func.sum(column), 0))
+                .where(daily.day == today)
+                .scalar_subquery(),
+                BigInteger,
+            )
+
+        def status_total(column, status: OrderStatus):
+            return cast(
+                func.coalesce(func.sum(column).filter(cls.model.status == status), 0),
+                BigInteger,
+            )
+
+        query = select(
+            today_total(daily.orders_count).label("orders_today"),
+            today_total(daily.revenue).label("revenue_today"),
+            status_total(cls.model.orders_count, OrderStatus.PENDING).label("pending"),
+            status_total(cls.model.orders_count, OrderStatus.IN_PROGRESS).label(
+                "in_progress"
+            ),
+            status_total(cls.model.orders_count, OrderStatus.COMPLETED).label(
+                "completed"
+            ),
+            status_total(cls.model.revenue, OrderStatus.COMPLETED).label(
+                "completed_revenue"
+            ),
+        ).select_from(cls.model)
+        async with session_scope(session) as db_session:
+            result = await execute_read(db_session, query)
+            return result.one()
+
+
+class VehicleDailyUsageDAO(BaseDAO):
+    model = VehicleDailyUsage
+
+    @classmethod
+    async def recompute(
+        cls, days: Collection[date], session: AsyncSession | None = None
+    ) -> None:
+        """
+        Пересчитать время в рейсах по машинам за указанные дни.
+
+        Рейс, переходящий через полночь, делится между днями. Путевые листы
+        дня ищутся по GiST-индексу ix_tripsheets_time_range.
+
+        :param days: Дни, сводки за которые устарели.
+        :param session: Сессия текущего запроса.
+        """
+        d = _days_table(days)
+        day_start = cast(d.c.day, DateTime)
+        day_end = day_start + DAY
+        busy = func.least(TripSheet.end_time, day_end) - func.greatest(
+            TripSheet.start_time, day_start
+        )
+        query = (
+            select(
+                d.c.day,
+                TripSheet.vehicle_id,
+                cast(func.sum(func.extract("epoch", busy)), BigInteger),
+            )
+            .join_from(d, TripSheet, TripSheetDAO._overlaps(day_start, day_end))
+            .group_by(d.c.day, TripSheet.vehicle_id)
+        )
+        async with session_scope(session) as db_session:
+            await db_session.execute(
+                delete(cls.model).where(cls.model.day == any_(_days_param(days)))
+            )
+            await db_session.execute(
+                insert(cls.model).from_select(
+                    ["day", "vehicle_id", "busy_seconds"], query
+                )
+            )
+
+    @classmethod
+    async def rebuild(cls, session: AsyncSession | None = None) -> int:
+        """
+        Пересобрать сводку загрузки целиком по таблице tripsheets.
+
+        :param session: Сессия текущего запроса.
+        :return: Количество пересчитанных дней.
+        """
+        day = func.generate_series(
+            func.date_trunc("day", TripSheet.start_time), TripSheet.end_time, DAY
+        )
+        async with session_scope(session) as db_session:
+            result = await db_session.execute(select(cast(day, Date)).distinct())
+            days = list(result.scalars().all())
+            await db_session.execute(delete(cls.model))
+            await cls.recompute(days, session=db_session)
+            return len(days)
+
+    @classmethod
+    async def utilization(
+        cls,
+        date_from: date,
+        date_to: date,
+        vehicle_type: VehicleType | None = None,
+        session: AsyncSession | None = None,
+    ) -> list[Row[Any]]:
+        """
+        Загрузка машин за период: время в рейсах, делённое на длину периода.
+
+        Машины без рейсов за период тоже попадают в выборку, с нулевой
+        загрузкой.
+
+        :param date_from: Первый день выборки.
+        :param date_to: Последний день выборки.
+        :param vehicle_type: Только машины этого типа.
+        :param session: Сессия текущего запроса.
+        :return: Строки VehicleUtilization от самой загруженной машины.
+        """
+        window = ((date_to - date_from).days + 1) * SECONDS_PER_DAY
+        busy = func.coalesce(func.sum(cls.model.busy_seconds), 0)
+        query = (
+            select(
+                Vehicle.id.label("vehicle_id"),
+                Vehicle.license_plate,
+                Vehicle.vehicle_type,
+                cast(busy / 3600.0, Float).label("busy_hours"),
+                cast(busy / float(window), Float).label("utilization"),
+                func.rank().over(order_by=busy.desc()).label("rank"),
+            )
+            .outerjoin(
+                cls.model,
+                and_(
+                    cls.model.vehicle_id == Vehicle.id,
+                    cls.model.day.between(date_from, date_to),
+                ),
+            )
+            .group_by(Vehicle.id)
+            .order_by(busy.desc(), Vehicle.id)
+        )
+        if vehicle_type is not None:
+            query = query.where(Vehicle.vehicle_type == vehicle_type)
+
+        async with session_scope(session) as db_session:
+            result = await execute_read(db_session, query)
+            return list(result.all())
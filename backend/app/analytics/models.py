@@ -0,0 +1,72 @@
+from datetime import date
+
+from sqlalchemy import BigInteger, Date, Enum, SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base, int_pk
+from app.enums import OrderStatus
+
+
+class OrderDailyStats(Base):
+    """
+    Число заказов и их суммарная стоимость за день в разрезе статусов.
+
+    Сводка разбита на полосы (shard): триггер на orders пишет в полосу своего
+    соединения, поэтому параллельные записи за один день не ждут друг друга
+    на одной строке. Значение сводки — сумма по всем полосам; отдельная
+    полоса может быть отрицательной.
+    """
+
+    __tablename__ = "order_daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    status: Mapped[OrderStatus] = mapped_column(Enum(OrderStatus), primary_key=True)
+    shard: Mapped[int] = mapped_column(
+        SmallInteger, primary_key=True, default=0, server_default="0"
+    )
+    orders_count: Mapped[int] = mapped_column(BigInteger, default=0)
+    revenue: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class OrderStatusTotals(Base):
+    """
+    Число заказов и их суммарная стоимость в каждом статусе за всё время.
+
+    Разбита на полосы так же, как OrderDailyStats.
+    """
+
+    __tablename__ = "order_status_totals"
+
+    status: Mapped[OrderStatus] = mapped_column(Enum(OrderStatus), primary_key=True)
+    shard: Mapped[int] = mapped_column(
+        SmallInteger, primary_key=True, default=0, server_default="0"
+    )
+    orders_count: Mapped[int] = mapped_column(BigInteger, default=0)
+    revenue: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class VehicleDailyUsage(Base):
+    """Время, которое машина провела в рейсах за день (в секундах)."""
+
+    __tablename__ = "vehicle_daily_usage"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    # Без внешнего ключа: строки удалённой машины исчезают при пересчёте дня.
+    vehicle_id: Mapped[int] = mapped_column(primary_key=True)
+    busy_seconds: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class AnalyticsDirtyDay(Base):
+    """
+    Журнал дней, сводки по которым устарели.
+
+    Строки добавляет триггер на tripsheets; пересчёт сводок
+    забирает их и удаляет. Журнал только дополняется, поэтому параллельные
+    записи не конкурируют за одну строку.
+    """
+
+    __tablename__ = "analytics_dirty_days"
+
+    id: Mapped[int_pk] = mapped_column(BigInteger)
+    source: Mapped[str] = mapped_column(String(16))
+    day: Mapped[date] = mapped_column(Date)
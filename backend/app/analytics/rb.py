@@ -0,0 +1,29 @@
+from datetime import date, timedelta
+
+from fastapi import Query
+
+from app.exceptions import InvalidDateRangeException
+
+DEFAULT_RANGE_DAYS = 30
+
+
+class RBDateRange:
+    def __init__(
+        self,
+        date_from: date | None = Query(
+            None, description="Первый день периода (по умолчанию 30 дней назад)"
+        ),
+        date_to: date | None = Query(
+            None, description="Последний день периода (по умолчанию сегодня)"
+        ),
+    ):
+        self.date_to = date_to or date.today()
+        self.date_from = date_from or self.date_to - timedelta(
+            days=DEFAULT_RANGE_DAYS - 1
+        )
+        if self.date_from > self.date_to:
+            raise InvalidDateRangeException
+
+    @property
+    def days(self) -> int:
+        return (self.date_to - self.date_from).days + 1
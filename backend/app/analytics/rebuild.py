@@ -0,0 +1,26 @@
+"""
+Пересборка сводок аналитики по таблицам orders и tripsheets.
+
+Сводки поддерживаются триггерами; пересборка нужна, если они разошлись
+с основными таблицами (TRUNCATE, ручная правка, восстановление из копии).
+
+Запуск (БД из .env):
+
+    python -m app.analytics.rebuild
+"""
+
+import asyncio
+
+from app.analytics.rollups import rebuild_rollups
+from app.logging_config import setup_logging
+
+
+async def main() -> None:
+    counts = await rebuild_rollups()
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
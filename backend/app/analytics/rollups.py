@@ -0,0 +1,142 @@
+import asyncio
+import contextlib
+import logging
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analytics.dao import (
+    AnalyticsDirtyDayDAO,
+    OrderDailyStatsDAO,
+    OrderStatusTotalsDAO,
+    VehicleDailyUsageDAO,
+)
+from app.config import settings
+from app.database import session_scope
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory-блокировки пересчёта: два параллельных пересчёта одного дня
+# удалили бы только видимые им строки сводки и столкнулись бы на вставке.
+ROLLUP_LOCK_KEY = 0x726F_6C6C
+
+# Сводки, которые пересчитываются по журналу analytics_dirty_days. Сводки
+# заказов триггер на orders обновляет сразу при записи.
+RECOMPUTE = {
+    "tripsheets": VehicleDailyUsageDAO.recompute,
+}
+
+
+async def refresh_rollups(session: AsyncSession | None = None) -> int:
+    """
+    Пересчитать сводки за дни, изменённые с прошлого пересчёта.
+
+    Триггер на tripsheets записывает затронутые дни в журнал
+    analytics_dirty_days; пересчитываются только эти дни. Если журнал пуст,
+    выполняется один запрос на проверку. Если сводки уже пересчитывает
+    другой процесс (или идёт пересборка), пересчёт пропускается: журнал
+    разберёт тот, кто держит блокировку, или следующий пересчёт.
+
+    :param session: Сессия текущего запроса.
+    :return: Количество пересчитанных дней по всем сводкам.
+    """
+    async with session_scope(session) as db_session:
+        if not await AnalyticsDirtyDayDAO.has_pending(session=db_session):
+            return 0
+
+        began = perf_counter()
+        locked = await db_session.execute(
+            select(func.pg_try_advisory_xact_lock(ROLLUP_LOCK_KEY))
+        )
+        if not locked.scalar_one():
+            return 0
+        dirty = await AnalyticsDirtyDayDAO.pop_all(session=db_session)
+        for source, days in dirty.items():
+            await RECOMPUTE[source](days, session=db_session)
+
+        refreshed = sum(len(days) for days in dirty.values())
+        logger.info(
+            "Пересчитаны сводки за %d дн. за %.3fs", refreshed, perf_counter() - began
+        )
+        return refreshed
+
+
+async def rebuild_rollups(session: AsyncSession | None = None) -> dict[str, int]:
+    """
+    Пересобрать все сводки аналитики по основным таблицам.
+
+    На время пересборки запись в orders и tripsheets блокируется (чтение
+    продолжается), чтобы изменения не попали ни в пересборку, ни в триггеры
+    поверх неё.
+
+    :param session: Сессия текущего запроса.
+    :return: Количество строк сводки заказов и дней сводки загрузки.
+    """
+    async with session_scope(session) as db_session:
+        began = perf_counter()
+        await db_session.execute(select(func.pg_advisory_xact_lock(ROLLUP_LOCK_KEY)))
+        await db_session.execute(text("LOCK TABLE orders, tripsheets IN SHARE MODE"))
+        await AnalyticsDirtyDayDAO.pop_all(session=db_session)
+
+        order_rows = await OrderDailyStatsDAO.rebuild(session=db_session)
+        await OrderStatusTotalsDAO.rebuild(session=db_session)
+        usage_days = await VehicleDailyUsageDAO.rebuild(session=db_session)
+        logger.info(
+            "Сводки пересобраны за %.3fs: %d строк по заказам, %d дн. по загрузке",
+            perf_counter() - began,
+            order_rows,
+            usage_days,
+        )
+        return {"order_daily_stats": order_rows, "vehicle_daily_usage": usage_days}
+
+
+class RollupRefresher:
+    """
+    Фоновый пересчёт сводок по журналу analytics_dirty_days.
+
+    Раз в interval секунд вызывает refresh_rollups, поэтому запросы
+    аналитики только читают сводки, а изменения путевых листов попадают
+    в загрузку машин не позже чем через interval.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.refreshed_days = 0
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "refreshed_days": self.refreshed_days,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.refreshed_days += await refresh_rollups()
+            except (OSError, SQLAlchemyError) as error:
+                logger.warning("Ошибка пересчёта сводок: %r", error)
+            await asyncio.sleep(self.interval)
+
+
+rollup_refresher = RollupRefresher(interval=settings.ANALYTICS_REFRESH_INTERVAL)
@@ -0,0 +1,112 @@
+import logging
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analytics.dao import (
+    OrderDailyStatsDAO,
+    OrderStatusTotalsDAO,
+    VehicleDailyUsageDAO,
+)
+from app.analytics.rb import RBDateRange
+from app.analytics.schemas import (
+    DashboardTiles,
+    OrderStatusSummary,
+    RevenueBucket,
+    VehicleUtilization,
+)
+from app.database import get_session
+from app.enums import AnalyticsPeriod, OrderStatus, VehicleType
+from app.serialization import dump_row, dump_rows
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["Аналитика"],
+)
+
+
+@router.get(
+    "/dashboard",
+    response_model=DashboardTiles,
+    summary="Плитки дашборда",
+    description=(
+        "Заказы и их стоимость за сегодня, количество заказов в каждом статусе "
+        "и стоимость выполненных. Читаются итоги, которые обновляются при "
+        "каждой записи в заказы."
+    ),
+)
+async def get_dashboard(session: AsyncSession = Depends(get_session)) -> Response:
+    tiles = await OrderStatusTotalsDAO.dashboard(date.today(), session=session)
+    return Response(dump_row(tiles), media_type="application/json")
+
+
+@router.get(
+    "/revenue",
+    response_model=list[RevenueBucket],
+    summary="Выручка по периодам",
+    description=(
+        "Возвращает количество и суммарную стоимость заказов по дням, неделям "
+        "или месяцам с нарастающим итогом. Недели начинаются с понедельника; "
+        "первый и последний интервалы обрезаются границами выборки."
+    ),
+)
+async def get_revenue(
+    period: AnalyticsPeriod = Query(
+        AnalyticsPeriod.DAY, description="Интервал группировки"
+    ),
+    date_range: RBDateRange = Depends(),
+    order_status: OrderStatus | None = Query(
+        None, alias="status", description="Учитывать только заказы в этом статусе"
+    ),
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    buckets = await OrderDailyStatsDAO.revenue(
+        period,
+        date_range.date_from,
+        date_range.date_to,
+        status=order_status,
+        session=session,
+    )
+    return Response(dump_rows(buckets), media_type="application/json")
+
+
+@router.get(
+    "/orders/status",
+    response_model=list[OrderStatusSummary],
+    summary="Заказы по статусам",
+    description="Возвращает количество, стоимость и долю заказов в каждом статусе.",
+)
+async def get_orders_by_status(
+    date_range: RBDateRange = Depends(),
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    summary = await OrderDailyStatsDAO.status_summary(
+        date_range.date_from, date_range.date_to, session=session
+    )
+    return Response(dump_rows(summary), media_type="application/json")
+
+
+@router.get(
+    "/vehicles/utilization",
+    response_model=list[VehicleUtilization],
+    summary="Загрузка машин",
+    description=(
+        "Возвращает для каждой машины часы в рейсах за период и загрузку — "
+        "эти часы, делённые на длину периода. Машины отсортированы от самой "
+        "загруженной. Сводка пересчитывается в фоне, изменения путевых листов "
+        "попадают в неё с задержкой до ANALYTICS_REFRESH_INTERVAL секунд."
+    ),
+)
+async def get_vehicle_utilization(
+    date_range: RBDateRange = Depends(),
+    vehicle_type: VehicleType | None = Query(None, description="Тип машины"),
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    utilization = await VehicleDailyUsageDAO.utilization(
+        date_range.date_from, date_range.date_to, vehicle_type, session=session
+    )
+    logger.info("Загрузка машин за %d дн.: %d машин", date_range.days, len(utilization))
+    return Response(dump_rows(utilization), media_type="application/json")
@@ -0,0 +1,43 @@
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+from app.enums import OrderStatus, VehicleType
+
+
+class RevenueBucket(BaseModel):
+    period_start: date = Field(..., description="Первый день периода")
+    orders_count: int = Field(..., description="Количество заказов за период")
+    revenue: int = Field(..., description="Суммарная стоимость заказов за период")
+    cumulative_revenue: int = Field(
+        ..., description="Нарастающий итог стоимости с начала выборки"
+    )
+
+
+class OrderStatusSummary(BaseModel):
+    status: OrderStatus
+    orders_count: int = Field(..., description="Количество заказов в статусе")
+    revenue: int = Field(..., description="Суммарная стоимость заказов в статусе")
+    share: float = Field(..., description="Доля заказов в статусе от всех заказов")
+
+
+class VehicleUtilization(BaseModel):
+    vehicle_id: int
+    license_plate: str
+    vehicle_type: VehicleType
+    busy_hours: float = Field(..., description="Часы в рейсах за период")
+    utilization: float = Field(
+        ..., description="Загрузка: часы в рейсах, делённые на длину периода"
+    )
+    rank: int = Field(..., description="Место по загрузке (1 — самая загруженная)")
+
+
+class DashboardTiles(BaseModel):
+    orders_today: int = Field(..., description="Заказы, оформленные сегодня")
+    revenue_today: int = Field(..., description="Стоимость заказов за сегодня")
+    pending: int = Field(..., description="Заказы в ожидании")
+    in_progress: int = Field(..., description="Заказы в работе")
+    completed: int = Field(..., description="Выполненные заказы")
+    completed_revenue: int = Field(
+        ..., description="Суммарная стоимость выполненных заказов"
+    )
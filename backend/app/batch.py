@@ -0,0 +1,26 @@
+from app.exceptions import TooManyIdsException
+
+MAX_BATCH_IDS = 1000
+IDS_PATTERN = r"^\d+(,\d+)*$"
+IDS_DESCRIPTION = (
+    f"Идентификаторы через запятую (не больше {MAX_BATCH_IDS}): вернуть только "
+    "эти записи одним запросом"
+)
+
+
+def parse_ids(ids: str | None) -> list[int] | None:
+    """
+    Разобрать параметр ``ids=1,2,3`` пакетного запроса.
+
+    Идентификаторы сортируются и очищаются от повторов, поэтому запросы
+    с одним набором id в разном порядке получают один ключ кэша.
+
+    :param ids: Значение параметра, уже проверенное по IDS_PATTERN.
+    :return: Отсортированный список id или None, если параметр не передан.
+    """
+    if ids is None:
+        return None
+    parsed = sorted({int(item_id) for item_id in ids.split(",")})
+    if len(parsed) > MAX_BATCH_IDS:
+        raise TooManyIdsException
+    return parsed
@@ -0,0 +1,21 @@
+from .backends import CacheBackend, MemoryCacheBackend, RedisCacheBackend
+from .responses import (
+    ResponseCache,
+    etag_headers,
+    not_modified,
+    response_cache,
+    weak_etag,
+)
+from .ttl import TTLCache
+
+__all__ = [
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "RedisCacheBackend",
+    "ResponseCache",
+    "TTLCache",
+    "etag_headers",
+    "not_modified",
+    "response_cache",
+    "weak_etag",
+]
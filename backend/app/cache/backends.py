@@ -0,0 +1,109 @@
+from abc import ABC, abstractmethod
+
+from app.cache.ttl import TTLCache
+
+
+class CacheBackend(ABC):
+    """Хранилище кэша: байтовые значения со сроком жизни и счётчики."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Получить значение по ключу или None."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Сохранить значение на ttl секунд."""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Удалить значения по ключам."""
+
+    @abstractmethod
+    async def get_counters(self, *keys: str) -> list[int]:
+        """Получить значения счётчиков (отсутствующий счётчик равен 0)."""
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """Увеличить счётчик на 1 и вернуть новое значение."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Кэш в памяти процесса.
+
+    У каждого воркера свой кэш, поэтому инвалидация видна только в том
+    процессе, где прошла запись; в остальных запись живёт до истечения TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._values: TTLCache[str, bytes] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self._values.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._values.set(key, value, ttl=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._values.pop(key)
+
+    async def get_counters(self, *keys: str) -> list[int]:
+        return [self._counters.get(key, 0) for key in keys]
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Общий для всех воркеров кэш в Redis.
+
+    Требует дополнительную зависимость: ``uv sync --extra redis``.
+    """
+
+    def __init__(self, url: str) -> None:
+        try:
+            from redis.asyncio import Redis  # noqa: PLC0415
+        except ImportError as e:
+            raise RuntimeError(
+                "Для CACHE_URL=redis://... установите пакет redis "
+                "(uv sync --extra redis)"
+            ) from e
+
+        self._redis = Redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._redis.set(key, value, px=int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._redis.delete(*keys)
+
+    async def get_counters(self, *keys: str) -> list[int]:
+        values = await self._redis.mget(keys)
+        return [int(value) if value is not None else 0 for value in values]
+
+    async def incr(self, key: str) -> int:
+        return await self._redis.incr(key)
+
+
+def create_backend(url: str, maxsize: int, ttl: float) -> CacheBackend:
+    """
+    Создать хранилище кэша по адресу из настроек.
+
+    :param url: Пустая строка — кэш в памяти процесса, redis://... — Redis.
+    :param maxsize: Максимальное число записей кэша в памяти.
+    :param ttl: Срок жизни записей в секундах.
+    :return: Хранилище кэша.
+    """
+    if not url:
+        return MemoryCacheBackend(maxsize=maxsize, ttl=ttl)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url)
+    raise ValueError(f"Неподдерживаемый CACHE_URL: {url}")
@@ -0,0 +1,187 @@
+import hashlib
+from collections.abc import Awaitable, Callable, Collection
+from typing import Any
+from urllib.parse import urlencode
+
+from fastapi import Request, Response, status
+
+from app.cache.backends import CacheBackend, create_backend
+from app.config import settings
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Совпадает ли ETag с заголовком If-None-Match (слабое сравнение, RFC 9110).
+
+    :param if_none_match: Значение заголовка If-None-Match.
+    :param etag: Текущий ETag ответа.
+    :return: True, если клиент уже получил этот ответ.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag.removeprefix("W/") in {
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    }
+
+
+def weak_etag(*parts: Any) -> str:
+    """
+    Слабый ETag по версии данных, а не по телу ответа.
+
+    :param parts: Всё, от чего зависит ответ: строка запроса, отпечаток
+        выборки (см. BaseDAO.fingerprint).
+    :return: ETag вида ``W/"..."``.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_headers(etag: str) -> dict[str, str]:
+    """Заголовки ответа с ETag: клиент перепроверяет его при каждом запросе."""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """
+    Ответ 304, если клиент уже получил ответ с этим ETag.
+
+    :param request: Текущий запрос.
+    :param etag: Текущий ETag ответа.
+    :return: Ответ 304 без тела или None, если ответ нужно отдать целиком.
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag)
+        )
+    return None
+
+
+class ResponseCache:
+    """
+    Кэш готовых JSON-ответов с ETag.
+
+    Ключи строятся по таблице модели: ``item`` — одна запись по id, ``list``
+    — список по параметрам фильтрации. В ключ входит поколение таблицы,
+    поэтому любая запись, затронувшая неизвестный набор строк, сбрасывает
+    весь кэш таблицы одним инкрементом счётчика, без перебора ключей.
+
+    Любая инвалидация таблицы меняет один из её счётчиков поколений. Ответ,
+    загруженный при промахе, сверяется с ними до загрузки и после записи
+    в кэш: если между ними прошла инвалидация, тело могло быть прочитано
+    до коммита изменения, и запись удаляется.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _generation_keys(table: str) -> tuple[str, str]:
+        return f"cache:{table}:items:gen", f"cache:{table}:lists:gen"
+
+    async def _generations(self, table: str) -> list[int]:
+        return await self.backend.get_counters(*self._generation_keys(table))
+
+    async def item_key(self, table: str, item_id: int) -> str:
+        items_gen, _ = await self._generations(table)
+        return f"cache:{table}:items:{items_gen}:{item_id}"
+
+    async def list_key(self, table: str, params: dict[str, Any]) -> str:
+        items_gen, lists_gen = await self._generations(table)
+        query = urlencode(sorted((k, str(v)) for k, v in params.items()))
+        return f"cache:{table}:lists:{items_gen}.{lists_gen}:{query}"
+
+    async def invalidate(self, table: str, ids: Collection[int] | None = None) -> None:
+        """
+        Сбросить кэш таблицы после записи.
+
+        :param table: Имя таблицы модели.
+        :param ids: Идентификаторы изменённых записей; None — неизвестно,
+            какие записи изменены, сбрасывается весь кэш таблицы.
+        """
+        self.invalidations += 1
+        items_gen_key, lists_gen_key = self._generation_keys(table)
+        if ids is None:
+            await self.backend.incr(items_gen_key)
+            return
+
+        await self.backend.incr(lists_gen_key)
+        if ids:
+            keys = [await self.item_key(table, item_id) for item_id in ids]
+            await self.backend.delete(*keys)
+
+    async def respond(
+        self,
+        request: Request,
+        table: str,
+        key: str,
+        load: Callable[[], Awaitable[bytes]],
+    ) -> Response:
+        """
+        Отдать JSON-ответ из кэша или загрузить и сохранить его.
+
+        Если ETag совпадает с If-None-Match запроса, возвращается 304 без тела.
+
+        Инвалидация сначала меняет поколение таблицы, затем удаляет записи.
+        Поэтому запись, конкурирующая с ней, либо увидит новое поколение при
+        повторном чтении и удалит себя сама, либо будет удалена инвалидацией
+        позже: устаревшее тело не остаётся в кэше до истечения TTL.
+
+        :param request: Текущий запрос.
+        :param table: Имя таблицы модели, по которой построен ключ.
+        :param key: Ключ из item_key или list_key.
+        :param load: Загрузка и сериализация ответа при промахе.
+        :return: Ответ 200 с телом и ETag или 304.
+        """
+        cached = await self.backend.get(key)
+        if cached is not None:
+            self.hits += 1
+            etag, body = cached.split(b" ", 1)
+            etag = etag.decode()
+        else:
+            self.misses += 1
+            generations = await self._generations(table)
+            body = await load()
+            etag = make_etag(body)
+            await self.backend.set(key, etag.encode() + b" " + body, self.ttl)
+            if await self._generations(table) != generations:
+                await self.backend.delete(key)
+
+        response = not_modified(request, etag)
+        if response is not None:
+            self.not_modified += 1
+            return response
+        return Response(
+            content=body, media_type=JSON_MEDIA_TYPE, headers=etag_headers(etag)
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        """Счётчики попаданий и инвалидаций в рамках процесса."""
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+        }
+
+
+response_cache = ResponseCache(
+    create_backend(
+        settings.CACHE_URL, maxsize=settings.CACHE_SIZE, ttl=settings.CACHE_TTL
+    ),
+    ttl=settings.CACHE_TTL,
+)
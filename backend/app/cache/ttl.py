@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+
+class TTLCache[K: Hashable, V]:
+    """
+    Ограниченный LRU-кэш в памяти процесса со сроком жизни записей.
+
+    При переполнении вытесняется запись, к которой дольше всего не обращались.
+    generation растёт при каждом явном удалении (evict, clear): по нему
+    можно не сохранять значение, прочитанное до удаления.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        """
+        Получить значение по ключу, если оно есть и не устарело.
+
+        :param key: Ключ записи.
+        :return: Значение или None.
+        """
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """
+        Сохранить значение.
+
+        :param key: Ключ записи.
+        :param value: Значение.
+        :param ttl: Срок жизни в секундах, по умолчанию — ttl кэша.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        """Удалить запись по ключу, если она есть."""
+        self._data.pop(key, None)
+
+    def evict(self, predicate: Callable[[V], bool]) -> int:
+        """
+        Удалить записи, значения которых удовлетворяют условию.
+
+        :param predicate: Условие на значение записи.
+        :return: Количество удалённых записей.
+        """
+        self.generation += 1
+        keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """Очистить кэш."""
+        self.generation += 1
+        self._data.clear()
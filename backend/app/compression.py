@@ -0,0 +1,240 @@
+import asyncio
+import zlib
+from collections.abc import Callable
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Типы содержимого, которые имеет смысл сжимать.
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "text/",
+)
+# Лента SSE: соединения живут долго, а сжатие держит на каждом своё
+# состояние кодировщика; события короткие, выигрыш от сжатия мал.
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+# Ответы без тела.
+SKIP_STATUSES = frozenset({204, 304})
+# Куски больше этого сжимаются в потоке, чтобы не занимать цикл событий
+# (zlib, brotli и zstandard отпускают GIL).
+OFFLOAD_SIZE = 64 * 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+
+class Encoder(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipEncoder:
+    def __init__(self) -> None:
+        self._compressor = zlib.compressobj(
+            GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+def _optional_encoders() -> dict[str, Callable[[], Encoder]]:
+    """Кодировки из дополнительных зависимостей: uv sync --extra compression."""
+    encoders: dict[str, Callable[[], Encoder]] = {}
+    try:
+        import zstandard  # noqa: PLC0415
+    except ImportError:
+        pass
+    else:
+
+        class ZstdEncoder:
+            def __init__(self) -> None:
+                self._compressor = zstandard.ZstdCompressor(
+                    level=ZSTD_LEVEL
+                ).compressobj()
+
+            def compress(self, data: bytes) -> bytes:
+                return self._compressor.compress(data)
+
+            def flush(self) -> bytes:
+                return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+            def finish(self) -> bytes:
+                return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+        encoders["zstd"] = ZstdEncoder
+
+    try:
+        import brotli  # noqa: PLC0415
+    except ImportError:
+        pass
+    else:
+
+        class BrotliEncoder:
+            def __init__(self) -> None:
+                self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+            def compress(self, data: bytes) -> bytes:
+                return self._compressor.process(data)
+
+            def flush(self) -> bytes:
+                return self._compressor.flush()
+
+            def finish(self) -> bytes:
+                return self._compressor.finish()
+
+        encoders["br"] = BrotliEncoder
+
+    return encoders
+
+
+# В порядке предпочтения сервера при равных q в Accept-Encoding.
+ENCODERS: dict[str, Callable[[], Encoder]] = {
+    **_optional_encoders(),
+    "gzip": GzipEncoder,
+}
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """
+    Выбрать кодировку ответа по заголовку Accept-Encoding.
+
+    :param accept_encoding: Значение заголовка, например ``gzip, br;q=0.9``.
+    :return: Кодировка с наибольшим q среди доступных или None.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        key, _, value = params.strip().partition("=")
+        if key.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in ENCODERS:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Сжатие ответов gzip, brotli или zstd по Accept-Encoding клиента.
+
+    Ответ одним куском меньше minimum_size отдаётся как есть. Потоковые
+    ответы (StreamingResponse) сжимаются по мере отправки: после каждого
+    куска поток сбрасывается, поэтому клиент получает данные сразу, а не
+    после завершения ответа.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int) -> None:
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Message | None = None
+        self.encoder: Encoder | None = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        first = self.encoder is None
+        if first:
+            # Решение принимается по первому куску тела: ответ одним куском
+            # меньше minimum_size сжимать невыгодно.
+            self.passthrough = not self._compressible(body, more_body)
+            if self.passthrough:
+                await self._send(self.start)
+                await self._send(message)
+                return
+            self.encoder = ENCODERS[self.encoding]()
+
+        encoder = self.encoder
+        if more_body:
+            data = await _run(lambda: encoder.compress(body) + encoder.flush(), body)
+        else:
+            data = await _run(lambda: encoder.compress(body) + encoder.finish(), body)
+
+        if first:
+            self._set_headers(None if more_body else len(data))
+            await self._send(self.start)
+        await self._send(
+            {"type": "http.response.body", "body": data, "more_body": more_body}
+        )
+
+    def _compressible(self, body: bytes, more_body: bool) -> bool:
+        headers = Headers(raw=self.start["headers"])
+        content_type = headers.get("content-type", "")
+        return (
+            self.start["status"] not in SKIP_STATUSES
+            and "content-encoding" not in headers
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+            and not content_type.startswith(UNCOMPRESSED_TYPES)
+            and (more_body or len(body) >= self.minimum_size)
+        )
+
+    def _set_headers(self, content_length: int | None) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        # Сжатое представление побайтно отличается от исходного, поэтому
+        # сильный ETag становится слабым (RFC 9110, 8.8.1).
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+
+async def _run(compress: Callable[[], bytes], body: bytes) -> bytes:
+    if len(body) > OFFLOAD_SIZE:
+        return await asyncio.to_thread(compress)
+    return compress()
@@ -1,4 +1,5 @@
 import os
+from typing import Any
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -17,6 +18,53 @@ class Settings(BaseSettings):
     ALGORITHM: str
     REGISTER_SECRET_TOKEN: str
 
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    DB_REPLICA_URLS: str = ""
+    DB_REPLICA_RETRY_AFTER: float = 30.0
+    DB_REPLICA_CONNECT_TIMEOUT: float = 2.0
+
+    MONITORING_PUBLIC: bool = False
+
+    AUTH_CACHE_SIZE: int = 1024
+    AUTH_CACHE_TTL: int = 60
+
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+
+    CACHE_URL: str = ""
+    CACHE_SIZE: int = 4096
+    CACHE_TTL: int = 300
+
+    COMPRESSION_MIN_SIZE: int = 1024
+
+    SERVER_TIMING: bool = True
+    SLOW_QUERY_LOG: bool = False
+    SLOW_QUERY_MS: float = 200.0
+
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATE: float = 1.0
+
+    EVENTS_QUEUE_SIZE: int = 256
+    EVENTS_HEARTBEAT: float = 15.0
+    EVENTS_POLL_INTERVAL: float = 5.0
+    EVENTS_RETENTION: int = 86400
+    EVENTS_REPLAY_LIMIT: int = 1000
+
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 2.0
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_RETRY_DELAY: float = 1.0
+    OUTBOX_RETENTION: int = 86400
+
+    ANALYTICS_REFRESH_INTERVAL: float = 5.0
+
 
 settings = Settings()
 
@@ -28,6 +76,32 @@ def get_db_url() -> str:
     )
 
 
+def get_replica_urls() -> list[str]:
+    """URL реплик для чтения из DB_REPLICA_URLS (через запятую)."""
+    return [url.strip() for url in settings.DB_REPLICA_URLS.split(",") if url.strip()]
+
+
+def get_pool_options() -> dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    }
+
+
+def get_replica_pool_options() -> dict[str, Any]:
+    options = get_pool_options()
+    # Недоступная реплика не должна задерживать запрос на таймаут asyncpg (60s).
+    options["connect_args"]["timeout"] = settings.DB_REPLICA_CONNECT_TIMEOUT
+    return options
+
+
 def get_auth_data() -> dict[str, str]:
     return {"secret_key": settings.SECRET_KEY, "algorithm": settings.ALGORITHM}
 
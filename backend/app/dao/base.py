@@ -1,122 +1,350 @@
+from collections.abc import Collection, Iterable, Sequence
+from functools import cache, partial
 from typing import Any, Generic, TypeVar
 
+from pydantic import BaseModel
+from sqlalchemy import (
+    ARRAY,
+    ColumnElement,
+    Integer,
+    Row,
+    RowMapping,
+    Select,
+    any_,
+    bindparam,
+    func,
+    insert,
+    select,
+)
 from sqlalchemy import delete as sqlalchemy_delete
-from sqlalchemy import select
 from sqlalchemy import update as sqlalchemy_update
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import Base, async_session_maker
+from app.cache import response_cache
+from app.database import Base, after_commit, execute_read, session_scope
 
 T = TypeVar("T", bound=Base)
 
+Projection = Sequence[ColumnElement[Any]]
+
+
+@cache
+def _schema_projection(model: type[Base], schema: type[BaseModel]) -> Projection:
+    columns = model.__table__.columns
+    missing = [name for name in schema.model_fields if name not in columns]
+    if missing:
+        raise ValueError(
+            f"Поля схемы {schema.__name__} не являются колонками "
+            f"{model.__tablename__}: {', '.join(missing)}"
+        )
+    return tuple(getattr(model, name) for name in schema.model_fields)
+
 
 class BaseDAO(Generic[T]):
-    """Базовый DAO-класс для работы с моделями SQLAlchemy."""
+    """
+    Базовый DAO-класс для работы с моделями SQLAlchemy.
+
+    Каждый метод принимает необязательную сессию. Если она передана (например,
+    из зависимости get_session), метод выполняется в транзакции запроса и
+    не фиксирует её сам; иначе открывается отдельная сессия.
+
+    Методы записи после коммита сбрасывают кэш ответов по таблице модели.
+    Методы чтения выполняются через execute_read: в GET-запросах, пока
+    в сессии не было записи, они читают с реплик из DB_REPLICA_URLS.
+    """
 
     model: type[T]
 
     @classmethod
-    async def find_all(cls, **filter_by: Any) -> list[T]:
+    def _invalidate_cache(
+        cls, session: AsyncSession, ids: Collection[int] | None = None
+    ) -> None:
+        after_commit(
+            session, partial(response_cache.invalidate, cls.model.__tablename__, ids)
+        )
+
+    @staticmethod
+    def _filtered_ids(filter_by: dict[str, Any]) -> list[int] | None:
+        """Идентификаторы, которыми ограничен фильтр, или None."""
+        return [filter_by["id"]] if "id" in filter_by else None
+
+    @classmethod
+    def _id_in(cls, ids: Iterable[int]) -> ColumnElement[bool]:
+        """
+        Условие ``id = ANY(:ids)``.
+
+        Список передаётся одним параметром-массивом, поэтому размер запроса
+        и число параметров не зависят от количества идентификаторов.
+        """
+        return cls.model.id == any_(
+            bindparam("ids", list(ids), type_=ARRAY(Integer), unique=True)
+        )
+
+    @classmethod
+    def projection(cls, schema: type[BaseModel]) -> Projection:
+        """
+        Колонки модели для полей схемы ответа, в порядке полей схемы.
+
+        :param schema: Схема ответа Pydantic; каждое её поле должно быть
+            колонкой модели.
+        :return: Колонки для параметра columns.
+        """
+        return _schema_projection(cls.model, schema)
+
+    @classmethod
+    def _select(
+        cls, columns: Projection | None = None, schema: type[BaseModel] | None = None
+    ) -> Select:
+        """Запрос к модели целиком или только к колонкам проекции."""
+        if schema is not None:
+            columns = cls.projection(schema)
+        if columns is None:
+            return select(cls.model)
+        return select(*columns).select_from(cls.model)
+
+    @classmethod
+    async def find_all(
+        cls,
+        session: AsyncSession | None = None,
+        columns: Projection | None = None,
+        schema: type[BaseModel] | None = None,
+        as_mapping: bool = False,
+        ids: Iterable[int] | None = None,
+        **filter_by: Any,
+    ) -> list[T] | list[Row[Any]] | list[RowMapping]:
         """
         Найти все записи в таблице, соответствующие фильтру.
 
+        Если задана проекция (columns или schema), выбираются только её
+        колонки и возвращаются лёгкие строки вместо объектов модели: они не
+        попадают в identity map сессии и не тянут неиспользуемые колонки.
+
+        :param session: Сессия текущего запроса.
+        :param columns: Колонки проекции.
+        :param schema: Схема ответа, колонки берутся по её полям.
+        :param as_mapping: Вернуть строки проекции как RowMapping (доступ по
+            имени колонки) вместо Row.
+        :param ids: Выбрать только записи с этими идентификаторами.
+        :param filter_by: Параметры фильтрации.
+        :return: Список объектов модели или строк проекции.
+        """
+        async with session_scope(session) as db_session:
+            query = cls._select(columns, schema).filter_by(**filter_by)
+            if ids is not None:
+                query = query.where(cls._id_in(ids))
+            result = await execute_read(db_session, query)
+            if columns is None and schema is None:
+                return list(result.scalars().all())
+            return list(result.mappings().all() if as_mapping else result.all())
+
+    @staticmethod
+    async def _fingerprint(query: Select, session: AsyncSession) -> tuple[Any, ...]:
+        """
+        Отпечаток выборки: число строк, max и сумма updated_at.
+
+        :param query: Запрос с колонкой updated_at (остальные колонки не нужны).
+        :param session: Сессия, в которой выполняется и сама выборка.
+        :return: Кортеж, меняющийся при любом изменении строк выборки.
+        """
+        updated_at = query.subquery().c.updated_at
+        # Одного max(updated_at) мало: удаление строки не старше максимума
+        # и изменение, зафиксированное позже более свежего, его не меняют.
+        # Сумма меняется при любом добавлении, удалении и изменении строки.
+        stmt = select(
+            func.count(),
+            func.max(updated_at),
+            func.sum(func.extract("epoch", updated_at)),
+        )
+        return tuple((await execute_read(session, stmt)).one())
+
+    @classmethod
+    async def fingerprint(
+        cls,
+        session: AsyncSession | None = None,
+        ids: Iterable[int] | None = None,
+        **filter_by: Any,
+    ) -> tuple[Any, ...]:
+        """
+        Отпечаток записей, которые вернёт find_all с теми же фильтрами.
+
+        Агрегат по одной колонке дешевле самой выборки: не передаются и не
+        сериализуются строки. Используется для слабого ETag списков, чтобы
+        повторный запрос без изменений получал 304 без выполнения find_all.
+
+        :param session: Сессия текущего запроса.
+        :param ids: Только записи с этими идентификаторами.
         :param filter_by: Параметры фильтрации.
-        :return: Список объектов модели.
+        :return: Кортеж (count, max(updated_at), sum(updated_at)).
         """
-        async with async_session_maker() as session:
-            query = select(cls.model).filter_by(**filter_by)
-            result = await session.execute(query)
-            return list(result.scalars().all())
+        async with session_scope(session) as db_session:
+            query = select(cls.model.updated_at).filter_by(**filter_by)
+            if ids is not None:
+                query = query.where(cls._id_in(ids))
+            return await cls._fingerprint(query, db_session)
 
     @classmethod
-    async def find_one_or_none_by_id(cls, data_id: int) -> T | None:
+    async def find_one_or_none_by_id(
+        cls,
+        data_id: int,
+        session: AsyncSession | None = None,
+        columns: Projection | None = None,
+        schema: type[BaseModel] | None = None,
+        as_mapping: bool = False,
+    ) -> T | Row[Any] | RowMapping | None:
         """
         Найти одну запись по идентификатору.
 
         :param data_id: Идентификатор записи.
-        :return: Объект модели или None.
+        :param session: Сессия текущего запроса.
+        :param columns: Колонки проекции, как в find_all.
+        :param schema: Схема ответа, как в find_all.
+        :param as_mapping: Вернуть строку проекции как RowMapping.
+        :return: Объект модели, строка проекции или None.
         """
-        async with async_session_maker() as session:
-            query = select(cls.model).filter_by(id=data_id)
-            result = await session.execute(query)
-            return result.scalar_one_or_none()
+        return await cls.find_one_or_none(
+            session=session,
+            columns=columns,
+            schema=schema,
+            as_mapping=as_mapping,
+            id=data_id,
+        )
 
     @classmethod
-    async def find_one_or_none(cls, **filter_by: Any) -> T | None:
+    async def find_one_or_none(
+        cls,
+        session: AsyncSession | None = None,
+        columns: Projection | None = None,
+        schema: type[BaseModel] | None = None,
+        as_mapping: bool = False,
+        **filter_by: Any,
+    ) -> T | Row[Any] | RowMapping | None:
         """
         Найти одну запись, соответствующую фильтру.
 
+        :param session: Сессия текущего запроса.
+        :param columns: Колонки проекции, как в find_all.
+        :param schema: Схема ответа, как в find_all.
+        :param as_mapping: Вернуть строку проекции как RowMapping.
         :param filter_by: Параметры фильтрации.
-        :return: Объект модели или None.
+        :return: Объект модели, строка проекции или None.
+        """
+        async with session_scope(session) as db_session:
+            query = cls._select(columns, schema).filter_by(**filter_by)
+            result = await execute_read(db_session, query)
+            if columns is None and schema is None:
+                return result.scalar_one_or_none()
+            if as_mapping:
+                return result.mappings().one_or_none()
+            return result.one_or_none()
+
+    @classmethod
+    async def find_existing_ids(
+        cls, ids: Iterable[int], session: AsyncSession | None = None
+    ) -> set[int]:
+        """
+        Выбрать из переданных идентификаторов те, что есть в таблице.
+
+        :param ids: Проверяемые идентификаторы.
+        :param session: Сессия текущего запроса.
+        :return: Множество существующих идентификаторов.
         """
-        async with async_session_maker() as session:
-            query = select(cls.model).filter_by(**filter_by)
-            result = await session.execute(query)
-            return result.scalar_one_or_none()
+        ids = list(ids)
+        if not ids:
+            return set()
+
+        async with session_scope(session) as db_session:
+            query = select(cls.model.id).where(cls.model.id.in_(ids))
+            result = await db_session.execute(query)
+            return set(result.scalars().all())
 
     @classmethod
-    async def add(cls, **values: Any) -> T:
+    async def add(cls, session: AsyncSession | None = None, **values: Any) -> T:
         """
         Добавить новую запись в базу данных.
 
+        :param session: Сессия текущего запроса.
         :param values: Данные для новой записи.
         :return: Созданный объект модели.
         """
-        async with async_session_maker() as session:
-            async with session.begin():
-                new_instance = cls.model(**values)
-                session.add(new_instance)
-                try:
-                    await session.commit()
-                    return new_instance
-                except SQLAlchemyError as e:
-                    await session.rollback()
-                    raise e
+        async with session_scope(session) as db_session:
+            new_instance = cls.model(**values)
+            db_session.add(new_instance)
+            await db_session.flush()
+            cls._invalidate_cache(db_session, [new_instance.id])
+            return new_instance
+
+    @classmethod
+    async def add_many(
+        cls,
+        values: Sequence[dict[str, Any]],
+        schema: type[BaseModel],
+        session: AsyncSession | None = None,
+    ) -> list[Row[Any]]:
+        """
+        Добавить записи одним пакетным INSERT ... RETURNING.
+
+        :param values: Данные новых записей.
+        :param schema: Схема ответа: возвращаются строки проекции по её полям.
+        :param session: Сессия текущего запроса.
+        :return: Созданные записи в порядке values.
+        """
+        if not values:
+            return []
+
+        async with session_scope(session) as db_session:
+            query = insert(cls.model).returning(
+                *cls.projection(schema), sort_by_parameter_order=True
+            )
+            result = await db_session.execute(query, list(values))
+            cls._invalidate_cache(db_session, [])
+            return list(result.all())
 
     @classmethod
-    async def update(cls, filter_by: dict[str, Any], **values: Any) -> int:
+    async def update(
+        cls,
+        filter_by: dict[str, Any],
+        session: AsyncSession | None = None,
+        **values: Any,
+    ) -> int:
         """
         Обновить записи, соответствующие фильтру.
 
         :param filter_by: Параметры фильтрации.
+        :param session: Сессия текущего запроса.
         :param values: Новые значения.
         :return: Количество обновлённых строк.
         """
-        async with async_session_maker() as session:
-            async with session.begin():
-                query = (
-                    sqlalchemy_update(cls.model)
-                    .where(*[getattr(cls.model, k) == v for k, v in filter_by.items()])
-                    .values(**values)
-                    .execution_options(synchronize_session="fetch")
-                )
-                result = await session.execute(query)
-                try:
-                    await session.commit()
-                    return result.rowcount
-                except SQLAlchemyError as e:
-                    await session.rollback()
-                    raise e
+        async with session_scope(session) as db_session:
+            query = (
+                sqlalchemy_update(cls.model)
+                .where(*[getattr(cls.model, k) == v for k, v in filter_by.items()])
+                .values(**values)
+                .execution_options(synchronize_session="fetch")
+            )
+            result = await db_session.execute(query)
+            cls._invalidate_cache(db_session, cls._filtered_ids(filter_by))
+            return result.rowcount
 
     @classmethod
-    async def delete(cls, delete_all: bool = False, **filter_by: Any) -> int:
+    async def delete(
+        cls,
+        delete_all: bool = False,
+        session: AsyncSession | None = None,
+        **filter_by: Any,
+    ) -> int:
         """
         Удалить записи, соответствующие фильтру.
 
         :param delete_all: Флаг удаления всех записей таблицы (осторожно).
+        :param session: Сессия текущего запроса.
         :param filter_by: Параметры фильтрации.
         :return: Количество удалённых строк.
         """
         if not delete_all and not filter_by:
             raise ValueError("Необходимо указать хотя бы один параметр для удаления")
 
-        async with async_session_maker() as session:
-            async with session.begin():
-                query = sqlalchemy_delete(cls.model).filter_by(**filter_by)
-                result = await session.execute(query)
-                try:
-                    await session.commit()
-                    return result.rowcount
-                except SQLAlchemyError as e:
-                    await session.rollback()
-                    raise e
+        async with session_scope(session) as db_session:
+            query = sqlalchemy_delete(cls.model).filter_by(**filter_by)
+            result = await db_session.execute(query)
+            cls._invalidate_cache(db_session, cls._filtered_ids(filter_by))
+            return result.rowcount
@@ -1,12 +1,30 @@
 from .base import Base
-from .core import DATABASE_URL, async_session_maker, engine
+from .core import (
+    DATABASE_URL,
+    after_commit,
+    async_session_maker,
+    engine,
+    execute_read,
+    get_session,
+    replica_pool,
+    session_scope,
+)
+from .metrics import pool_metrics
+from .replicas import read_primary
 from .types import created_at, int_pk, str_null_true, str_uniq, updated_at
 
 __all__ = [
     "DATABASE_URL",
     "Base",
+    "after_commit",
     "async_session_maker",
     "engine",
+    "execute_read",
+    "get_session",
+    "pool_metrics",
+    "read_primary",
+    "replica_pool",
+    "session_scope",
     "int_pk",
     "str_uniq",
     "str_null_true",
@@ -1,7 +1,132 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
 
-from app.config import get_db_url
+from fastapi import Request
+from sqlalchemy import Executable, Result
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import (
+    get_db_url,
+    get_pool_options,
+    get_replica_pool_options,
+    get_replica_urls,
+    settings,
+)
+from app.profiling import register_sql_profiling
+
+from .metrics import TimedQueuePool, register_pool_metrics
+from .replicas import ReplicaPool, close_replica_session, use_replicas
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = get_db_url()
-engine = create_async_engine(DATABASE_URL, echo=False)
+engine = create_async_engine(
+    DATABASE_URL, echo=False, poolclass=TimedQueuePool, **get_pool_options()
+)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+register_pool_metrics(engine)
+register_sql_profiling(engine)
+
+replica_pool = ReplicaPool(
+    [
+        create_async_engine(url, echo=False, **get_replica_pool_options())
+        for url in get_replica_urls()
+    ],
+    retry_after=settings.DB_REPLICA_RETRY_AFTER,
+)
+for replica in replica_pool.replicas:
+    register_sql_profiling(replica.engine)
+
+# Запросы, чтения которых можно отдавать репликам.
+REPLICA_METHODS = frozenset({"GET", "HEAD"})
+
+AFTER_COMMIT_KEY = "after_commit"
+
+
+def after_commit(
+    session: AsyncSession, callback: Callable[[], Awaitable[None]]
+) -> None:
+    """
+    Выполнить действие после успешной фиксации транзакции сессии.
+
+    Если транзакция откатится, действие не выполняется. Ошибка действия
+    записывается в лог и не влияет на результат запроса.
+
+    :param session: Сессия, в транзакции которой произошло изменение.
+    :param callback: Асинхронное действие без аргументов.
+    """
+    session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+@asynccontextmanager
+async def _transaction(replicas: bool = False) -> AsyncIterator[AsyncSession]:
+    async with async_session_maker() as session:
+        if replicas:
+            use_replicas(session)
+        try:
+            async with session.begin():
+                yield session
+        finally:
+            await close_replica_session(session)
+
+        for callback in session.info.pop(AFTER_COMMIT_KEY, []):
+            try:
+                await callback()
+            except Exception:
+                # Данные уже зафиксированы: сбой побочного действия не должен
+                # превращать успешный запрос в ошибку.
+                logger.exception("Ошибка при выполнении действия после коммита")
+
+
+@asynccontextmanager
+async def session_scope(
+    session: AsyncSession | None = None,
+) -> AsyncIterator[AsyncSession]:
+    """
+    Использовать переданную сессию или открыть новую со своей транзакцией.
+
+    Если сессия передана, фиксацией транзакции управляет её владелец
+    (например, зависимость get_session), иначе транзакция фиксируется
+    при выходе из блока.
+
+    :param session: Уже открытая сессия или None.
+    :return: Асинхронная сессия SQLAlchemy.
+    """
+    if session is not None:
+        yield session
+        return
+
+    async with _transaction() as new_session:
+        yield new_session
+
+
+async def get_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """
+    FastAPI-зависимость: одна сессия и одна транзакция на запрос.
+
+    Транзакция фиксируется после успешного выполнения обработчика и
+    откатывается, если обработчик завершился исключением. Чтения GET-запросов
+    через execute_read идут на реплики, пока в сессии не было записи.
+    """
+    async with _transaction(replicas=request.method in REPLICA_METHODS) as session:
+        yield session
+
+
+async def execute_read(session: AsyncSession, statement: Executable) -> Result[Any]:
+    """
+    Выполнить запрос на чтение, по возможности на реплике.
+
+    Реплики используются, только если они заданы в DB_REPLICA_URLS, сессия
+    получена из get_session в GET-запросе и в ней ещё не было записи. Иначе
+    запрос выполняется в самой сессии на основном сервере. Сессии без
+    запроса (session_scope() без аргумента) читают с основного сервера:
+    так в кэш ответов не попадают данные с отстающей реплики.
+
+    :param session: Сессия текущего запроса.
+    :param statement: Запрос на чтение.
+    :return: Результат запроса.
+    """
+    return await replica_pool.execute(session, statement)
@@ -0,0 +1,104 @@
+import os
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+from app.profiling import record
+
+
+class PoolMetrics:
+    """Счётчики пула соединений в рамках одного процесса (воркера)."""
+
+    def __init__(self) -> None:
+        self.connections_opened = 0
+        self.connections_invalidated = 0
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.overflow_peak = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        self.wait_count += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self, engine: AsyncEngine) -> dict[str, Any]:
+        """
+        Текущее состояние пула и накопленные счётчики.
+
+        :param engine: Движок, пул которого нужно описать.
+        :return: Словарь с метриками пула.
+        """
+        pool = engine.pool
+        return {
+            "pid": os.getpid(),
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "connections_opened": self.connections_opened,
+            "connections_invalidated": self.connections_invalidated,
+            "checkouts": self.checkouts,
+            "overflow_checkouts": self.overflow_checkouts,
+            "overflow_peak": self.overflow_peak,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": (
+                self.wait_total / self.wait_count * 1000 if self.wait_count else 0.0
+            ),
+            "wait_max_ms": self.wait_max * 1000,
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+def register_pool_metrics(engine: AsyncEngine) -> None:
+    """Подписать счётчики pool_metrics на события пула движка."""
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        pool_metrics.connections_opened += 1
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        pool_metrics.connections_invalidated += 1
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_metrics.checkouts += 1
+        # overflow() учитывает и соединения, которые ещё открываются, поэтому
+        # при всплеске нагрузки считаются все выдачи, пока пул за pool_size.
+        overflow = pool.overflow()
+        if overflow > 0:
+            pool_metrics.overflow_checkouts += 1
+            pool_metrics.overflow_peak = max(pool_metrics.overflow_peak, overflow)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул основного сервера, замеряющий время выдачи соединения.
+
+    Замер идёт в момент, когда соединение действительно берётся из пула, —
+    при первом запросе сессии. Сессии, которые не обращаются к основному
+    серверу (чтения с реплик, ответы из кэша), соединение не занимают.
+    """
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            pool_metrics.observe_wait(waited)
+            record("pool", waited)
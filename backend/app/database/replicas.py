@@ -0,0 +1,175 @@
+import itertools
+import logging
+import time
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from sqlalchemy import Executable, Result, event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session
+
+logger = logging.getLogger(__name__)
+
+REPLICA_READS_KEY = "replica_reads"
+REPLICA_SESSION_KEY = "replica_session"
+
+# Ошибки получения соединения с репликой: отказ в подключении, таймаут
+# подключения, ошибка сервера при подключении, пустой пул.
+CONNECT_ERRORS = (OSError, DBAPIError, PoolTimeoutError)
+
+
+class Replica:
+    """Реплика для чтения: движок, фабрика сессий и счётчики."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        self.down_until = 0.0
+        self.reads = 0
+        self.failures = 0
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+
+class ReplicaPool:
+    """
+    Реплики для чтения, выбираемые по кругу.
+
+    Реплика, к которой не удалось подключиться или соединение с которой
+    оборвалось, исключается из выбора на retry_after секунд, после чего
+    снова пробуется очередным запросом.
+    """
+
+    def __init__(self, engines: Sequence[AsyncEngine], retry_after: float) -> None:
+        self.replicas = [Replica(engine) for engine in engines]
+        self.retry_after = retry_after
+        self._turn = itertools.count()
+
+    def candidates(self) -> Iterator[Replica]:
+        """Доступные реплики, начиная с очередной по кругу."""
+        if not self.replicas:
+            return
+        start = next(self._turn)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.down_until <= time.monotonic():
+                yield replica
+
+    def mark_down(self, replica: Replica, error: Exception) -> None:
+        replica.failures += 1
+        replica.down_until = time.monotonic() + self.retry_after
+        logger.warning(
+            "Реплика %s исключена на %.0fs: %r", replica.name, self.retry_after, error
+        )
+
+    async def _session(
+        self, session: AsyncSession
+    ) -> tuple[Replica, AsyncSession] | None:
+        if not session.info.get(REPLICA_READS_KEY):
+            return None
+        current = session.info.get(REPLICA_SESSION_KEY)
+        if current is not None:
+            return current
+
+        for replica in self.candidates():
+            replica_session = replica.session_maker()
+            try:
+                await replica_session.connection()
+            except CONNECT_ERRORS as error:
+                await replica_session.close()
+                self.mark_down(replica, error)
+                continue
+            current = session.info[REPLICA_SESSION_KEY] = (replica, replica_session)
+            return current
+        return None
+
+    async def execute(
+        self, session: AsyncSession, statement: Executable
+    ) -> Result[Any]:
+        """
+        Выполнить чтение на реплике, если сессии это разрешено.
+
+        Реплика выбирается по кругу один раз на сессию, и все её чтения идут
+        через отдельную сессию этой реплики: транзакция основного сервера
+        остаётся нетронутой, поэтому сбой реплики не ломает фиксацию. Если
+        ни одна реплика недоступна или соединение оборвалось, чтение
+        выполняется в самой сессии на основном сервере.
+
+        :param session: Сессия текущего запроса.
+        :param statement: Запрос на чтение.
+        :return: Результат запроса.
+        """
+        current = await self._session(session)
+        if current is None:
+            return await session.execute(statement)
+
+        replica, replica_session = current
+        try:
+            result = await replica_session.execute(statement)
+        except DBAPIError as error:
+            if not error.connection_invalidated:
+                raise
+            self.mark_down(replica, error)
+            await close_replica_session(session)
+            read_primary(session)
+            return await session.execute(statement)
+        replica.reads += 1
+        return result
+
+    def snapshot(self) -> dict[str, Any]:
+        """Состояние реплик в рамках процесса (воркера)."""
+        now = time.monotonic()
+        return {
+            "retry_after": self.retry_after,
+            "replicas": [
+                {
+                    "url": replica.name,
+                    "healthy": replica.down_until <= now,
+                    "retry_in": max(replica.down_until - now, 0.0),
+                    "reads": replica.reads,
+                    "failures": replica.failures,
+                }
+                for replica in self.replicas
+            ],
+        }
+
+
+def use_replicas(session: AsyncSession) -> None:
+    """Разрешить сессии читать с реплик (см. ReplicaPool.execute)."""
+    session.info[REPLICA_READS_KEY] = True
+
+
+def read_primary(session: AsyncSession | Session) -> None:
+    """
+    Читать дальше только с основного сервера («read your writes»).
+
+    Вызывается автоматически после любой записи в сессии; можно вызвать
+    и явно, если обработчику нужны данные без отставания реплики.
+    """
+    session.info.pop(REPLICA_READS_KEY, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _read_primary_after_write(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        read_primary(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_flush")
+def _read_primary_after_flush(session: Session, flush_context: Any) -> None:
+    read_primary(session)
+
+
+async def close_replica_session(session: AsyncSession) -> None:
+    """Закрыть сессию реплики, открытую для чтений этой сессии."""
+    current = session.info.pop(REPLICA_SESSION_KEY, None)
+    if current is None:
+        return
+    try:
+        await current[1].close()
+    except Exception:
+        logger.exception("Ошибка при закрытии сессии реплики")
@@ -16,3 +16,31 @@ class VehicleType(enum.Enum):
     TRUCK = "truck"
     VAN = "van"
     CAR = "car"
+
+
+class AnalyticsPeriod(enum.Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class TripSheetExpand(enum.Enum):
+    VEHICLE = "vehicle"
+    ORDER = "order"
+
+
+class ChangeOp(enum.Enum):
+    INSERT = "insert"
+    UPDATE = "update"
+    DELETE = "delete"
+    # Изменено слишком много строк одной командой: таблицу нужно перечитать.
+    RESET = "reset"
+    # Отметка очистки журнала change_events: более ранние события удалены.
+    PRUNED = "pruned"
+
+
+class OutboxStatus(enum.Enum):
+    PENDING = "pending"
+    DONE = "done"
+    # Попытки исчерпаны: сообщение остаётся в таблице для разбора.
+    FAILED = "failed"
@@ -0,0 +1,330 @@
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Collection, Sequence
+from typing import Any
+
+import asyncpg
+from sqlalchemy import Row
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import engine, session_scope
+from app.enums import ChangeOp, TripSheetExpand
+from app.events.dao import ChangeEventDAO
+from app.orders.dao import OrderDAO
+from app.orders.schemas import OrderResponse
+from app.serialization import dump_json
+from app.trip_sheets.dao import TripSheetDAO
+from app.trip_sheets.schemas import TripSheetExpandedResponse
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "change_events"
+# Пока в журнале есть события транзакций выше горизонта, он опрашивается
+# чаще: события станут доступны, как только завершатся более ранние
+# транзакции, а уведомления об этом не будет.
+PENDING_RETRY = 0.2
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+PRUNE_INTERVAL = 600.0
+
+UPSERT_OPS = frozenset({ChangeOp.INSERT.value, ChangeOp.UPDATE.value})
+
+Loader = Callable[[Collection[int], AsyncSession], Awaitable[dict[int, Any]]]
+
+
+async def _load_orders(ids: Collection[int], session: AsyncSession) -> dict[int, Any]:
+    rows = await OrderDAO.find_all(
+        ids=ids, schema=OrderResponse, as_mapping=True, session=session
+    )
+    return {row["id"]: dict(row) for row in rows}
+
+
+async def _load_trip_sheets(
+    ids: Collection[int], session: AsyncSession
+) -> dict[int, Any]:
+    trip_sheets = await TripSheetDAO.find_all_expanded(
+        set(TripSheetExpand), ids=ids, session=session
+    )
+    return {
+        trip_sheet.id: TripSheetExpandedResponse.model_validate(trip_sheet).model_dump(
+            exclude_none=True
+        )
+        for trip_sheet in trip_sheets
+    }
+
+
+# Представление строки в событии совпадает с элементом списка:
+# GET /orders/ и GET /tripsheets/?expand=vehicle,order.
+LOADERS: dict[str, Loader] = {
+    "orders": _load_orders,
+    "tripsheets": _load_trip_sheets,
+}
+
+
+def format_message(event: str, event_id: int, data: Any) -> bytes:
+    """Сообщение SSE; id — курсор, который клиент вернёт в Last-Event-ID."""
+    return (
+        f"id: {event_id}\nevent: {event}\ndata: ".encode() + dump_json(data) + b"\n\n"
+    )
+
+
+def reset_message(event_id: int) -> bytes:
+    """Сообщение «перечитайте списки»: пропущенные изменения не восстановить."""
+    changes = [{"source": source, "op": ChangeOp.RESET.value} for source in LOADERS]
+    return format_message("changes", event_id, {"changes": changes})
+
+
+async def render_changes(
+    events: Sequence[Row[Any]], session: AsyncSession
+) -> list[bytes]:
+    """
+    Сообщения SSE по событиям журнала: одно сообщение на транзакцию.
+
+    Строки читаются одним запросом на таблицу для всех транзакций сразу
+    и отдаются в текущем состоянии. Поэтому изменение можно безопасно
+    получить повторно, а строка, удалённая после изменения, приходит как
+    удаление. id сообщения — xid транзакции + 1: получив его, клиент
+    получил все транзакции с меньшим xid.
+
+    :param events: События в порядке xid.
+    :param session: Сессия для чтения строк.
+    :return: Сообщения в порядке xid.
+    """
+    transactions: dict[int, dict[tuple[str, int | None], str]] = {}
+    upserted: dict[str, set[int]] = defaultdict(set)
+    for event in events:
+        changes = transactions.setdefault(event.xid, {})
+        # Несколько изменений строки в транзакции сводятся к последнему.
+        changes.pop((event.source, event.row_id), None)
+        changes[(event.source, event.row_id)] = event.op
+        if event.op in UPSERT_OPS:
+            upserted[event.source].add(event.row_id)
+
+    rows = {
+        source: await LOADERS[source](ids, session) for source, ids in upserted.items()
+    }
+
+    messages = []
+    for xid, changes in transactions.items():
+        payload = []
+        for (source, row_id), op in changes.items():
+            if op == ChangeOp.RESET.value:
+                payload.append({"source": source, "op": op})
+            elif op in UPSERT_OPS and row_id in rows[source]:
+                payload.append(
+                    {
+                        "source": source,
+                        "op": op,
+                        "id": row_id,
+                        "data": rows[source][row_id],
+                    }
+                )
+            else:
+                payload.append(
+                    {"source": source, "op": ChangeOp.DELETE.value, "id": row_id}
+                )
+        messages.append(format_message("changes", xid + 1, {"changes": payload}))
+    return messages
+
+
+class Subscriber:
+    """
+    Клиент ленты: ограниченная очередь сообщений.
+
+    start — горизонт на момент подписки: сообщения транзакций с меньшим xid
+    клиент получает из журнала (replay), остальные — через очередь.
+    """
+
+    def __init__(self, queue_size: int, start: int) -> None:
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(queue_size)
+        self.start = start
+        self.overflowed = False
+
+
+class ChangeBroadcaster:
+    """
+    Рассылка изменений из журнала change_events подключённым клиентам.
+
+    Одно соединение LISTEN и один опрос журнала на воркер, сколько бы
+    клиентов ни было подключено: каждое сообщение читается из БД и
+    сериализуется один раз, а клиентам раздаются готовые байты.
+
+    Журнал читается по горизонту (ChangeEventDAO.horizon), а не по id:
+    транзакции фиксируются не в порядке xid и id, и курсор по id пропускал
+    бы события транзакции, зафиксированной позже более новой. Уведомление
+    NOTIFY только будит опрос; без него журнал всё равно опрашивается раз
+    в poll_interval, поэтому потеря соединения LISTEN не теряет события.
+
+    Очередь клиента ограничена: клиент, который не успевает читать,
+    отключается, а не копит сообщения в памяти. Переподключившись
+    с Last-Event-ID, он получает пропущенное из журнала.
+    """
+
+    def __init__(
+        self,
+        queue_size: int,
+        poll_interval: float,
+        retention: int,
+        replay_limit: int,
+    ) -> None:
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.replay_limit = replay_limit
+        self.subscribers: set[Subscriber] = set()
+        self.horizon = 0
+        self.listening = False
+        self.published = 0
+        self.overflowed = 0
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+
+    async def subscribe(self) -> Subscriber:
+        """Подписать клиента; при первой подписке запускается слушатель."""
+        async with self._lock:
+            if self._task is None or self._task.done():
+                self.horizon = await ChangeEventDAO.horizon()
+                self._task = asyncio.create_task(self._run())
+            subscriber = Subscriber(self.queue_size, self.horizon)
+            self.subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    async def replay(self, cursor: int, until: int) -> list[bytes]:
+        """
+        Сообщения, пропущенные клиентом: транзакции с xid в [cursor, until).
+
+        Если часть из них уже удалена из журнала или их больше replay_limit,
+        клиент получает одно сообщение reset и перечитывает списки.
+
+        :param cursor: Last-Event-ID клиента.
+        :param until: Горизонт подписки клиента (Subscriber.start).
+        :return: Сообщения в порядке xid.
+        """
+        async with session_scope() as session:
+            pruned_before = await ChangeEventDAO.pruned_before(session=session)
+            if pruned_before is not None and cursor < pruned_before:
+                return [reset_message(until)]
+            events = await ChangeEventDAO.find_from(
+                cursor, until, limit=self.replay_limit + 1, session=session
+            )
+            if len(events) > self.replay_limit:
+                return [reset_message(until)]
+            return await render_changes(events, session)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "listening": self.listening,
+            "subscribers": len(self.subscribers),
+            "horizon": self.horizon,
+            "published": self.published,
+            "overflowed": self.overflowed,
+        }
+
+    def _publish(self, message: bytes) -> None:
+        self.published += 1
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                subscriber.overflowed = True
+                self.subscribers.discard(subscriber)
+                self.overflowed += 1
+                logger.warning("Клиент ленты изменений не успевает читать: отключён")
+
+    async def _poll(self) -> bool:
+        """
+        Разослать события транзакций ниже нового горизонта.
+
+        :return: True, если в журнале остались события выше горизонта.
+        """
+        events: Sequence[Row[Any]] = ()
+        ready: Sequence[Row[Any]] = ()
+        messages: list[bytes] = []
+        idle = not self.subscribers
+        async with session_scope() as session:
+            horizon = await ChangeEventDAO.horizon(session=session)
+            if not idle:
+                events = await ChangeEventDAO.find_from(self.horizon, session=session)
+                ready = [event for event in events if event.xid < horizon]
+                messages = await render_changes(ready, session)
+
+        if idle and self.subscribers:
+            # Клиент подписался во время опроса: его горизонт — прежний,
+            # события до нового горизонта нужно прочитать и разослать.
+            return True
+        # Без await между рассылкой и сдвигом горизонта: клиент, подписавшийся
+        # после этого, получит эти события из журнала, а не из очереди.
+        for message in messages:
+            self._publish(message)
+        self.horizon = max(self.horizon, horizon)
+        return len(ready) < len(events)
+
+    def _notify(self, *args: Any) -> None:
+        self._wake.set()
+
+    async def _listen(self, connection: asyncpg.Connection) -> None:
+        loop = asyncio.get_running_loop()
+        pruned_at = loop.time()
+        # Первый опрос — сразу: изменения, зафиксированные до LISTEN, не
+        # потеряны, журнал читается от горизонта.
+        while not connection.is_closed():
+            self._wake.clear()
+            try:
+                pending = await self._poll()
+                if loop.time() - pruned_at >= PRUNE_INTERVAL:
+                    pruned_at = loop.time()
+                    await ChangeEventDAO.prune(self.retention)
+            except (OSError, SQLAlchemyError) as error:
+                logger.warning("Ошибка чтения журнала изменений: %r", error)
+                pending = False
+
+            timeout = PENDING_RETRY if pending else self.poll_interval
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    async def _run(self) -> None:
+        dsn = engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                connection = await asyncpg.connect(dsn)
+            except (OSError, asyncpg.PostgresError) as error:
+                logger.warning(
+                    "Нет соединения для ленты изменений: %r, повтор через %.0fs",
+                    error,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+                continue
+
+            delay = RECONNECT_DELAY
+            try:
+                await connection.add_listener(CHANNEL, self._notify)
+                self.listening = True
+                await self._listen(connection)
+                logger.warning("Соединение ленты изменений закрыто, переподключение")
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as error:
+                logger.warning("Ошибка соединения ленты изменений: %r", error)
+            finally:
+                self.listening = False
+                connection.terminate()
+
+
+change_broadcaster = ChangeBroadcaster(
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    poll_interval=settings.EVENTS_POLL_INTERVAL,
+    retention=settings.EVENTS_RETENTION,
+    replay_limit=settings.EVENTS_REPLAY_LIMIT,
+)
@@ -0,0 +1,154 @@
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    Row,
+    Text,
+    delete,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dao.base import BaseDAO
+from app.database import session_scope
+from app.enums import ChangeOp
+from app.models import ChangeEvent
+
+# Ключ advisory-блокировки очистки журнала: воркеры чистят его по очереди,
+# иначе каждый оставил бы свою отметку очистки.
+PRUNE_LOCK_KEY = 0x6576_6E74
+
+
+def _xid(value: ColumnElement[Any]) -> ColumnElement[int]:
+    """xid8 как bigint: у asyncpg нет кодека для xid8."""
+    return value.cast(Text).cast(BigInteger)
+
+
+class ChangeEventDAO(BaseDAO):
+    model = ChangeEvent
+
+    @classmethod
+    async def horizon(cls, session: AsyncSession | None = None) -> int:
+        """
+        Горизонт журнала: все транзакции с меньшим xid уже завершены.
+
+        События транзакций ниже горизонта больше не появятся и не изменятся,
+        поэтому их можно отдавать клиентам в порядке xid, не боясь, что
+        транзакция с меньшим xid зафиксируется позже.
+
+        :param session: Сессия текущего запроса.
+        :return: xmin текущего снимка.
+        """
+        async with session_scope(session) as db_session:
+            query = select(_xid(func.pg_snapshot_xmin(func.pg_current_snapshot())))
+            result = await db_session.execute(query)
+            return result.scalar_one()
+
+    @classmethod
+    async def find_from(
+        cls,
+        start_xid: int,
+        end_xid: int | None = None,
+        limit: int | None = None,
+        session: AsyncSession | None = None,
+    ) -> Sequence[Row[Any]]:
+        """
+        События транзакций с xid в [start_xid, end_xid) в порядке записи.
+
+        :param start_xid: Первый xid.
+        :param end_xid: Граница xid (не включается) или None.
+        :param limit: Максимальное число событий.
+        :param session: Сессия текущего запроса.
+        :return: Строки (xid, source, op, row_id).
+        """
+        async with session_scope(session) as db_session:
+            query = (
+                select(cls.model.xid, cls.model.source, cls.model.op, cls.model.row_id)
+                .where(
+                    cls.model.xid >= start_xid,
+                    cls.model.op != ChangeOp.PRUNED.value,
+                )
+                .order_by(cls.model.xid, cls.model.id)
+                .limit(limit)
+            )
+            if end_xid is not None:
+                query = query.where(cls.model.xid < end_xid)
+            result = await db_session.execute(query)
+            return result.all()
+
+    @classmethod
+    async def pruned_before(cls, session: AsyncSession | None = None) -> int | None:
+        """
+        Граница последней очистки журнала: события с меньшим xid удалены.
+
+        :param session: Сессия текущего запроса.
+        :return: xid границы или None, если журнал не очищался.
+        """
+        async with session_scope(session) as db_session:
+            # Отметка очистки — самая ранняя строка журнала.
+            query = select(cls.model.xid, cls.model.op).order_by(cls.model.xid).limit(1)
+            first = (await db_session.execute(query)).first()
+            if first is None or first.op != ChangeOp.PRUNED.value:
+                return None
+            return first.xid + 1
+
+    @classmethod
+    async def prune(cls, retention: int, session: AsyncSession | None = None) -> int:
+        """
+        Удалить события старше retention секунд и оставить отметку очистки.
+
+        По отметке клиент, отставший больше чем на retention, узнаёт, что
+        пропущенные изменения уже не восстановить, и перечитывает списки.
+
+        :param retention: Сколько секунд хранить события.
+        :param session: Сессия текущего запроса.
+        :return: Количество удалённых событий.
+        """
+        async with session_scope(session) as db_session:
+            locked = await db_session.execute(
+                select(func.pg_try_advisory_xact_lock(PRUNE_LOCK_KEY))
+            )
+            if not locked.scalar_one():
+                return 0
+
+            # Граница — xid первой транзакции, которую нужно сохранить:
+            # события одной транзакции удаляются только вместе.
+            keep_from = (
+                select(func.min(cls.model.xid))
+                .where(
+                    cls.model.created_at >= func.now() - timedelta(seconds=retention),
+                    cls.model.op != ChangeOp.PRUNED.value,
+                )
+                .scalar_subquery()
+            )
+            boundary = (
+                await db_session.execute(
+                    select(
+                        func.coalesce(
+                            keep_from,
+                            _xid(func.pg_snapshot_xmin(func.pg_current_snapshot())),
+                        )
+                    )
+                )
+            ).scalar_one()
+
+            result = await db_session.execute(
+                delete(cls.model).where(
+                    cls.model.xid < boundary, cls.model.op != ChangeOp.PRUNED.value
+                )
+            )
+            if result.rowcount:
+                await db_session.execute(
+                    delete(cls.model).where(cls.model.op == ChangeOp.PRUNED.value)
+                )
+                await db_session.execute(
+                    insert(cls.model).values(
+                        xid=boundary - 1, source="", op=ChangeOp.PRUNED.value
+                    )
+                )
+            return result.rowcount
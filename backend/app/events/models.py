@@ -0,0 +1,27 @@
+from sqlalchemy import BigInteger, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base, int_pk
+
+
+class ChangeEvent(Base):
+    """
+    Журнал изменений заказов и путевых листов для ленты /events.
+
+    Строки добавляют триггеры на orders и tripsheets в той же транзакции,
+    что и изменение, поэтому откаченное изменение в журнал не попадает.
+    xid — номер этой транзакции: лента отдаёт изменения транзакциями
+    в порядке xid (см. app.events.broadcaster).
+    """
+
+    __tablename__ = "change_events"
+
+    id: Mapped[int_pk] = mapped_column(BigInteger)
+    xid: Mapped[int] = mapped_column(
+        BigInteger,
+        server_default=text("pg_current_xact_id()::text::bigint"),
+        index=True,
+    )
+    source: Mapped[str] = mapped_column(String(16))
+    op: Mapped[str] = mapped_column(String(8))
+    row_id: Mapped[int | None]
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.events.broadcaster import change_broadcaster, format_message, reset_message
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/events",
+    tags=["События"],
+)
+
+# Через сколько миллисекунд EventSource переподключается после обрыва.
+RETRY_MS = 3000
+# Комментарий SSE: не даёт прокси закрыть простаивающее соединение
+# и обнаруживает отключившегося клиента.
+HEARTBEAT = b": ping\n\n"
+
+
+@router.get(
+    "/",
+    response_class=StreamingResponse,
+    summary="Лента изменений заказов и путевых листов",
+    description=(
+        "Server-Sent Events: событие `changes` на каждую транзакцию, изменившую "
+        "заказы или путевые листы, со списком изменений "
+        '`{"source": "orders", "op": "update", "id": 5, "data": {...}}`. '
+        "`data` — строка в том же виде, что в `GET /orders/` и "
+        "`GET /tripsheets/?expand=vehicle,order`; у `delete` её нет, "
+        "`reset` означает, что список нужно перечитать целиком. Событие "
+        "`ready` отмечает, что пропущенные изменения отправлены. При "
+        "переподключении EventSource передаёт `Last-Event-ID` и получает "
+        "только то, что пропустил."
+    ),
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_events(
+    last_event_id: str | None = Header(None),
+) -> StreamingResponse:
+    async def generate() -> AsyncIterator[bytes]:
+        subscriber = await change_broadcaster.subscribe()
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            if last_event_id is not None:
+                try:
+                    cursor = int(last_event_id)
+                except ValueError:
+                    yield reset_message(subscriber.start)
+                else:
+                    for message in await change_broadcaster.replay(
+                        cursor, subscriber.start
+                    ):
+                        yield message
+            yield format_message("ready", subscriber.start, {})
+
+            # Отключённый за переполнение клиент дочитывает очередь и
+            # переподключается: остальное он получит из журнала.
+            while not (subscriber.overflowed and subscriber.queue.empty()):
+                try:
+                    yield await asyncio.wait_for(
+                        subscriber.queue.get(), settings.EVENTS_HEARTBEAT
+                    )
+                except TimeoutError:
+                    yield HEARTBEAT
+        finally:
+            change_broadcaster.unsubscribe(subscriber)
+
+    logger.info("Подключение к ленте изменений, Last-Event-ID: %s", last_event_id)
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
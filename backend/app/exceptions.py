@@ -74,3 +74,28 @@ InvalidRegisterToken = HTTPException(
     status_code=status.HTTP_403_FORBIDDEN,
     detail="Неверный токен регистрации",
 )
+InvalidCursorException = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Неверный курсор пагинации",
+)
+PasswordHashingBusyException = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Сервис авторизации перегружен, повторите попытку позже",
+    headers={"Retry-After": "1"},
+)
+UnsupportedBulkFormatException = HTTPException(
+    status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+    detail="Поддерживаются только форматы application/x-ndjson и text/csv",
+)
+InvalidTimeRangeException = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Конец интервала должен быть позже его начала",
+)
+InvalidDateRangeException = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Дата начала периода не может быть позже даты окончания",
+)
+TooManyIdsException = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Слишком много идентификаторов в одном запросе",
+)
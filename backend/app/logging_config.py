@@ -1,34 +1,164 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+from datetime import UTC, datetime
 from logging.config import dictConfig
+from typing import Any
+
+import orjson
+
+from app.config import settings
+from app.profiling.prometheus import Counter, registry
+from app.request_context import current_request
+
+log_records_dropped = registry.register(
+    Counter(
+        "log_records_dropped_total",
+        "Записи лога, отброшенные из-за переполненной очереди",
+    )
+)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Добавляет к записи id запроса и маршрут и отбирает INFO-записи.
+
+    Работает в потоке, где вызван логгер, до постановки записи в очередь:
+    контекст запроса есть только там. Записи уровня INFO и ниже из запроса,
+    не попавшего в выборку (LOG_SAMPLE_RATE), отбрасываются до
+    форматирования сообщения; WARNING и выше пишутся всегда.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request = current_request()
+        if request is None:
+            return True
+        record.request_id = request.id
+        record.method = request.method
+        record.route = request.route
+        return request.sampled or record.levelno > logging.INFO
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Передаёт записи в очередь, которую разбирает поток QueueListener.
+
+    Вызов логгера не ждёт вывода: сообщение собирается из аргументов
+    (они могут измениться после вызова), а форматирование в JSON и запись
+    в поток идут в потоке слушателя. При переполненной очереди (медленный
+    приёмник логов) запись отбрасывается и учитывается в
+    log_records_dropped_total — цикл событий не блокируется.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Копия, как в QueueHandler.prepare, но без copy.copy (втрое дороже).
+        prepared = logging.LogRecord.__new__(logging.LogRecord)
+        prepared.__dict__.update(record.__dict__)
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = logging.Formatter().formatException(record.exc_info)
+            prepared.exc_info = None
+        return prepared
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc()
+
+
+class JSONFormatter(logging.Formatter):
+    """Запись лога одной строкой JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in ("request_id", "method", "route"):
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return orjson.dumps(entry, default=str).decode()
+
 
 LOGGING_CONFIG = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
         "default": {
-            "format": "[%(asctime)s] %(levelname)s in %(module)s: %(message)s",
+            "format": "[%(asctime)s] %(levelname)s in %(module)s "
+            "[%(request_id)s]: %(message)s",
+            "defaults": {"request_id": "-"},
+        },
+        "json": {
+            "()": JSONFormatter,
+        },
+    },
+    "filters": {
+        "request_context": {
+            "()": RequestContextFilter,
         },
     },
     "handlers": {
         "default": {
             "level": "DEBUG",
-            "formatter": "default",
+            "formatter": "json" if settings.LOG_JSON else "default",
             "class": "logging.StreamHandler",
         },
+        "queue": {
+            "class": "app.logging_config.NonBlockingQueueHandler",
+            "filters": ["request_context"],
+            "handlers": ["default"],
+            "queue": {"()": queue.Queue, "maxsize": settings.LOG_QUEUE_SIZE},
+            "respect_handler_level": True,
+        },
     },
     "root": {
         "level": "INFO",
-        "handlers": ["default"],
+        "handlers": ["queue"],
     },
     "loggers": {
+        # Логи uvicorn идут через ту же очередь, а не напрямую в stderr.
+        "uvicorn": {
+            "handlers": [],
+            "propagate": True,
+        },
         "uvicorn.error": {
             "level": "INFO",
         },
         "uvicorn.access": {
             "level": "INFO",
+            "propagate": True,
         },
     },
 }
 
 
 def setup_logging():
+    previous = logging.getHandlerByName("queue")
+    if previous is not None:
+        previous.listener.stop()
+    # Поля записи, которых нет в выводе: их сбор — заметная доля цены вызова
+    # логгера (имя задачи asyncio, потока и процесса).
+    logging.logAsyncioTasks = False
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
     dictConfig(LOGGING_CONFIG)
+    listener = logging.getHandlerByName("queue").listener
+    listener.start()
+    # Дописать записи из очереди при завершении процесса.
+    atexit.register(listener.stop)
@@ -10,8 +10,8 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 sys.path.insert(0, dirname(dirname(abspath(__file__))))
 
+import app.models  # noqa: F401 — импорт регистрирует все модели в Base.metadata
 from app.database import DATABASE_URL, Base
-from app.models import Order, TripSheet, User, Vehicle
 
 print("Using DB:", DATABASE_URL)
 
@@ -0,0 +1,122 @@
+"""Add change events feed
+
+Revision ID: 13ebb0f939a3
+Revises: 80308bcfdef2
+Create Date: 2026-10-18 21:35:48.481961
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "13ebb0f939a3"
+down_revision: str | None = "80308bcfdef2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+EVENTS = {
+    "INSERT": "NEW TABLE AS new_rows",
+    "UPDATE": "NEW TABLE AS new_rows OLD TABLE AS old_rows",
+    "DELETE": "OLD TABLE AS old_rows",
+}
+
+# Команда, изменившая больше строк (массовая загрузка, seed), записывается
+# одним событием reset: клиентам дешевле перечитать список, чем получить
+# столько отдельных изменений.
+MAX_ROWS = 1000
+
+
+def record_changes_function(table: str) -> str:
+    """Функция триггера: записать изменённые строки в журнал и уведомить ленту."""
+    # Переходные таблицы доступны только в триггере на одно событие, а запрос
+    # к необъявленной таблице не планируется, пока до него не дойдёт ветка.
+    return f"""
+        CREATE FUNCTION change_events_{table}() RETURNS trigger AS $$
+        DECLARE
+            changed bigint;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                SELECT count(*) INTO changed FROM old_rows;
+            ELSE
+                SELECT count(*) INTO changed FROM new_rows;
+            END IF;
+            IF changed = 0 THEN
+                RETURN NULL;
+            END IF;
+
+            IF changed > {MAX_ROWS} THEN
+                INSERT INTO change_events (source, op) VALUES ('{table}', 'reset');
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO change_events (source, op, row_id)
+                SELECT '{table}', 'delete', id FROM old_rows;
+            ELSE
+                INSERT INTO change_events (source, op, row_id)
+                SELECT '{table}', lower(TG_OP), id FROM new_rows;
+            END IF;
+            -- Уведомление доставляется слушателям только после коммита;
+            -- одинаковые уведомления транзакции PostgreSQL объединяет в одно.
+            PERFORM pg_notify('change_events', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """  # noqa: S608 — в SQL подставляются только константы миграции
+
+
+def create_change_triggers(table: str) -> None:
+    op.execute(record_changes_function(table))
+    for event, transition in EVENTS.items():
+        op.execute(
+            f"CREATE TRIGGER change_events_{table}_{event.lower()} "
+            f"AFTER {event} ON {table} REFERENCING {transition} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION change_events_{table}()"
+        )
+
+
+def drop_change_triggers(table: str) -> None:
+    for event in EVENTS:
+        op.execute(f"DROP TRIGGER change_events_{table}_{event.lower()} ON {table}")
+    op.execute(f"DROP FUNCTION change_events_{table}()")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table(
+        "change_events",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "xid",
+            sa.BigInteger(),
+            server_default=sa.text("pg_current_xact_id()::text::bigint"),
+            nullable=False,
+        ),
+        sa.Column("source", sa.String(length=16), nullable=False),
+        sa.Column("op", sa.String(length=8), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_change_events_xid"), "change_events", ["xid"], unique=False
+    )
+    # ### end Alembic commands ###
+    create_change_triggers("orders")
+    create_change_triggers("tripsheets")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_change_triggers("tripsheets")
+    drop_change_triggers("orders")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index(op.f("ix_change_events_xid"), table_name="change_events")
+    op.drop_table("change_events")
+    # ### end Alembic commands ###
@@ -0,0 +1,50 @@
+"""Add check constraint on tripsheets time range
+
+Revision ID: 538fc6c5c244
+Revises: 76f0d9fb2d3e
+Create Date: 2026-10-18 22:19:34.613832
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "538fc6c5c244"
+down_revision: str | None = "76f0d9fb2d3e"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Сколько id нарушителей показывать в сообщении об ошибке.
+MAX_REPORTED = 20
+
+# excl_tripsheets_vehicle_time пропускает рейсы нулевой длины
+# (end_time = start_time): пустой интервал ни с чем не пересекается.
+INVALID_SQL = """
+    SELECT id FROM tripsheets
+    WHERE end_time <= start_time
+    ORDER BY id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Autogenerate не отслеживает CHECK-ограничения.
+    invalid = op.get_bind().execute(sa.text(INVALID_SQL)).scalars().all()
+    if invalid:
+        ids = ", ".join(map(str, invalid[:MAX_REPORTED]))
+        raise RuntimeError(
+            "Нельзя создать ck_tripsheets_end_after_start: путевые листы "
+            f"с end_time <= start_time ({len(invalid)}): {ids}. Исправьте или "
+            "удалите эти путевые листы и повторите миграцию."
+        )
+    op.create_check_constraint(
+        "ck_tripsheets_end_after_start", "tripsheets", "end_time > start_time"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("ck_tripsheets_end_after_start", "tripsheets", type_="check")
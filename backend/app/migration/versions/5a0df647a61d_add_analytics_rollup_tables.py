@@ -0,0 +1,169 @@
+"""Add analytics rollup tables
+
+Revision ID: 5a0df647a61d
+Revises: 6ad07f373268
+Create Date: 2026-10-18 20:37:28.015549
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "5a0df647a61d"
+down_revision: str | None = "6ad07f373268"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Дни, которые затрагивает строка таблицы: по ним пересчитываются сводки.
+DIRTY_DAYS = {
+    "orders": "order_date::date",
+    "tripsheets": (
+        "generate_series(date_trunc('day', start_time), end_time, "
+        "interval '1 day')::date"
+    ),
+}
+
+
+def mark_dirty_function(table: str) -> str:
+    """Функция триггера: записать в журнал дни изменённых строк таблицы."""
+    select = f"SELECT DISTINCT '{table}', {DIRTY_DAYS[table]} FROM {{}}"  # noqa: S608 — в SQL подставляются только константы миграции
+    # Переходные таблицы доступны только в триггере на одно событие, а запрос
+    # к необъявленной таблице не планируется, пока до него не дойдёт ветка.
+    return f"""
+        CREATE FUNCTION analytics_mark_{table}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO analytics_dirty_days (source, day)
+                {select.format("new_rows")};
+            ELSIF TG_OP = 'UPDATE' THEN
+                INSERT INTO analytics_dirty_days (source, day)
+                {select.format("new_rows")} UNION {select.format("old_rows")};
+            ELSE
+                INSERT INTO analytics_dirty_days (source, day)
+                {select.format("old_rows")};
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """
+
+
+def create_mark_dirty_triggers(table: str) -> None:
+    op.execute(mark_dirty_function(table))
+    for event, transition in (
+        ("INSERT", "NEW TABLE AS new_rows"),
+        ("UPDATE", "NEW TABLE AS new_rows OLD TABLE AS old_rows"),
+        ("DELETE", "OLD TABLE AS old_rows"),
+    ):
+        op.execute(
+            f"CREATE TRIGGER analytics_mark_{table}_{event.lower()} "
+            f"AFTER {event} ON {table} REFERENCING {transition} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION analytics_mark_{table}()"
+        )
+
+
+def drop_mark_dirty_triggers(table: str) -> None:
+    for event in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER analytics_mark_{table}_{event} ON {table}")
+    op.execute(f"DROP FUNCTION analytics_mark_{table}()")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table(
+        "analytics_dirty_days",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("source", sa.String(length=16), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "order_daily_stats",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "PENDING",
+                "IN_PROGRESS",
+                "COMPLETED",
+                name="orderstatus",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("orders_count", sa.BigInteger(), nullable=False),
+        sa.Column("revenue", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("day", "status"),
+    )
+    op.create_table(
+        "vehicle_daily_usage",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("vehicle_id", sa.Integer(), nullable=False),
+        sa.Column("busy_seconds", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("day", "vehicle_id"),
+    )
+    # ### end Alembic commands ###
+    create_mark_dirty_triggers("orders")
+    create_mark_dirty_triggers("tripsheets")
+    # Начальное заполнение: дальше сводки пересчитываются только по дням
+    # из журнала analytics_dirty_days.
+    op.execute(
+        """
+        INSERT INTO order_daily_stats (day, status, orders_count, revenue)
+        SELECT order_date::date, status, count(*), sum(cost)
+        FROM orders
+        GROUP BY 1, 2
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO vehicle_daily_usage (day, vehicle_id, busy_seconds)
+        SELECT
+            day::date,
+            vehicle_id,
+            sum(
+                extract(
+                    epoch FROM least(end_time, day + interval '1 day')
+                    - greatest(start_time, day)
+                )
+            )::bigint
+        FROM tripsheets,
+            generate_series(date_trunc('day', start_time), end_time, interval '1 day') AS day
+        WHERE end_time > day
+        GROUP BY 1, 2
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_mark_dirty_triggers("tripsheets")
+    drop_mark_dirty_triggers("orders")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table("vehicle_daily_usage")
+    op.drop_table("order_daily_stats")
+    op.drop_table("analytics_dirty_days")
+    # ### end Alembic commands ###
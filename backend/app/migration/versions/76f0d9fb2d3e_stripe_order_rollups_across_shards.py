@@ -0,0 +1,159 @@
+"""Stripe order rollups across shards
+
+Revision ID: 76f0d9fb2d3e
+Revises: 2adbfd5ac1e2
+Create Date: 2026-10-18 21:59:24.523402
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "76f0d9fb2d3e"
+down_revision: str | None = "2adbfd5ac1e2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Число полос сводок. Соединение пишет в полосу pg_backend_pid() % SHARDS:
+# все операторы одного соединения попадают в одну полосу, поэтому полосы
+# не добавляют новых порядков блокировки строк между транзакциями.
+SHARDS = 16
+
+DELTA_SOURCES = {
+    "INSERT": [("new_rows", 1)],
+    "UPDATE": [("new_rows", 1), ("old_rows", -1)],
+    "DELETE": [("old_rows", -1)],
+}
+
+
+def apply_deltas(event: str, sharded: bool) -> str:
+    changes = " UNION ALL ".join(
+        f"SELECT order_date::date AS day, status, {sign} * count(*) AS orders_count, "  # noqa: S608 — в SQL подставляются только константы миграции
+        f"{sign} * sum(cost) AS revenue FROM {rows} GROUP BY 1, 2"
+        for rows, sign in DELTA_SOURCES[event]
+    )
+    if sharded:
+        shard_column, shard_value = ", shard", ", target_shard"
+        conflict, own_shard = ", shard", "shard = target_shard AND "
+    else:
+        shard_column = shard_value = conflict = own_shard = ""
+    statement = f"""
+            WITH delta AS (
+                SELECT day, status, sum(orders_count) AS orders_count,
+                    sum(revenue) AS revenue
+                FROM ({changes}) AS changes
+                GROUP BY day, status
+                HAVING sum(orders_count) <> 0 OR sum(revenue) <> 0
+            ), daily AS (
+                INSERT INTO order_daily_stats AS s
+                    (day, status{shard_column}, orders_count, revenue)
+                SELECT day, status{shard_value}, orders_count, revenue FROM delta
+                ORDER BY day, status
+                ON CONFLICT (day, status{conflict}) DO UPDATE SET
+                    orders_count = s.orders_count + EXCLUDED.orders_count,
+                    revenue = s.revenue + EXCLUDED.revenue,
+                    updated_at = now()
+            )
+            INSERT INTO order_status_totals AS t
+                (status{shard_column}, orders_count, revenue)
+            SELECT status{shard_value}, sum(orders_count), sum(revenue) FROM delta
+            GROUP BY status
+            ORDER BY status
+            ON CONFLICT (status{conflict}) DO UPDATE SET
+                orders_count = t.orders_count + EXCLUDED.orders_count,
+                revenue = t.revenue + EXCLUDED.revenue,
+                updated_at = now();"""  # noqa: S608 — в SQL подставляются только константы миграции
+    if event != "INSERT":
+        # В полосе число заказов и выручка обнуляются не одновременно:
+        # -1 заказ за 100 и +1 заказ за 300 дают 0 заказов и 200 выручки.
+        statement += f"""
+            DELETE FROM order_daily_stats
+            WHERE {own_shard}orders_count = 0 AND revenue = 0
+                AND (day, status) IN (SELECT order_date::date, status FROM old_rows);"""  # noqa: S608 — в SQL подставляются только константы миграции
+    return statement
+
+
+def apply_orders_function(sharded: bool) -> str:
+    declare = (
+        f"""
+    DECLARE
+        target_shard smallint := pg_backend_pid() % {SHARDS};"""
+        if sharded
+        else ""
+    )
+    return f"""
+    CREATE OR REPLACE FUNCTION analytics_apply_orders() RETURNS trigger AS $${declare}
+    BEGIN
+        IF TG_OP = 'INSERT' THEN{apply_deltas("INSERT", sharded)}
+        ELSIF TG_OP = 'UPDATE' THEN{apply_deltas("UPDATE", sharded)}
+        ELSE{apply_deltas("DELETE", sharded)}
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+
+REBUILD_ORDER_ROLLUPS = [
+    """
+    INSERT INTO order_daily_stats (day, status, orders_count, revenue)
+    SELECT order_date::date, status, count(*), sum(cost)
+    FROM orders
+    GROUP BY 1, 2
+    """,
+    """
+    INSERT INTO order_status_totals (status, orders_count, revenue)
+    SELECT status, sum(orders_count), sum(revenue)
+    FROM order_daily_stats
+    GROUP BY status
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column(
+        "order_daily_stats",
+        sa.Column("shard", sa.SmallInteger(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "order_status_totals",
+        sa.Column("shard", sa.SmallInteger(), server_default="0", nullable=False),
+    )
+    # ### end Alembic commands ###
+    # Autogenerate не переносит изменения первичного ключа.
+    op.drop_constraint("order_daily_stats_pkey", "order_daily_stats")
+    op.create_primary_key(
+        "order_daily_stats_pkey", "order_daily_stats", ["day", "status", "shard"]
+    )
+    op.drop_constraint("order_status_totals_pkey", "order_status_totals")
+    op.create_primary_key(
+        "order_status_totals_pkey", "order_status_totals", ["status", "shard"]
+    )
+    op.execute(apply_orders_function(sharded=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Запись в orders ждёт конца отката: сводки без полос собираются заново
+    # по orders, и изменение не должно попасть мимо пересборки.
+    op.execute("LOCK TABLE orders IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(apply_orders_function(sharded=False))
+    op.execute("DELETE FROM order_daily_stats")
+    op.execute("DELETE FROM order_status_totals")
+    op.drop_constraint("order_status_totals_pkey", "order_status_totals")
+    op.drop_constraint("order_daily_stats_pkey", "order_daily_stats")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_column("order_status_totals", "shard")
+    op.drop_column("order_daily_stats", "shard")
+    # ### end Alembic commands ###
+    op.create_primary_key("order_status_totals_pkey", "order_status_totals", ["status"])
+    op.create_primary_key(
+        "order_daily_stats_pkey", "order_daily_stats", ["day", "status"]
+    )
+    for statement in REBUILD_ORDER_ROLLUPS:
+        op.execute(statement)
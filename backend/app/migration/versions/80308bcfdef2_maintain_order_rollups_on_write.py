@@ -0,0 +1,181 @@
+"""Maintain order rollups on write
+
+Revision ID: 80308bcfdef2
+Revises: 5a0df647a61d
+Create Date: 2026-10-18 20:42:26.318560
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "80308bcfdef2"
+down_revision: str | None = "5a0df647a61d"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+EVENTS = {
+    "INSERT": "NEW TABLE AS new_rows",
+    "UPDATE": "NEW TABLE AS new_rows OLD TABLE AS old_rows",
+    "DELETE": "OLD TABLE AS old_rows",
+}
+
+# Переходные таблицы, из которых складывается изменение сводок, и знак их
+# вклада: новые строки прибавляются, старые вычитаются.
+DELTA_SOURCES = {
+    "INSERT": [("new_rows", 1)],
+    "UPDATE": [("new_rows", 1), ("old_rows", -1)],
+    "DELETE": [("old_rows", -1)],
+}
+
+
+def apply_deltas(event: str) -> str:
+    changes = " UNION ALL ".join(
+        f"SELECT order_date::date AS day, status, {sign} * count(*) AS orders_count, "  # noqa: S608 — в SQL подставляются только константы миграции
+        f"{sign} * sum(cost) AS revenue FROM {rows} GROUP BY 1, 2"
+        for rows, sign in DELTA_SOURCES[event]
+    )
+    # Обновление, не затронувшее день, статус и стоимость, даёт нулевое
+    # изменение и не блокирует строки сводок. Строки сводок обновляются
+    # в порядке ключа, чтобы параллельные пакетные записи не взаимоблокировались.
+    statement = f"""
+            WITH delta AS (
+                SELECT day, status, sum(orders_count) AS orders_count,
+                    sum(revenue) AS revenue
+                FROM ({changes}) AS changes
+                GROUP BY day, status
+                HAVING sum(orders_count) <> 0 OR sum(revenue) <> 0
+            ), daily AS (
+                INSERT INTO order_daily_stats AS s (day, status, orders_count, revenue)
+                SELECT day, status, orders_count, revenue FROM delta
+                ORDER BY day, status
+                ON CONFLICT (day, status) DO UPDATE SET
+                    orders_count = s.orders_count + EXCLUDED.orders_count,
+                    revenue = s.revenue + EXCLUDED.revenue,
+                    updated_at = now()
+            )
+            INSERT INTO order_status_totals AS t (status, orders_count, revenue)
+            SELECT status, sum(orders_count), sum(revenue) FROM delta
+            GROUP BY status
+            ORDER BY status
+            ON CONFLICT (status) DO UPDATE SET
+                orders_count = t.orders_count + EXCLUDED.orders_count,
+                revenue = t.revenue + EXCLUDED.revenue,
+                updated_at = now();"""  # noqa: S608 — в SQL подставляются только константы миграции
+    if "old_rows" in EVENTS[event]:
+        statement += """
+            DELETE FROM order_daily_stats
+            WHERE orders_count = 0
+                AND (day, status) IN (SELECT order_date::date, status FROM old_rows);"""
+    return statement
+
+
+APPLY_ORDERS_FUNCTION = f"""
+    CREATE FUNCTION analytics_apply_orders() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN{apply_deltas("INSERT")}
+        ELSIF TG_OP = 'UPDATE' THEN{apply_deltas("UPDATE")}
+        ELSE{apply_deltas("DELETE")}
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+# Функция журнала из 5a0df647a61d: нужна, чтобы вернуть её при откате.
+MARK_ORDERS_FUNCTION = """
+    CREATE FUNCTION analytics_mark_orders() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO analytics_dirty_days (source, day)
+            SELECT DISTINCT 'orders', order_date::date FROM new_rows;
+        ELSIF TG_OP = 'UPDATE' THEN
+            INSERT INTO analytics_dirty_days (source, day)
+            SELECT DISTINCT 'orders', order_date::date FROM new_rows
+            UNION SELECT DISTINCT 'orders', order_date::date FROM old_rows;
+        ELSE
+            INSERT INTO analytics_dirty_days (source, day)
+            SELECT DISTINCT 'orders', order_date::date FROM old_rows;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+REBUILD_ORDER_ROLLUPS = [
+    "DELETE FROM order_daily_stats",
+    "DELETE FROM order_status_totals",
+    """
+    INSERT INTO order_daily_stats (day, status, orders_count, revenue)
+    SELECT order_date::date, status, count(*), sum(cost)
+    FROM orders
+    GROUP BY 1, 2
+    """,
+    """
+    INSERT INTO order_status_totals (status, orders_count, revenue)
+    SELECT status, sum(orders_count), sum(revenue)
+    FROM order_daily_stats
+    GROUP BY status
+    """,
+]
+
+
+def replace_orders_triggers(old: str, new: str, function: str) -> None:
+    for event in EVENTS:
+        op.execute(f"DROP TRIGGER analytics_{old}_orders_{event.lower()} ON orders")
+    op.execute(f"DROP FUNCTION analytics_{old}_orders()")
+    op.execute(function)
+    for event, transition in EVENTS.items():
+        op.execute(
+            f"CREATE TRIGGER analytics_{new}_orders_{event.lower()} "
+            f"AFTER {event} ON orders REFERENCING {transition} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION analytics_{new}_orders()"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table(
+        "order_status_totals",
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "PENDING",
+                "IN_PROGRESS",
+                "COMPLETED",
+                name="orderstatus",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("orders_count", sa.BigInteger(), nullable=False),
+        sa.Column("revenue", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("status"),
+    )
+    # ### end Alembic commands ###
+    # Запись в orders ждёт конца миграции: иначе её изменение не попало бы
+    # ни в пересчёт, ни в триггер.
+    op.execute("LOCK TABLE orders IN SHARE ROW EXCLUSIVE MODE")
+    replace_orders_triggers("mark", "apply", APPLY_ORDERS_FUNCTION)
+    op.execute("DELETE FROM analytics_dirty_days WHERE source = 'orders'")
+    for statement in REBUILD_ORDER_ROLLUPS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    replace_orders_triggers("apply", "mark", MARK_ORDERS_FUNCTION)
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table("order_status_totals")
+    # ### end Alembic commands ###
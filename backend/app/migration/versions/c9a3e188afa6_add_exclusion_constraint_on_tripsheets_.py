@@ -0,0 +1,96 @@
+"""Add exclusion constraint on tripsheets vehicle time range
+
+Revision ID: c9a3e188afa6
+Revises: f2d4c5d243e7
+Create Date: 2026-10-18 18:51:20.531738
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c9a3e188afa6"
+down_revision: str | None = "f2d4c5d243e7"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# Сколько id нарушителей показывать в сообщении об ошибке.
+MAX_REPORTED = 20
+
+# До ограничения путевые листы проверялись только в приложении и не
+# атомарно, поэтому в таблице могут быть рейсы с концом раньше начала
+# (на них tsrange падает с ошибкой) и пересекающиеся рейсы одной машины.
+INVERTED_SQL = """
+    SELECT id FROM tripsheets
+    WHERE end_time < start_time
+    ORDER BY id
+"""
+
+# Рейс пересекается с более ранним рейсом машины, если начинается раньше,
+# чем заканчивается самый поздний из предыдущих. Пустые интервалы
+# (end_time = start_time) ни с чем не пересекаются.
+OVERLAPPING_SQL = """
+    SELECT id FROM (
+        SELECT id, start_time, max(end_time) OVER (
+            PARTITION BY vehicle_id ORDER BY start_time, id
+            ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+        ) AS previous_end
+        FROM tripsheets
+        WHERE end_time > start_time
+    ) AS t
+    WHERE start_time < previous_end
+    ORDER BY id
+"""
+
+
+def check_existing_rows() -> None:
+    """
+    Остановить миграцию, если ограничение нельзя создать на текущих данных.
+
+    Такие строки не исправляются автоматически: какой из пересекающихся
+    рейсов верный, решает диспетчер. Их нужно исправить или удалить
+    и запустить миграцию снова.
+    """
+    connection = op.get_bind()
+    problems = []
+    inverted = connection.execute(sa.text(INVERTED_SQL)).scalars().all()
+    if inverted:
+        ids = ", ".join(map(str, inverted[:MAX_REPORTED]))
+        problems.append(
+            f"путевые листы с end_time < start_time ({len(inverted)}): {ids}"
+        )
+    overlapping = connection.execute(sa.text(OVERLAPPING_SQL)).scalars().all()
+    if overlapping:
+        ids = ", ".join(map(str, overlapping[:MAX_REPORTED]))
+        problems.append(
+            "путевые листы, пересекающиеся с более ранним рейсом той же машины "
+            f"({len(overlapping)}): {ids}"
+        )
+    if problems:
+        raise RuntimeError(
+            "Нельзя создать excl_tripsheets_vehicle_time: "
+            + "; ".join(problems)
+            + ". Исправьте или удалите эти путевые листы и повторите миграцию."
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    check_existing_rows()
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.create_exclude_constraint(
+        "excl_tripsheets_vehicle_time",
+        "tripsheets",
+        ("vehicle_id", "="),
+        (sa.func.tsrange(sa.column("start_time"), sa.column("end_time")), "&&"),
+        using="gist",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("excl_tripsheets_vehicle_time", "tripsheets")
@@ -1,11 +1,25 @@
 __all__ = [
+    "AnalyticsDirtyDay",
+    "ChangeEvent",
     "Order",
+    "OrderDailyStats",
+    "OrderStatusTotals",
+    "OutboxMessage",
     "TripSheet",
     "User",
     "Vehicle",
+    "VehicleDailyUsage",
 ]
 
+from app.analytics.models import (
+    AnalyticsDirtyDay,
+    OrderDailyStats,
+    OrderStatusTotals,
+    VehicleDailyUsage,
+)
+from app.events.models import ChangeEvent
 from app.orders.models import Order
+from app.outbox.models import OutboxMessage
 from app.trip_sheets.models import TripSheet
 from app.users.models import User
 from app.vehicles.models import Vehicle
@@ -0,0 +1,104 @@
+import codecs
+import csv
+from collections.abc import AsyncIterator, Callable
+
+from pydantic import ValidationError
+
+from app.exceptions import UnsupportedBulkFormatException
+from app.orders.schemas import OrderBulkError, OrderCreate
+
+BULK_CHUNK_SIZE = 5000
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+CSV_MEDIA_TYPES = ("text/csv",)
+
+OrderChunk = tuple[list[tuple[int, OrderCreate]], list[OrderBulkError]]
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Разбить поток байтов UTF-8 на строки, не дожидаясь конца тела запроса.
+
+    :param stream: Тело запроса по частям.
+    :return: Асинхронный итератор строк без символов перевода строки.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in stream:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+def _format_errors(error: ValidationError | ValueError | TypeError) -> list[str]:
+    if isinstance(error, ValidationError):
+        return [
+            f"{'.'.join(str(loc) for loc in err['loc']) or 'row'}: {err['msg']}"
+            for err in error.errors()
+        ]
+    return [str(error)]
+
+
+def _csv_parser(header: str) -> Callable[[str], OrderCreate]:
+    columns = next(csv.reader([header]))
+
+    def parse(line: str) -> OrderCreate:
+        values = next(csv.reader([line]))
+        if len(values) != len(columns):
+            raise ValueError(
+                f"Ожидалось колонок: {len(columns)}, получено: {len(values)}"
+            )
+        return OrderCreate.model_validate(dict(zip(columns, values, strict=True)))
+
+    return parse
+
+
+async def read_order_chunks(
+    stream: AsyncIterator[bytes],
+    media_type: str,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> AsyncIterator[OrderChunk]:
+    """
+    Прочитать и провалидировать заказы из NDJSON или CSV пачками.
+
+    В CSV первая строка — заголовок с именами полей OrderCreate. Каждая
+    запись занимает одну строку; пустые строки пропускаются.
+
+    :param stream: Тело запроса по частям.
+    :param media_type: Тип содержимого запроса.
+    :param chunk_size: Количество строк в пачке.
+    :return: Пачки из валидных заказов с номерами строк и ошибок по строкам.
+    """
+    lines = iter_lines(stream)
+
+    if media_type in NDJSON_MEDIA_TYPES:
+        parse = OrderCreate.model_validate_json
+    elif media_type in CSV_MEDIA_TYPES:
+        header = await anext(lines, "")
+        parse = _csv_parser(header)
+    else:
+        raise UnsupportedBulkFormatException
+
+    rows: list[tuple[int, OrderCreate]] = []
+    errors: list[OrderBulkError] = []
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+
+        row_number += 1
+        try:
+            rows.append((row_number, parse(line)))
+        except (ValidationError, ValueError, TypeError) as e:
+            errors.append(OrderBulkError(row=row_number, errors=_format_errors(e)))
+
+        if len(rows) + len(errors) >= chunk_size:
+            yield rows, errors
+            rows, errors = [], []
+
+    if rows or errors:
+        yield rows, errors
@@ -1,64 +1,333 @@
+from collections.abc import AsyncIterator, Sequence
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import and_, select
+from pydantic import BaseModel
+from sqlalchemy import (
+    Row,
+    RowMapping,
+    and_,
+    exists,
+    literal,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dao.base import BaseDAO
-from app.database import async_session_maker
+from app.dao.base import BaseDAO, Projection
+from app.database import execute_read, session_scope
 from app.enums import OrderStatus
 from app.exceptions import OrderNotFoundException
-from app.models import Order
+from app.models import Order, TripSheet
+from app.orders.pagination import OrderCursor
+from app.orders.schemas import OrderCreate
+
+COPY_COLUMNS = ("client_name", "cost", "order_date", "status", "created_by_id")
+
+
+def contains_pattern(value: str) -> str:
+    """
+    Шаблон LIKE «содержит value».
+
+    %, _ и обратная косая черта в value экранируются (обратная косая черта —
+    символ экранирования LIKE в PostgreSQL по умолчанию), поэтому ввод
+    пользователя ищется как обычный текст, а не как шаблон.
+    """
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
 
 
 class OrderDAO(BaseDAO):
     model = Order
 
     @classmethod
-    async def find_all_filtered(
+    def _build_filters(  # noqa: PLR0913 — параметры повторяют фильтры GET /orders/
         cls,
+        *,
         client_name: str | None = None,
         cost_from: int | None = None,
         cost_to: int | None = None,
         order_date: str | None = None,
         status: OrderStatus | None = None,
+        ids: Sequence[int] | None = None,
+    ) -> list[Any]:
+        filters = []
+
+        if ids is not None:
+            filters.append(cls._id_in(ids))
+
+        if client_name:
+            filters.append(Order.client_name.ilike(contains_pattern(client_name)))
+
+        if cost_from is not None:
+            filters.append(cls.model.cost >= cost_from)
+
+        if cost_to is not None:
+            filters.append(cls.model.cost <= cost_to)
+
+        if status:
+            filters.append(Order.status == status)
+
+        if order_date:
+            try:
+                parsed_date = datetime.strptime(order_date, "%Y-%m-%d")
+                start = datetime.combine(parsed_date, datetime.min.time())
+                end = datetime.combine(parsed_date, datetime.max.time())
+                filters.append(Order.order_date.between(start, end))
+            except ValueError as e:
+                raise ValueError("order_date должен быть в формате YYYY-MM-DD") from e
+
+        return filters
+
+    @classmethod
+    def _filtered_query(
+        cls,
+        cursor: OrderCursor | None = None,
+        columns: Projection | None = None,
+        schema: type[BaseModel] | None = None,
+        **filter_by: Any,
+    ):
+        filters = cls._build_filters(**filter_by)
+
+        if cursor is not None:
+            filters.append(tuple_(Order.order_date, Order.id) < tuple_(*cursor))
+
+        query = cls._select(columns, schema).order_by(
+            Order.order_date.desc(), Order.id.desc()
+        )
+        if filters:
+            query = query.where(and_(*filters))
+        return query
+
+    @classmethod
+    async def find_all_filtered(  # noqa: PLR0913 — параметры повторяют фильтры GET /orders/
+        cls,
+        *,
+        client_name: str | None = None,
+        cost_from: int | None = None,
+        cost_to: int | None = None,
+        order_date: str | None = None,
+        status: OrderStatus | None = None,
+        ids: Sequence[int] | None = None,
+        cursor: OrderCursor | None = None,
+        limit: int | None = None,
+        columns: Projection | None = None,
+        schema: type[BaseModel] | None = None,
+        as_mapping: bool = False,
+        session: AsyncSession | None = None,
+    ) -> list[Order] | list[Row[Any]] | list[RowMapping]:
+        """
+        Найти заказы по фильтрам, от новых к старым.
+
+        Пагинация keyset: страница начинается сразу после позиции ``cursor``
+        по ключу (order_date, id), поэтому стоимость запроса не зависит от
+        номера страницы.
+
+        :param ids: Выбрать только заказы с этими идентификаторами.
+        :param cursor: Позиция последнего заказа предыдущей страницы.
+        :param limit: Максимальное количество заказов на странице.
+        :param columns: Колонки проекции, как в BaseDAO.find_all.
+        :param schema: Схема ответа, колонки берутся по её полям.
+        :param as_mapping: Вернуть строки проекции как RowMapping.
+        :param session: Сессия текущего запроса.
+        :return: Список заказов или строк проекции.
+        """
+        async with session_scope(session) as db_session:
+            query = cls._filtered_query(
+                cursor=cursor,
+                columns=columns,
+                schema=schema,
+                client_name=client_name,
+                cost_from=cost_from,
+                cost_to=cost_to,
+                order_date=order_date,
+                status=status,
+                ids=ids,
+            )
+            if limit is not None:
+                query = query.limit(limit)
+
+            result = await execute_read(db_session, query)
+            if columns is None and schema is None:
+                return result.scalars().all()
+            return list(result.mappings().all() if as_mapping else result.all())
+
+    @classmethod
+    async def fingerprint(
+        cls,
+        cursor: OrderCursor | None = None,
+        limit: int | None = None,
+        session: AsyncSession | None = None,
+        **filter_by: Any,
+    ) -> tuple[Any, ...]:
+        """
+        Отпечаток страницы, которую вернёт find_all_filtered.
+
+        Как BaseDAO.fingerprint, но с той же пагинацией, что и у страницы.
+
+        :param cursor: Позиция последнего заказа предыдущей страницы.
+        :param limit: Размер страницы, как в find_all_filtered.
+        :param session: Сессия текущего запроса.
+        :param filter_by: Параметры фильтрации, как в find_all_filtered.
+        :return: Кортеж (count, max(updated_at), sum(updated_at)).
+        """
+        async with session_scope(session) as db_session:
+            query = cls._filtered_query(
+                cursor=cursor, columns=[Order.updated_at], **filter_by
+            )
+            if limit is not None:
+                query = query.limit(limit)
+            return await cls._fingerprint(query, db_session)
+
+    @classmethod
+    async def search_by_client_name(
+        cls, query: str, limit: int = 20, session: AsyncSession | None = None
     ) -> list[Order]:
-        async with async_session_maker() as session:
-            query = select(cls.model)
-            filters = []
+        """
+        Найти заказы по похожести имени клиента на строку поиска.
+
+        Условие ``query <% client_name`` (word_similarity не ниже
+        pg_trgm.word_similarity_threshold, по умолчанию 0.6) находит и
+        подстроки, и имена с опечатками. Сортировка по расстоянию ``<->>``
+        идёт по GiST-индексу ix_orders_client_name_trgm_gist: индекс сам
+        отдаёт строки от самых похожих, и запрос читает только первые
+        limit из них, сколько бы строк ни подходило. Порядок строк
+        с одинаковой похожестью не определён: второй ключ сортировки
+        заставил бы сортировать всю группу одинаково похожих.
+
+        :param query: Строка поиска.
+        :param limit: Максимальное количество результатов.
+        :param session: Сессия текущего запроса.
+        :return: Список заказов, самые похожие первыми.
+        """
+        async with session_scope(session) as db_session:
+            stmt = (
+                select(cls.model)
+                .where(
+                    literal(query).op("<%", is_comparison=True)(cls.model.client_name)
+                )
+                .order_by(cls.model.client_name.op("<->>")(query))
+                .limit(limit)
+            )
+            result = await execute_read(db_session, stmt)
+            return list(result.scalars().all())
+
+    @classmethod
+    async def stream_filtered(
+        cls,
+        batch_size: int = 1000,
+        columns: Projection | None = None,
+        schema: type[BaseModel] | None = None,
+        **filter_by: Any,
+    ) -> AsyncIterator[list[Order] | list[Row[Any]]]:
+        """
+        Потоково выдавать заказы по фильтрам пачками через серверный курсор.
+
+        :param batch_size: Количество строк, забираемых из курсора за раз.
+        :param columns: Колонки проекции, как в BaseDAO.find_all.
+        :param schema: Схема ответа, колонки берутся по её полям.
+        :param filter_by: Параметры фильтрации, как в find_all_filtered.
+        :return: Асинхронный итератор пачек заказов или строк.
+        """
+        async with session_scope() as session:
+            query = cls._filtered_query(
+                columns=columns, schema=schema, **filter_by
+            ).execution_options(yield_per=batch_size)
+            result = await session.stream(query)
+            if columns is not None or schema is not None:
+                async for partition in result.partitions():
+                    yield partition
+                return
 
-            if client_name:
-                filters.append(Order.client_name.ilike(f"%{client_name}%"))
+            async for partition in result.scalars().partitions():
+                yield partition
+                session.expunge_all()
 
-            if cost_from is not None:
-                filters.append(cls.model.cost >= cost_from)
+    @classmethod
+    async def lock_pending(cls, session: AsyncSession | None = None) -> list[int]:
+        """
+        Заблокировать ожидающие заказы без путевых листов до конца
+        транзакции, старые первыми.
+
+        Заказы, уже заблокированные другой транзакцией, пропускаются
+        (SKIP LOCKED), поэтому параллельные распределения их не делят.
 
-            if cost_to is not None:
-                filters.append(cls.model.cost <= cost_to)
+        :param session: Сессия текущего запроса.
+        :return: Идентификаторы заказов в порядке order_date.
+        """
+        async with session_scope(session) as db_session:
+            query = (
+                select(cls.model.id)
+                .where(
+                    cls.model.status == OrderStatus.PENDING,
+                    ~exists().where(TripSheet.order_id == cls.model.id),
+                )
+                .order_by(cls.model.order_date, cls.model.id)
+                .with_for_update(skip_locked=True)
+            )
+            result = await db_session.execute(query)
+            return list(result.scalars().all())
+
+    @classmethod
+    async def lock_unassigned(cls, order_id: int, session: AsyncSession) -> bool:
+        """
+        Заблокировать заказ до конца транзакции и проверить, что на него
+        нет путевых листов.
 
-            if status:
-                filters.append(Order.status == status)
+        Путевые листы проверяются отдельным запросом уже под блокировкой:
+        его снимок видит путевые листы, зафиксированные, пока ждали
+        блокировку заказа.
 
-            if order_date:
-                try:
-                    parsed_date = datetime.strptime(order_date, "%Y-%m-%d")
-                    start = datetime.combine(parsed_date, datetime.min.time())
-                    end = datetime.combine(parsed_date, datetime.max.time())
-                    filters.append(Order.order_date.between(start, end))
-                except ValueError as e:
-                    raise ValueError(
-                        "order_date должен быть в формате YYYY-MM-DD"
-                    ) from e
+        :param order_id: Идентификатор заказа.
+        :param session: Сессия транзакции.
+        :return: False, если заказа нет или на него есть путевой лист.
+        """
+        query = select(cls.model.id).where(cls.model.id == order_id).with_for_update()
+        result = await session.execute(query)
+        if result.scalar_one_or_none() is None:
+            return False
+        result = await session.execute(
+            select(~exists().where(TripSheet.order_id == order_id))
+        )
+        return result.scalar_one()
+
+    @classmethod
+    async def set_status_many(
+        cls,
+        order_ids: Sequence[int],
+        status: OrderStatus,
+        session: AsyncSession | None = None,
+    ) -> int:
+        """
+        Выставить статус нескольким заказам одним UPDATE.
 
-            if filters:
-                query = query.where(and_(*filters))
+        :param order_ids: Идентификаторы заказов.
+        :param status: Новый статус.
+        :param session: Сессия текущего запроса.
+        :return: Количество обновлённых заказов.
+        """
+        if not order_ids:
+            return 0
 
-            result = await session.execute(query)
-            return result.scalars().all()
+        async with session_scope(session) as db_session:
+            query = (
+                update(cls.model)
+                .where(cls._id_in(order_ids))
+                .values(status=status)
+                .execution_options(synchronize_session=False)
+            )
+            result = await db_session.execute(query)
+            cls._invalidate_cache(db_session, order_ids)
+            return result.rowcount
 
     @classmethod
-    async def update_status(cls, order_id: int, status: str):
-        async with async_session_maker() as session:
+    async def update_status(
+        cls, order_id: int, status: str, session: AsyncSession | None = None
+    ):
+        async with session_scope(session) as db_session:
             query = select(cls.model).filter(Order.id == order_id)
-            result = await session.execute(query)
+            result = await db_session.execute(query)
             order = result.scalar_one_or_none()
 
             if not order:
@@ -66,5 +335,51 @@ class OrderDAO(BaseDAO):
 
             order.status = status
 
-            await session.commit()
+            await db_session.flush()
+            cls._invalidate_cache(db_session, [order_id])
             return order
+
+    @classmethod
+    async def copy_orders(
+        cls, orders: list[OrderCreate], session: AsyncSession | None = None
+    ) -> int:
+        """
+        Загрузить заказы одной командой COPY.
+
+        Статус выставляется явно, так как значение по умолчанию задаётся
+        на стороне Python и COPY его не применяет.
+
+        :param orders: Провалидированные заказы.
+        :param session: Сессия текущего запроса.
+        :return: Количество загруженных заказов.
+        """
+        if not orders:
+            return 0
+
+        records = [
+            (
+                order.client_name,
+                order.cost,
+                order.order_date,
+                OrderStatus.PENDING.name,
+                order.created_by_id,
+            )
+            for order in orders
+        ]
+        async with session_scope(session) as db_session:
+            connection = await db_session.connection()
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = raw_connection.driver_connection
+            # Адаптер asyncpg открывает транзакцию лениво, перед первым запросом.
+            # COPY идёт мимо адаптера, поэтому без этого он выполнился бы
+            # в автокоммите и не откатился бы вместе с транзакцией запроса.
+            if not driver_connection.is_in_transaction():
+                await db_session.execute(select(1))
+
+            await driver_connection.copy_records_to_table(
+                cls.model.__tablename__,
+                records=records,
+                columns=COPY_COLUMNS,
+            )
+            cls._invalidate_cache(db_session, [])
+            return len(records)
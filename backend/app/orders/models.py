@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, Enum, ForeignKey
+from sqlalchemy import DateTime, Enum, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base, int_pk
@@ -14,7 +14,7 @@ if TYPE_CHECKING:
 class Order(Base):
     id: Mapped[int_pk]
     client_name: Mapped[str]
-    cost: Mapped[int]
+    cost: Mapped[int] = mapped_column(index=True)
     order_date: Mapped[datetime] = mapped_column(
         DateTime,
         default=datetime.now,
@@ -27,6 +27,7 @@ class Order(Base):
     created_by_id: Mapped[int] = mapped_column(
         ForeignKey("users.id"),
         nullable=False,
+        index=True,
     )
     created_by: Mapped["User"] = relationship(
         back_populates="orders",
@@ -36,6 +37,27 @@ class Order(Base):
         back_populates="order", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_orders_order_date_id", "order_date", "id"),
+        # Фильтр по статусу с сортировкой и пагинацией по (order_date, id).
+        Index("ix_orders_status_order_date_id", "status", "order_date", "id"),
+        # Триграммный индекс: ускоряет фильтр ILIKE '%...%'.
+        Index(
+            "ix_orders_client_name_trgm",
+            "client_name",
+            postgresql_using="gin",
+            postgresql_ops={"client_name": "gin_trgm_ops"},
+        ),
+        # GiST отдаёт строки сразу в порядке похожести (ORDER BY <->>), поэтому
+        # поиск читает только первые limit строк. GIN так не умеет.
+        Index(
+            "ix_orders_client_name_trgm_gist",
+            "client_name",
+            postgresql_using="gist",
+            postgresql_ops={"client_name": "gist_trgm_ops"},
+        ),
+    )
+
     def __str__(self):
         return (
             f"{self.__class__.__name__}(id={self.id}, client_name={self.client_name}, "
@@ -0,0 +1,37 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import Row
+
+from app.exceptions import InvalidCursorException
+from app.models import Order
+
+OrderCursor = tuple[datetime, int]
+
+
+def encode_cursor(order: Order | Row) -> str:
+    """
+    Закодировать позицию заказа в непрозрачный курсор.
+
+    :param order: Последний заказ (или строка с order_date и id) на странице.
+    :return: Курсор в формате base64url.
+    """
+    raw = json.dumps([order.order_date.isoformat(), order.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> OrderCursor:
+    """
+    Раскодировать курсор в пару (order_date, id).
+
+    :param cursor: Курсор, полученный из заголовка X-Next-Cursor.
+    :return: Кортеж (order_date, id).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        order_date, order_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(order_date), int(order_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursorException from e
@@ -1,22 +1,30 @@
+from typing import Any
+
+from fastapi import Query
+
+from app.batch import IDS_DESCRIPTION, IDS_PATTERN, parse_ids
 from app.enums import OrderStatus
 
 
 class RBOrder:
-    def __init__(
+    def __init__(  # noqa: PLR0913 — по параметру на фильтр GET /orders/
         self,
+        *,
         client_name: str | None = None,
         cost_from: int | None = None,
         cost_to: int | None = None,
         order_date: str | None = None,
         status: OrderStatus | None = None,
+        ids: str | None = Query(None, pattern=IDS_PATTERN, description=IDS_DESCRIPTION),
     ):
         self.client_name = client_name
         self.cost_from = cost_from
         self.cost_to = cost_to
         self.order_date = order_date
         self.status = status
+        self.ids = parse_ids(ids)
 
-    def to_dict(self) -> dict[str, int]:
+    def to_dict(self) -> dict[str, Any]:
         return {
             k: v
             for k, v in {
@@ -25,6 +33,7 @@ class RBOrder:
                 "cost_to": self.cost_to,
                 "order_date": self.order_date,
                 "status": self.status,
+                "ids": self.ids,
             }.items()
             if v is not None
         }
@@ -1,17 +1,44 @@
 import logging
+from collections.abc import AsyncIterator
 
-from fastapi import APIRouter, Body, Depends, Path, Response, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import etag_headers, not_modified, response_cache, weak_etag
+from app.database import get_session
 from app.exceptions import OrderNotFoundException, UserNotFoundException
+from app.orders.bulk import BULK_CHUNK_SIZE, read_order_chunks
 from app.orders.dao import OrderDAO
+from app.orders.pagination import decode_cursor, encode_cursor
 from app.orders.rb import RBOrder
-from app.orders.schemas import OrderCreate, OrderResponse
+from app.orders.schemas import (
+    OrderBulkError,
+    OrderBulkResult,
+    OrderCreate,
+    OrderResponse,
+)
+from app.serialization import dump_row, dump_rows, dump_rows_ndjson
 from app.users.dao import UserDAO
 from app.users.dependencies import get_current_admin_user
 from app.users.models import User
 
 logger = logging.getLogger(__name__)
 
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
 router = APIRouter(
     prefix="/orders",
     tags=["Заказы"],
@@ -22,13 +49,97 @@ router = APIRouter(
     "/",
     response_model=list[OrderResponse],
     summary="Получить все заказы",
-    description="Возвращает список всех заказов, с возможностью фильтрации по параметрам.",
+    description=(
+        "Возвращает список заказов от новых к старым, с возможностью фильтрации "
+        "по параметрам. Если передан `limit`, курсор следующей страницы "
+        "возвращается в заголовке `X-Next-Cursor`. С `ids=1,2,3` возвращаются "
+        "только заказы с этими id — одним запросом вместо `GET /orders/{id}` "
+        "для каждого. Ответ содержит слабый `ETag`: повторный запрос с ним "
+        "в `If-None-Match` получает 304, пока выборка не изменилась."
+    ),
+    responses={304: {"description": "Ответ не изменился (If-None-Match)"}},
 )
-async def get_all_orders(request_body: RBOrder = Depends()) -> list[OrderResponse]:
-    logger.info(f"Запрос на получение заказов с параметрами: {request_body.to_dict()}")
-    orders = await OrderDAO.find_all_filtered(**request_body.to_dict())
-    logger.info(f"Найдено заказов: {len(orders)}")
-    return orders
+async def get_all_orders(
+    request: Request,
+    request_body: RBOrder = Depends(),
+    cursor: str | None = Query(
+        None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"
+    ),
+    limit: int | None = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description="Размер страницы"
+    ),
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    logger.info("Запрос на получение заказов с параметрами: %s", request_body.to_dict())
+    page = {
+        "cursor": decode_cursor(cursor) if cursor else None,
+        "limit": limit + 1 if limit is not None else None,
+    }
+    fingerprint = await OrderDAO.fingerprint(
+        **request_body.to_dict(), **page, session=session
+    )
+    etag = weak_etag(request.url.query, fingerprint)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        logger.info("Заказы не изменились")
+        return cached
+
+    orders = await OrderDAO.find_all_filtered(
+        **request_body.to_dict(), **page, schema=OrderResponse, session=session
+    )
+    headers = etag_headers(etag)
+    if limit is not None and len(orders) > limit:
+        orders = orders[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(orders[-1])
+    logger.info("Найдено заказов: %d", len(orders))
+    return Response(dump_rows(orders), media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    summary="Потоковая выгрузка заказов",
+    description=(
+        "Отдаёт все заказы, подходящие под фильтры, в формате NDJSON "
+        "(по одному заказу в строке), читая их из серверного курсора БД."
+    ),
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def stream_orders(request_body: RBOrder = Depends()) -> StreamingResponse:
+    logger.info(
+        "Запрос на потоковую выгрузку заказов с параметрами: %s", request_body.to_dict()
+    )
+    filters = request_body.to_dict()
+
+    async def generate() -> AsyncIterator[bytes]:
+        async for orders in OrderDAO.stream_filtered(schema=OrderResponse, **filters):
+            yield dump_rows_ndjson(orders)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/search",
+    response_model=list[OrderResponse],
+    summary="Поиск заказов по имени клиента",
+    description=(
+        "Ищет заказы, имя клиента которых похоже на строку поиска (содержит её "
+        "слова, в том числе с опечатками), и возвращает их от наиболее к "
+        "наименее похожим."
+    ),
+)
+async def search_orders(
+    q: str = Query(..., min_length=1, max_length=100, description="Строка поиска"),
+    limit: int = Query(
+        SEARCH_DEFAULT_LIMIT,
+        ge=1,
+        le=SEARCH_MAX_LIMIT,
+        description="Максимальное количество результатов",
+    ),
+    session: AsyncSession = Depends(get_session),
+) -> list[OrderResponse]:
+    logger.info("Поиск заказов по имени клиента: %r", q)
+    return await OrderDAO.search_by_client_name(q, limit=limit, session=session)
 
 
 @router.get(
@@ -36,17 +147,27 @@ async def get_all_orders(request_body: RBOrder = Depends()) -> list[OrderRespons
     response_model=OrderResponse,
     summary="Получить заказ по ID",
     description="Возвращает заказ по его уникальному идентификатору.",
-    responses={404: {"description": "Заказ не найден"}},
+    responses={
+        304: {"description": "Ответ не изменился (If-None-Match)"},
+        404: {"description": "Заказ не найден"},
+    },
 )
 async def get_one_order_by_id(
+    request: Request,
     order_id: int = Path(..., description="ID заказа, который нужно получить"),
-) -> OrderResponse:
-    order = await OrderDAO.find_one_or_none_by_id(order_id)
-    if not order:
-        logger.warning(f"Заказ с ID {order_id} не найден")
-        raise OrderNotFoundException
-    logger.info(f"Получен заказ с ID {order_id}")
-    return order
+) -> Response:
+    async def load() -> bytes:
+        order = await OrderDAO.find_one_or_none_by_id(order_id, schema=OrderResponse)
+        if not order:
+            logger.warning("Заказ с ID %s не найден", order_id)
+            raise OrderNotFoundException
+        logger.info("Получен заказ с ID %s", order_id)
+        return dump_row(order)
+
+    key = await response_cache.item_key(OrderDAO.model.__tablename__, order_id)
+    return await response_cache.respond(
+        request, OrderDAO.model.__tablename__, key, load
+    )
 
 
 @router.post(
@@ -62,17 +183,89 @@ async def create_order(
         ..., description="Данные для создания нового заказа"
     ),
     _: User = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
 ) -> OrderResponse:
-    logger.info(f"Создание заказа: {order_data}")
-    user = await UserDAO.find_one_or_none_by_id(order_data.created_by_id)
+    logger.info("Создание заказа: %s", order_data)
+    user = await UserDAO.find_one_or_none_by_id(
+        order_data.created_by_id, session=session
+    )
     if user is None:
-        logger.warning(f"Пользователь с ID {order_data.created_by_id} не найден")
+        logger.warning("Пользователь с ID %s не найден", order_data.created_by_id)
         raise UserNotFoundException
-    created_order = await OrderDAO.add(**order_data.model_dump())
-    logger.info(f"Создан заказ с ID {created_order.id}")
+    created_order = await OrderDAO.add(session=session, **order_data.model_dump())
+    logger.info("Создан заказ с ID %s", created_order.id)
     return created_order
 
 
+@router.post(
+    "/bulk",
+    response_model=OrderBulkResult,
+    summary="Массовая загрузка заказов",
+    description=(
+        "Загружает заказы из тела запроса в формате NDJSON "
+        "(`application/x-ndjson`, один заказ в строке) или CSV (`text/csv`, "
+        "первая строка — заголовок с полями `client_name,cost,order_date,"
+        "created_by_id`). Строки с ошибками пропускаются и перечисляются "
+        "в ответе, остальные загружаются командой COPY пачками по "
+        f"{BULK_CHUNK_SIZE} строк."
+    ),
+    responses={415: {"description": "Неподдерживаемый формат"}},
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def bulk_create_orders(
+    request: Request,
+    _: User = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
+) -> OrderBulkResult:
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    logger.info("Массовая загрузка заказов в формате %s", media_type)
+    result = OrderBulkResult()
+    known_users: set[int] = set()
+    missing_users: set[int] = set()
+
+    async for rows, errors in read_order_chunks(request.stream(), media_type):
+        new_user_ids = (
+            {order.created_by_id for _, order in rows} - known_users - missing_users
+        )
+        if new_user_ids:
+            existing = await UserDAO.find_existing_ids(new_user_ids, session=session)
+            known_users |= existing
+            missing_users |= new_user_ids - existing
+
+        orders = []
+        for row, order in rows:
+            if order.created_by_id in missing_users:
+                errors.append(
+                    OrderBulkError(
+                        row=row,
+                        errors=[
+                            f"created_by_id: пользователь {order.created_by_id} "
+                            "не найден"
+                        ],
+                    )
+                )
+            else:
+                orders.append(order)
+
+        result.inserted += await OrderDAO.copy_orders(orders, session=session)
+        result.errors.extend(errors)
+
+    result.errors.sort(key=lambda error: error.row)
+    result.failed = len(result.errors)
+    logger.info(
+        "Загружено заказов: %d, отклонено строк: %d", result.inserted, result.failed
+    )
+    return result
+
+
 @router.delete(
     "/{order_id}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -83,11 +276,12 @@ async def create_order(
 async def delete_order(
     order_id: int = Path(..., description="ID заказа, который нужно удалить"),
     _: User = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
 ) -> Response:
-    logger.info(f"Попытка удалить заказ с ID {order_id}")
-    deleted_count = await OrderDAO.delete(id=order_id)
+    logger.info("Попытка удалить заказ с ID %s", order_id)
+    deleted_count = await OrderDAO.delete(session=session, id=order_id)
     if deleted_count == 0:
-        logger.warning(f"Заказ с ID {order_id} не найден для удаления")
+        logger.warning("Заказ с ID %s не найден для удаления", order_id)
         raise OrderNotFoundException
-    logger.info(f"Удалён заказ с ID {order_id}")
+    logger.info("Удалён заказ с ID %s", order_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
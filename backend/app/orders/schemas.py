@@ -98,3 +98,16 @@ class OrderResponse(BaseModel):
     cost: int
     order_date: datetime
     status: OrderStatus
+
+
+class OrderBulkError(BaseModel):
+    row: int = Field(..., description="Номер строки во входных данных (с 1)")
+    errors: list[str] = Field(..., description="Ошибки валидации строки")
+
+
+class OrderBulkResult(BaseModel):
+    inserted: int = Field(0, description="Количество загруженных заказов")
+    failed: int = Field(0, description="Количество отклонённых строк")
+    errors: list[OrderBulkError] = Field(
+        default_factory=list, description="Ошибки по строкам"
+    )
@@ -0,0 +1,103 @@
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dao.base import BaseDAO
+from app.database import session_scope
+from app.enums import OutboxStatus
+from app.models import OutboxMessage
+
+
+class OutboxDAO(BaseDAO):
+    model = OutboxMessage
+
+    @classmethod
+    async def enqueue(
+        cls,
+        kind: str,
+        payload: dict[str, Any],
+        idempotency_key: str,
+        session: AsyncSession | None = None,
+    ) -> bool:
+        """
+        Добавить сообщение в транзакцию сессии.
+
+        Сообщение с уже существующим idempotency_key не добавляется
+        (ON CONFLICT DO NOTHING), в том числе если прежнее уже выполнено.
+
+        :param kind: Вид действия (ключ app.outbox.handlers.HANDLERS).
+        :param payload: Аргументы действия, сериализуемые в JSON.
+        :param idempotency_key: Ключ, по которому повторы отбрасываются.
+        :param session: Сессия транзакции основного изменения.
+        :return: True, если сообщение добавлено.
+        """
+        async with session_scope(session) as db_session:
+            query = (
+                insert(cls.model)
+                .values(kind=kind, payload=payload, idempotency_key=idempotency_key)
+                .on_conflict_do_nothing(index_elements=[cls.model.idempotency_key])
+                .returning(cls.model.id)
+            )
+            result = await db_session.execute(query)
+            return result.scalar_one_or_none() is not None
+
+    @classmethod
+    async def claim(cls, limit: int, session: AsyncSession) -> Sequence[OutboxMessage]:
+        """
+        Захватить пачку готовых сообщений до конца транзакции сессии.
+
+        FOR UPDATE SKIP LOCKED: сообщения, захваченные другим воркером,
+        пропускаются, поэтому воркеры разных процессов не выполняют одно
+        сообщение дважды и не ждут друг друга.
+
+        :param limit: Размер пачки.
+        :param session: Сессия транзакции, в которой пачка обрабатывается.
+        :return: Сообщения в порядке добавления.
+        """
+        query = (
+            select(cls.model)
+            .where(
+                cls.model.status == OutboxStatus.PENDING,
+                cls.model.available_at <= func.now(),
+            )
+            .order_by(cls.model.available_at, cls.model.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(query)
+        return result.scalars().all()
+
+    @classmethod
+    async def count_by_status(
+        cls, session: AsyncSession | None = None
+    ) -> dict[str, int]:
+        async with session_scope(session) as db_session:
+            query = select(cls.model.status, func.count()).group_by(cls.model.status)
+            result = await db_session.execute(query)
+            counts = {status.value: 0 for status in OutboxStatus}
+            counts.update({status.value: count for status, count in result.all()})
+            return counts
+
+    @classmethod
+    async def prune(cls, retention: int, session: AsyncSession | None = None) -> int:
+        """
+        Удалить выполненные сообщения старше retention секунд.
+
+        Пока выполненное сообщение хранится, его idempotency_key отбрасывает
+        повторы. Сообщения FAILED не удаляются.
+
+        :param retention: Срок хранения выполненных сообщений в секундах.
+        :param session: Сессия текущего запроса.
+        :return: Количество удалённых сообщений.
+        """
+        async with session_scope(session) as db_session:
+            query = delete(cls.model).where(
+                cls.model.status == OutboxStatus.DONE,
+                cls.model.processed_at < func.now() - timedelta(seconds=retention),
+            )
+            result = await db_session.execute(query)
+            return result.rowcount
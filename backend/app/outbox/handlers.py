@@ -0,0 +1,62 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.enums import OrderStatus
+from app.orders.dao import OrderDAO
+from app.trip_sheets.dao import TripSheetDAO
+
+Handler = Callable[[dict[str, Any], AsyncSession], Awaitable[None]]
+
+ORDER_STATUS = "order_status"
+ORDER_RELEASED = "order_released"
+
+
+async def set_order_status(payload: dict[str, Any], session: AsyncSession) -> None:
+    """
+    Перевести заказ путевого листа в статус payload["status"].
+
+    Путевой лист блокируется до изменения заказа: если его удалили раньше,
+    чем сообщение выполнено, статус не меняется: заказ вернёт в pending
+    сообщение ORDER_RELEASED удаления. Заказ обновляется через OrderDAO,
+    поэтому после коммита сбрасывается кэш ответов, а триггер ленты
+    изменений (/events) сообщает клиентам о новом статусе.
+
+    :param payload: order_id, trip_sheet_id и status (значение OrderStatus).
+    :param session: Сессия транзакции воркера.
+    """
+    if not await TripSheetDAO.lock_for_share(payload["trip_sheet_id"], session):
+        return
+    await OrderDAO.set_status_many(
+        [payload["order_id"]], OrderStatus(payload["status"]), session=session
+    )
+
+
+async def release_order(payload: dict[str, Any], session: AsyncSession) -> None:
+    """
+    Вернуть заказ в pending после удаления его путевого листа.
+
+    Заказ блокируется, и статус меняется, только если на него не осталось
+    путевых листов. Сообщение ORDER_STATUS путевого листа, созданного
+    параллельно, ждёт этой блокировки и выполняется после: заказ остаётся
+    в in_progress, в каком бы порядке ни выполнились сообщения.
+
+    :param payload: order_id.
+    :param session: Сессия транзакции воркера.
+    """
+    if not await OrderDAO.lock_unassigned(payload["order_id"], session):
+        return
+    await OrderDAO.set_status_many(
+        [payload["order_id"]], OrderStatus.PENDING, session=session
+    )
+
+
+# Обработчики по виду сообщения (OutboxMessage.kind). Обработчик выполняется
+# в транзакции воркера вместе с отметкой о выполнении, но может быть вызван
+# повторно (например, если коммит не прошёл), поэтому должен быть
+# идемпотентным.
+HANDLERS: dict[str, Handler] = {
+    ORDER_STATUS: set_order_status,
+    ORDER_RELEASED: release_order,
+}
@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import BigInteger, Enum, Index, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base, int_pk
+from app.enums import OutboxStatus
+
+
+class OutboxMessage(Base):
+    """
+    Отложенное действие после записи (transactional outbox).
+
+    Сообщение добавляется в той же транзакции, что и основное изменение:
+    оба фиксируются или откатываются вместе. Выполняет его воркер
+    (app.outbox.worker) после ответа клиенту. idempotency_key уникален:
+    повторная постановка того же действия ничего не добавляет.
+    """
+
+    __tablename__ = "outbox"
+
+    id: Mapped[int_pk] = mapped_column(BigInteger)
+    kind: Mapped[str] = mapped_column(String(32))
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB)
+    idempotency_key: Mapped[str] = mapped_column(String(128), unique=True)
+    status: Mapped[OutboxStatus] = mapped_column(
+        Enum(OutboxStatus),
+        default=OutboxStatus.PENDING,
+    )
+    attempts: Mapped[int] = mapped_column(default=0)
+    available_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    processed_at: Mapped[datetime | None]
+    last_error: Mapped[str | None] = mapped_column(Text)
+
+    __table_args__ = (
+        # Очередь воркера: только ожидающие сообщения, в порядке готовности.
+        Index(
+            "ix_outbox_pending_available_at",
+            "available_at",
+            "id",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
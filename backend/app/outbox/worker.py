@@ -0,0 +1,194 @@
+import asyncio
+import contextlib
+import logging
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import after_commit, session_scope
+from app.enums import OutboxStatus
+from app.models import OutboxMessage
+from app.outbox.dao import OutboxDAO
+from app.outbox.handlers import HANDLERS
+
+logger = logging.getLogger(__name__)
+
+PRUNE_INTERVAL = 600.0
+MAX_RETRY_DELAY = 600.0
+MAX_ERROR_LENGTH = 1000
+
+
+async def enqueue(
+    kind: str,
+    payload: dict[str, Any],
+    idempotency_key: str,
+    session: AsyncSession,
+) -> bool:
+    """
+    Поставить действие в outbox транзакции сессии.
+
+    Действие выполнит воркер после коммита; если транзакция откатится,
+    сообщения не будет. Воркер текущего процесса будится сразу после
+    коммита, остальные заберут сообщение при очередном опросе.
+
+    :param kind: Вид действия (ключ HANDLERS).
+    :param payload: Аргументы действия, сериализуемые в JSON.
+    :param idempotency_key: Ключ, по которому повторы отбрасываются.
+    :param session: Сессия транзакции основного изменения.
+    :return: True, если сообщение добавлено, а не отброшено как повтор.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Нет обработчика сообщений outbox вида {kind!r}")
+    added = await OutboxDAO.enqueue(kind, payload, idempotency_key, session=session)
+    if added:
+        after_commit(session, outbox_worker.wake)
+    return added
+
+
+class OutboxWorker:
+    """
+    Фоновый воркер outbox: выполняет отложенные действия пачками.
+
+    Пачка захватывается и выполняется в одной транзакции, каждое сообщение —
+    в своей точке сохранения: ошибка одного сообщения откатывает только его
+    изменения. Отметка о выполнении фиксируется вместе с изменениями
+    обработчика, поэтому изменения в БД применяются ровно один раз. Неудачное
+    сообщение повторяется с экспоненциальной задержкой (retry_delay,
+    удваивается с каждой попыткой), после max_attempts попыток помечается
+    FAILED.
+
+    Воркер будится после коммита транзакции с новым сообщением (enqueue)
+    и, кроме того, опрашивает таблицу раз в poll_interval: так он забирает
+    повторы и сообщения, оставшиеся после перезапуска.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        poll_interval: float,
+        max_attempts: int,
+        retry_delay: float,
+        retention: int,
+    ) -> None:
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.retention = retention
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить воркер; незавершённая пачка откатывается и останется в очереди."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def wake(self) -> None:
+        self._wake.set()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "processed": self.processed,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+    def _retry_delay(self, attempts: int) -> float:
+        return min(self.retry_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+    async def _process(self, message: OutboxMessage, session: AsyncSession) -> None:
+        message.attempts += 1
+        try:
+            async with session.begin_nested():
+                await HANDLERS[message.kind](message.payload, session)
+        except Exception as error:
+            message.last_error = repr(error)[:MAX_ERROR_LENGTH]
+            if message.attempts >= self.max_attempts:
+                message.status = OutboxStatus.FAILED
+                self.failed += 1
+                logger.error(
+                    "Сообщение outbox %s (%s) не выполнено за %d попыток: %r",
+                    message.idempotency_key,
+                    message.kind,
+                    message.attempts,
+                    error,
+                )
+                return
+            delay = self._retry_delay(message.attempts)
+            message.available_at = func.now() + timedelta(seconds=delay)
+            self.retried += 1
+            logger.warning(
+                "Ошибка сообщения outbox %s (%s), попытка %d, повтор через %.0fs: %r",
+                message.idempotency_key,
+                message.kind,
+                message.attempts,
+                delay,
+                error,
+            )
+            return
+
+        message.status = OutboxStatus.DONE
+        message.processed_at = func.now()
+        message.last_error = None
+        self.processed += 1
+
+    async def drain_batch(self) -> int:
+        """
+        Выполнить одну пачку готовых сообщений.
+
+        :return: Количество захваченных сообщений.
+        """
+        async with session_scope() as session:
+            messages = await OutboxDAO.claim(self.batch_size, session=session)
+            for message in messages:
+                await self._process(message, session)
+            return len(messages)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        pruned_at = loop.time()
+        while True:
+            self._wake.clear()
+            try:
+                claimed = await self.drain_batch()
+                if loop.time() - pruned_at >= PRUNE_INTERVAL:
+                    pruned_at = loop.time()
+                    await OutboxDAO.prune(self.retention)
+            except (OSError, SQLAlchemyError) as error:
+                logger.warning("Ошибка обработки outbox: %r", error)
+                claimed = 0
+
+            # Полная пачка: в очереди, скорее всего, есть ещё сообщения.
+            if claimed >= self.batch_size:
+                continue
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+
+
+outbox_worker = OutboxWorker(
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    retry_delay=settings.OUTBOX_RETRY_DELAY,
+    retention=settings.OUTBOX_RETENTION,
+)
@@ -0,0 +1,14 @@
+from .middleware import ProfilingMiddleware
+from .prometheus import registry
+from .sql import register_sql_profiling, slow_query_log
+from .timings import current_timings, record, timed
+
+__all__ = [
+    "ProfilingMiddleware",
+    "current_timings",
+    "record",
+    "register_sql_profiling",
+    "registry",
+    "slow_query_log",
+    "timed",
+]
@@ -0,0 +1,108 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .prometheus import Histogram, registry
+from .timings import RequestTimings, request_timings
+
+# Порядок фаз в заголовке Server-Timing.
+PHASES = ("auth", "pool", "db", "serialize", "app")
+UNMATCHED_ROUTE = "unmatched"
+
+http_request_seconds = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Время обработки HTTP-запроса",
+        labels=("method", "route", "status"),
+    )
+)
+http_phase_seconds = registry.register(
+    Histogram(
+        "http_request_phase_seconds",
+        "Время HTTP-запроса по фазам: auth, pool, db, serialize, app",
+        labels=("method", "route", "phase"),
+    )
+)
+http_request_queries = registry.register(
+    Histogram(
+        "http_request_db_queries",
+        "Число SQL-запросов за HTTP-запрос",
+        labels=("method", "route"),
+        buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+    )
+)
+
+
+def server_timing(timings: RequestTimings, total: float) -> str:
+    """
+    Значение заголовка Server-Timing: фазы запроса и общее время в мс.
+
+    :param timings: Замеры запроса.
+    :param total: Общее время запроса к этому моменту, в секундах.
+    :return: Например ``auth;dur=0.4, db;dur=3.1;desc="2 queries", ...``.
+    """
+    phases = timings.breakdown(total)
+    metrics = []
+    for phase in PHASES:
+        if phase not in phases:
+            continue
+        metric = f"{phase};dur={phases[phase] * 1000:.1f}"
+        if phase == "db":
+            metric += f';desc="{timings.queries} queries"'
+        metrics.append(metric)
+    metrics.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(metrics)
+
+
+class ProfilingMiddleware:
+    """
+    Замеры каждого HTTP-запроса по фазам.
+
+    Фазы auth (get_current_user), pool (ожидание соединения), db (SQL-запросы)
+    и serialize (сериализация ответа) отмечаются там, где выполняются
+    (см. app.profiling.timings), остаток — фаза app. Результат уходит в
+    заголовок Server-Timing ответа и в гистограммы /metrics по шаблону пути
+    маршрута. Для потоковых ответов Server-Timing описывает время до начала
+    ответа, а гистограммы — весь ответ.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True) -> None:
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        with request_timings(scope["method"], scope["path"]) as timings:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    if self.server_timing:
+                        total = time.perf_counter() - timings.started
+                        MutableHeaders(scope=message).append(
+                            "Server-Timing", server_timing(timings, total)
+                        )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                self._observe(scope, timings, status)
+
+    @staticmethod
+    def _observe(scope: Scope, timings: RequestTimings, status: int) -> None:
+        total = time.perf_counter() - timings.started
+        route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+        method = timings.method
+        http_request_seconds.observe(
+            total, method=method, route=route, status=str(status)
+        )
+        for phase, seconds in timings.breakdown(total).items():
+            http_phase_seconds.observe(seconds, method=method, route=route, phase=phase)
+        http_request_queries.observe(timings.queries, method=method, route=route)
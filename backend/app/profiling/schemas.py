@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+
+
+class SlowQueryLogUpdate(BaseModel):
+    enabled: bool | None = Field(None, description="Включить или выключить лог")
+    threshold_ms: float | None = Field(
+        None, ge=0, description="Порог медленного запроса в миллисекундах"
+    )
+
+
+class SlowQueryLogResponse(BaseModel):
+    enabled: bool
+    threshold_ms: float
+    logged: int
@@ -0,0 +1,133 @@
+import logging
+import time
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+from .prometheus import Counter, Histogram, registry
+from .timings import current_timings, record
+
+logger = logging.getLogger(__name__)
+
+START_KEY = "_profiling_start"
+MAX_PARAM_LENGTH = 200
+MAX_PARAM_ROWS = 5
+
+db_statement_seconds = registry.register(
+    Histogram("db_statement_duration_seconds", "Время выполнения SQL-запроса")
+)
+db_slow_statements = registry.register(
+    Counter("db_slow_statements_total", "SQL-запросы дольше порога медленного запроса")
+)
+
+
+def _format_value(value: Any) -> str:
+    text = repr(value)
+    if len(text) > MAX_PARAM_LENGTH:
+        return f"{text[:MAX_PARAM_LENGTH]}... ({len(text)} символов)"
+    return text
+
+
+def format_parameters(parameters: Any, executemany: bool) -> str:
+    """Параметры запроса для лога: длинные значения и пакеты обрезаются."""
+    if not executemany:
+        if isinstance(parameters, dict):
+            return repr({key: _format_value(v) for key, v in parameters.items()})
+        if isinstance(parameters, Sequence) and not isinstance(parameters, str):
+            return "(" + ", ".join(_format_value(value) for value in parameters) + ")"
+        return _format_value(parameters)
+
+    rows = [format_parameters(row, False) for row in parameters[:MAX_PARAM_ROWS]]
+    if len(parameters) > MAX_PARAM_ROWS:
+        rows.append(f"... ещё {len(parameters) - MAX_PARAM_ROWS} строк")
+    return "[" + ", ".join(rows) + "]"
+
+
+class SlowQueryLog:
+    """
+    Лог медленных SQL-запросов с параметрами.
+
+    Включается и настраивается во время работы (PUT /db/slow-queries) без
+    перезапуска; настройки действуют в рамках процесса (воркера). Счётчик
+    db_slow_statements_total растёт и при выключенном логе.
+    """
+
+    def __init__(self, enabled: bool, threshold_ms: float) -> None:
+        self.enabled = enabled
+        self.threshold_ms = threshold_ms
+        self.logged = 0
+
+    def configure(
+        self, enabled: bool | None = None, threshold_ms: float | None = None
+    ) -> None:
+        if enabled is not None:
+            self.enabled = enabled
+        if threshold_ms is not None:
+            self.threshold_ms = threshold_ms
+        logger.info(
+            "Лог медленных запросов: enabled=%s, threshold_ms=%s",
+            self.enabled,
+            self.threshold_ms,
+        )
+
+    def check(
+        self, statement: str, parameters: Any, executemany: bool, seconds: float
+    ) -> None:
+        milliseconds = seconds * 1000
+        if milliseconds < self.threshold_ms:
+            return
+        db_slow_statements.inc()
+        if not self.enabled:
+            return
+
+        self.logged += 1
+        timings = current_timings()
+        source = f"{timings.method} {timings.path}" if timings else "вне запроса"
+        logger.warning(
+            "Медленный запрос %.1fms (%s): %s параметры: %s",
+            milliseconds,
+            source,
+            " ".join(statement.split()),
+            format_parameters(parameters, executemany),
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "logged": self.logged,
+        }
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_LOG, settings.SLOW_QUERY_MS)
+
+
+def register_sql_profiling(engine: AsyncEngine) -> None:
+    """
+    Замерять каждый SQL-запрос движка.
+
+    Время запроса идёт в фазу db текущего HTTP-запроса (Server-Timing и
+    /metrics), в гистограмму db_statement_duration_seconds и в лог
+    медленных запросов.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute", named=True)
+    def before_cursor_execute(context: Any, **kw: Any) -> None:
+        setattr(context, START_KEY, time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute", named=True)
+    def after_cursor_execute(
+        statement: str, parameters: Any, context: Any, executemany: bool, **kw: Any
+    ) -> None:
+        seconds = time.perf_counter() - getattr(context, START_KEY)
+        record("db", seconds)
+        timings = current_timings()
+        if timings is not None:
+            timings.queries += 1
+        db_statement_seconds.observe(seconds)
+        slow_query_log.check(statement, parameters, executemany, seconds)
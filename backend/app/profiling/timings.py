@@ -0,0 +1,104 @@
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class RequestTimings:
+    """
+    Время запроса по фазам: auth, pool, db, serialize.
+
+    Время фазы исключительное: запросы к БД внутри auth учитываются в db,
+    а не дважды. Остаток от общего времени запроса — фаза app (код
+    обработчика, валидация, middleware).
+    """
+
+    def __init__(self, method: str, path: str) -> None:
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = defaultdict(float)
+        self.queries = 0
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] += max(seconds, 0.0)
+
+    def breakdown(self, total: float) -> dict[str, float]:
+        """Фазы и остаток app при общем времени total (в секундах)."""
+        phases = dict(self.phases)
+        phases["app"] = max(total - sum(phases.values()), 0.0)
+        return phases
+
+
+class _Frame:
+    __slots__ = ("nested",)
+
+    def __init__(self) -> None:
+        self.nested = 0.0
+
+
+_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+_frame: ContextVar[_Frame | None] = ContextVar("request_timings_frame", default=None)
+
+
+def current_timings() -> RequestTimings | None:
+    """Замеры текущего запроса или None вне запроса."""
+    return _timings.get()
+
+
+@contextmanager
+def request_timings(method: str, path: str) -> Iterator[RequestTimings]:
+    """Замеры запроса в текущем контексте (открывает ProfilingMiddleware)."""
+    timings = RequestTimings(method, path)
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def record(phase: str, seconds: float) -> None:
+    """
+    Учесть в фазе уже измеренное время, например выполнение SQL-запроса.
+
+    :param phase: Название фазы.
+    :param seconds: Длительность в секундах.
+    """
+    timings = _timings.get()
+    if timings is None:
+        return
+    timings.add(phase, seconds)
+    parent = _frame.get()
+    if parent is not None:
+        parent.nested += seconds
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """
+    Замерить блок кода как фазу запроса.
+
+    Вне запроса (скрипты, фоновые задачи) ничего не делает.
+
+    :param phase: Название фазы.
+    """
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+
+    frame = _Frame()
+    token = _frame.set(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _frame.reset(token)
+        timings.add(phase, elapsed - frame.nested)
+        parent = _frame.get()
+        if parent is not None:
+            parent.nested += elapsed
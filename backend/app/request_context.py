@@ -0,0 +1,80 @@
+import random
+import re
+import uuid
+from contextvars import ContextVar
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Id запроса от клиента или прокси принимается, только если он безопасен
+# для логов: без пробелов, кавычек и переводов строк.
+VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]{1,64}")
+
+
+class RequestContext:
+    """
+    Контекст HTTP-запроса для логов: id, маршрут и решение выборки.
+
+    sampled — попал ли запрос в выборку INFO-записей (LOG_SAMPLE_RATE):
+    решение принимается один раз на запрос, поэтому в лог попадают либо
+    все INFO-записи запроса, либо ни одной.
+    """
+
+    __slots__ = ("id", "method", "sampled", "scope")
+
+    def __init__(self, request_id: str, scope: Scope, sampled: bool) -> None:
+        self.id = request_id
+        self.method = scope["method"]
+        self.scope = scope
+        self.sampled = sampled
+
+    @property
+    def route(self) -> str | None:
+        """Шаблон пути маршрута (/orders/{order_id}); до маршрутизации — None."""
+        return getattr(self.scope.get("route"), "path", None)
+
+
+_request: ContextVar[RequestContext | None] = ContextVar(
+    "request_context", default=None
+)
+
+
+def current_request() -> RequestContext | None:
+    """Контекст текущего HTTP-запроса или None вне запроса."""
+    return _request.get()
+
+
+class RequestContextMiddleware:
+    """
+    Id запроса для логов и заголовок X-Request-ID.
+
+    Id берётся из заголовка X-Request-ID запроса (если его выставил прокси
+    или клиент) или создаётся заново и возвращается в ответе. Доля
+    запросов sample_rate попадает в выборку INFO-записей лога.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 1.0) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER, "")
+        if not VALID_REQUEST_ID.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate  # noqa: S311
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        token = _request.set(RequestContext(request_id, scope, sampled))
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _request.reset(token)
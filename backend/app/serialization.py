@@ -0,0 +1,105 @@
+from collections.abc import Iterable, Sequence
+from datetime import date, datetime
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from sqlalchemy import Row, RowMapping
+
+from app.profiling import timed
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+ProjectedRow = Row[Any] | RowMapping
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        # Та же строка, что и strftime(DATETIME_FORMAT), но в несколько раз быстрее.
+        return value.isoformat(" ", "seconds")
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в JSON")
+
+
+def _as_dicts(rows: Iterable[ProjectedRow]) -> list[dict[str, Any]]:
+    rows = list(rows)
+    if not rows:
+        return []
+    if isinstance(rows[0], RowMapping):
+        return [dict(row) for row in rows]
+    fields = rows[0]._fields
+    return [dict(zip(fields, row, strict=True)) for row in rows]
+
+
+def dump_row(row: ProjectedRow) -> bytes:
+    """
+    Сериализовать одну строку проекции в JSON-объект через orjson.
+
+    :param row: Строка, полученная с проекцией по схеме ответа.
+    :return: Тело JSON-ответа.
+    """
+    with timed("serialize"):
+        (item,) = _as_dicts([row])
+        return orjson.dumps(
+            item, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+
+def dump_rows(rows: Sequence[ProjectedRow]) -> bytes:
+    """
+    Сериализовать строки запроса в JSON-массив объектов через orjson.
+
+    Результат побайтно совпадает с ответом FastAPI для схемы с теми же полями:
+    перечисления кодируются значениями, даты — в формате DATETIME_FORMAT.
+
+    :param rows: Строки, полученные с проекцией по схеме ответа.
+    :return: Тело JSON-ответа.
+    """
+    with timed("serialize"):
+        return orjson.dumps(
+            _as_dicts(rows), default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+
+def dump_rows_ndjson(rows: Sequence[ProjectedRow]) -> bytes:
+    """
+    Сериализовать строки запроса в NDJSON: по объекту в строке.
+
+    :param rows: Строки, полученные с проекцией по схеме ответа.
+    :return: Фрагмент тела ответа, каждая строка завершается переводом строки.
+    """
+    with timed("serialize"):
+        return b"".join(
+            orjson.dumps(item, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+            + b"\n"
+            for item in _as_dicts(rows)
+        )
+
+
+def dump_json(value: Any) -> bytes:
+    """
+    Сериализовать словари и списки в JSON в том же формате, что и dump_rows.
+
+    :param value: Значение из словарей, списков и скаляров; даты и
+        перечисления кодируются как в ответах API.
+    :return: JSON в байтах.
+    """
+    with timed("serialize"):
+        return orjson.dumps(
+            value, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+
+class TimedJSONResponse(JSONResponse):
+    """
+    JSONResponse, кодирование которого учитывается в фазе serialize.
+
+    Ответ по умолчанию для маршрутов с response_model. Валидация результата
+    по response_model выполняется FastAPI до создания ответа и попадает
+    в фазу app.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            return super().render(content)
@@ -1,26 +1,222 @@
+from collections.abc import Collection, Iterable
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy.future import select
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Row, exists, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, noload
 
 from app.dao.base import BaseDAO
-from app.database import async_session_maker
-from app.models import TripSheet
+from app.database import execute_read, session_scope
+from app.enums import TripSheetExpand
+from app.models import Order, TripSheet, Vehicle
+
+# SQLSTATE exclusion_violation: сработало ограничение excl_tripsheets_vehicle_time.
+EXCLUSION_VIOLATION = "23P01"
 
 
 class TripSheetDAO(BaseDAO):
     model = TripSheet
 
+    @classmethod
+    def _overlaps(
+        cls, start_time: datetime, end_time: datetime | None
+    ) -> ColumnElement[bool]:
+        """
+        Условие пересечения путевого листа с интервалом [start_time, end_time).
+
+        end_time=None — интервал без правой границы.
+        """
+        return func.tsrange(cls.model.start_time, cls.model.end_time).op("&&")(
+            func.tsrange(start_time, end_time)
+        )
+
     @classmethod
     async def check_time_overlap(
-        cls, vehicle_id: int, start_time: datetime, end_time: datetime
+        cls,
+        vehicle_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        session: AsyncSession | None = None,
     ) -> bool:
-        async with async_session_maker() as session:
-            query = select(cls.model).filter(
-                cls.model.vehicle_id == vehicle_id,
-                cls.model.start_time < end_time,
-                cls.model.end_time > start_time,
+        """
+        Проверить, занята ли машина в заданном интервале.
+
+        Условие совпадает с выражением ограничения excl_tripsheets_vehicle_time,
+        поэтому запрос идёт по его GiST-индексу и останавливается на первой
+        найденной строке.
+
+        :param vehicle_id: Идентификатор машины.
+        :param start_time: Начало интервала.
+        :param end_time: Конец интервала.
+        :param session: Сессия текущего запроса.
+        :return: True, если есть пересекающийся путевой лист.
+        """
+        async with session_scope(session) as db_session:
+            query = select(
+                exists().where(
+                    cls.model.vehicle_id == vehicle_id,
+                    cls._overlaps(start_time, end_time),
+                )
+            )
+            result = await db_session.execute(query)
+            return result.scalar_one()
+
+    @classmethod
+    async def lock_for_share(cls, trip_sheet_id: int, session: AsyncSession) -> bool:
+        """
+        Заблокировать путевой лист от удаления до конца транзакции.
+
+        :param trip_sheet_id: Идентификатор путевого листа.
+        :param session: Сессия транзакции.
+        :return: False, если путевого листа нет (или его удалили, пока
+            ждали блокировку).
+        """
+        query = (
+            select(cls.model.id)
+            .where(cls.model.id == trip_sheet_id)
+            .with_for_update(read=True)
+        )
+        result = await session.execute(query)
+        return result.scalar_one_or_none() is not None
+
+    @classmethod
+    async def find_all_expanded(
+        cls,
+        expand: Collection[TripSheetExpand],
+        session: AsyncSession | None = None,
+        ids: Iterable[int] | None = None,
+        **filter_by: Any,
+    ) -> list[TripSheet]:
+        """
+        Найти путевые листы вместе с машинами и заказами.
+
+        Запрошенные связи подгружаются через joinedload в том же запросе,
+        поэтому число запросов не зависит от числа путевых листов.
+        Незапрошенные связи остаются None и не загружаются при обращении.
+
+        :param expand: Связи, которые нужно загрузить.
+        :param session: Сессия текущего запроса.
+        :param ids: Выбрать только путевые листы с этими идентификаторами.
+        :param filter_by: Параметры фильтрации.
+        :return: Путевые листы с загруженными связями.
+        """
+        relationships = {
+            TripSheetExpand.VEHICLE: cls.model.vehicle,
+            TripSheetExpand.ORDER: cls.model.order,
+        }
+        # Внешние ключи NOT NULL, поэтому достаточно INNER JOIN.
+        options = [
+            joinedload(relationship, innerjoin=True)
+            if item in expand
+            else noload(relationship)
+            for item, relationship in relationships.items()
+        ]
+        async with session_scope(session) as db_session:
+            query = select(cls.model).options(*options).filter_by(**filter_by)
+            if ids is not None:
+                query = query.where(cls._id_in(ids))
+            result = await execute_read(db_session, query)
+            return list(result.scalars().all())
+
+    @classmethod
+    async def fingerprint(
+        cls,
+        expand: Collection[TripSheetExpand] = (),
+        session: AsyncSession | None = None,
+        **filter_by: Any,
+    ) -> tuple[Any, ...]:
+        """
+        Отпечаток путевых листов, которые вернёт find_all_expanded.
+
+        С expand в отпечаток входят и updated_at вложенных машин и заказов:
+        их изменение тоже меняет ответ.
+
+        :param expand: Связи, вложенные в ответ.
+        :param session: Сессия текущего запроса.
+        :param filter_by: Параметры фильтрации.
+        :return: Кортеж (count, max(updated_at), sum(updated_at)).
+        """
+        # filter_by применяется к последней присоединённой модели, поэтому
+        # фильтры задаются до join.
+        query = select(cls.model).filter_by(**filter_by)
+        updated_at = [cls.model.updated_at]
+        if TripSheetExpand.VEHICLE in expand:
+            query = query.join(cls.model.vehicle)
+            updated_at.append(Vehicle.updated_at)
+        if TripSheetExpand.ORDER in expand:
+            query = query.join(cls.model.order)
+            updated_at.append(Order.updated_at)
+        query = query.with_only_columns(
+            func.greatest(*updated_at).label("updated_at")
+            if len(updated_at) > 1
+            else updated_at[0],
+            maintain_column_froms=True,
+        )
+        async with session_scope(session) as db_session:
+            return await cls._fingerprint(query, db_session)
+
+    @classmethod
+    def _by_vehicle_query(cls, vehicle_id: int, schema: type[BaseModel] | None = None):
+        return (
+            cls._select(schema=schema)
+            .where(cls.model.vehicle_id == vehicle_id)
+            .order_by(cls.model.start_time)
+        )
+
+    @classmethod
+    async def find_by_vehicle(
+        cls,
+        vehicle_id: int,
+        session: AsyncSession | None = None,
+        schema: type[BaseModel] | None = None,
+    ) -> list[TripSheet] | list[Row[Any]]:
+        """
+        Найти путевые листы машины в порядке начала поездки.
+
+        :param vehicle_id: Идентификатор машины.
+        :param session: Сессия текущего запроса.
+        :param schema: Схема ответа: вернуть строки проекции по её полям.
+        :return: Список путевых листов или строк проекции.
+        """
+        async with session_scope(session) as db_session:
+            result = await execute_read(
+                db_session, cls._by_vehicle_query(vehicle_id, schema=schema)
+            )
+            if schema is None:
+                return list(result.scalars().all())
+            return list(result.all())
+
+    @classmethod
+    async def find_busy_intervals(
+        cls,
+        start_time: datetime,
+        end_time: datetime | None = None,
+        session: AsyncSession | None = None,
+    ) -> dict[int, list[tuple[datetime, datetime]]]:
+        """
+        Интервалы занятости машин, пересекающие [start_time, end_time).
+
+        :param start_time: Начало интервала.
+        :param end_time: Конец интервала; None — без правой границы.
+        :param session: Сессия текущего запроса.
+        :return: Интервалы (start_time, end_time) по машинам, по возрастанию.
+        """
+        async with session_scope(session) as db_session:
+            query = (
+                select(cls.model.vehicle_id, cls.model.start_time, cls.model.end_time)
+                .where(cls._overlaps(start_time, end_time))
+                .order_by(cls.model.vehicle_id, cls.model.start_time)
             )
-            result = await session.execute(query)
-            overlapping_trip_sheets = result.scalars().all()
+            result = await db_session.execute(query)
+            busy: dict[int, list[tuple[datetime, datetime]]] = {}
+            for vehicle_id, start, end in result:
+                busy.setdefault(vehicle_id, []).append((start, end))
+            return busy
 
-            return len(overlapping_trip_sheets) > 0
+    @staticmethod
+    def is_time_conflict(error: IntegrityError) -> bool:
+        """Нарушено ли ограничение на пересечение путевых листов по времени."""
+        return getattr(error.orig, "sqlstate", None) == EXCLUSION_VIOLATION
@@ -1,7 +1,16 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import (
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Index,
+    UniqueConstraint,
+    func,
+    literal_column,
+)
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base, int_pk
@@ -19,6 +28,7 @@ class TripSheet(Base):
     order_id: Mapped[int] = mapped_column(
         ForeignKey("orders.id"),
         nullable=False,
+        index=True,
     )
     start_time: Mapped[datetime] = mapped_column(
         DateTime,
@@ -38,6 +48,27 @@ class TripSheet(Base):
 
     __table_args__ = (
         UniqueConstraint("vehicle_id", "order_id", name="uix_vehicle_order"),
+        # То же правило, что и у валидатора TripSheetCreate.
+        CheckConstraint("end_time > start_time", name="ck_tripsheets_end_after_start"),
+        # Путевые листы машины в хронологическом порядке.
+        Index("ix_tripsheets_vehicle_id_start_time", "vehicle_id", "start_time"),
+        # Одна машина не может быть занята двумя путевыми листами одновременно.
+        # GiST-индекс ограничения используется и для поиска пересечений.
+        ExcludeConstraint(
+            ("vehicle_id", "="),
+            (
+                func.tsrange(literal_column("start_time"), literal_column("end_time")),
+                "&&",
+            ),
+            name="excl_tripsheets_vehicle_time",
+            using="gist",
+        ),
+        # Путевые листы всех машин, пересекающие интервал (поиск свободных машин).
+        Index(
+            "ix_tripsheets_time_range",
+            func.tsrange(literal_column("start_time"), literal_column("end_time")),
+            postgresql_using="gist",
+        ),
     )
 
     def __str__(self):
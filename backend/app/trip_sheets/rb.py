@@ -1,5 +1,24 @@
 from datetime import datetime
 
+from fastapi import Query
+
+from app.enums import TripSheetExpand
+
+_EXPAND_VALUES = "|".join(item.value for item in TripSheetExpand)
+EXPAND_PATTERN = rf"^({_EXPAND_VALUES})(,({_EXPAND_VALUES}))*$"
+
+
+def parse_expand(expand: str | None) -> frozenset[TripSheetExpand]:
+    """
+    Разобрать параметр ``expand=vehicle,order``.
+
+    :param expand: Значение параметра, уже проверенное по EXPAND_PATTERN.
+    :return: Связи, которые нужно вложить в ответ.
+    """
+    if expand is None:
+        return frozenset()
+    return frozenset(TripSheetExpand(item) for item in expand.split(","))
+
 
 class RBTripSheet:
     def __init__(
@@ -8,11 +27,20 @@ class RBTripSheet:
         order_id: int | None = None,
         start_time: datetime | None = None,
         end_time: datetime | None = None,
+        expand: str | None = Query(
+            None,
+            pattern=EXPAND_PATTERN,
+            description=(
+                "Связи через запятую (vehicle, order), которые вложить в ответ "
+                "вместо одних идентификаторов"
+            ),
+        ),
     ):
         self.vehicle_id = vehicle_id
         self.order_id = order_id
         self.start_time = start_time
         self.end_time = end_time
+        self.expand = parse_expand(expand)
 
     def to_dict(self) -> dict[str, int | datetime | None]:
         data = {
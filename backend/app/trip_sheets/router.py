@@ -1,19 +1,36 @@
 import logging
+from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Body, Depends, Path, Response, status
+from fastapi import APIRouter, Body, Depends, Path, Request, Response, status
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import etag_headers, not_modified, weak_etag
+from app.database import get_session
+from app.enums import OrderStatus
 from app.exceptions import (
+    InvalidTimeRangeException,
     OrderNotFoundException,
     TripSheetConflictException,
     TripSheetConflictTimeException,
     TripSheetNotFoundException,
     VehicleNotFoundException,
 )
+from app.models import TripSheet
 from app.orders.dao import OrderDAO
+from app.outbox.handlers import ORDER_RELEASED, ORDER_STATUS
+from app.outbox.worker import enqueue
+from app.serialization import dump_row, dump_rows
+from app.trip_sheets.assignment import assign_pending_orders
 from app.trip_sheets.dao import TripSheetDAO
 from app.trip_sheets.rb import RBTripSheet
-from app.trip_sheets.schemas import TripSheetCreate, TripSheetResponse
+from app.trip_sheets.schemas import (
+    TripSheetAssign,
+    TripSheetAssignResult,
+    TripSheetCreate,
+    TripSheetExpandedResponse,
+    TripSheetResponse,
+)
 from app.users.dependencies import get_current_admin_user
 from app.users.models import User
 from app.vehicles.dao import VehicleDAO
@@ -28,19 +45,53 @@ router = APIRouter(
 
 @router.get(
     "/",
-    response_model=list[TripSheetResponse],
+    response_model=list[TripSheetExpandedResponse],
+    response_model_exclude_none=True,
     summary="Получить все путевые листы",
-    description="Возвращает список всех путевых листов с возможностью фильтрации по параметрам.",
+    description=(
+        "Возвращает список всех путевых листов с возможностью фильтрации по "
+        "параметрам. С `expand=vehicle,order` в каждый путевой лист вкладываются "
+        "его машина и заказ, загруженные тем же запросом. Ответ содержит "
+        "слабый `ETag`: повторный запрос с ним в `If-None-Match` получает 304, "
+        "пока путевые листы (и вложенные машины и заказы) не изменились."
+    ),
+    responses={304: {"description": "Ответ не изменился (If-None-Match)"}},
 )
 async def get_all_trip_sheets(
+    request: Request,
+    response: Response,
     request_body: RBTripSheet = Depends(),
-) -> list[TripSheetResponse]:
+    session: AsyncSession = Depends(get_session),
+) -> Response | list[TripSheet]:
     logger.info("Запрос на получение всех путевых листов")
-    trip_sheets = await TripSheetDAO.find_all(**request_body.to_dict())
+    fingerprint = await TripSheetDAO.fingerprint(
+        request_body.expand, session=session, **request_body.to_dict()
+    )
+    etag = weak_etag(request.url.query, fingerprint)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        logger.info("Путевые листы не изменились")
+        return cached
+
+    if request_body.expand:
+        expanded = await TripSheetDAO.find_all_expanded(
+            request_body.expand, session=session, **request_body.to_dict()
+        )
+        logger.info("Найдено путевых листов: %d", len(expanded))
+        response.headers.update(etag_headers(etag))
+        return expanded
+
+    trip_sheets = await TripSheetDAO.find_all(
+        session=session, schema=TripSheetResponse, **request_body.to_dict()
+    )
     if not trip_sheets:
         logger.warning("Путевые листы не найдены")
-    logger.info(f"Найдено путевых листов: {len(trip_sheets)}")
-    return trip_sheets
+    logger.info("Найдено путевых листов: %d", len(trip_sheets))
+    return Response(
+        dump_rows(trip_sheets),
+        media_type="application/json",
+        headers=etag_headers(etag),
+    )
 
 
 @router.get(
@@ -54,20 +105,26 @@ async def get_trip_sheet_by_id(
     trip_sheet_id: int = Path(
         ..., description="ID путевого листа, который нужно получить"
     ),
-) -> TripSheetResponse:
-    trip_sheet = await TripSheetDAO.find_one_or_none_by_id(trip_sheet_id)
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    trip_sheet = await TripSheetDAO.find_one_or_none_by_id(
+        trip_sheet_id, session=session, schema=TripSheetResponse
+    )
     if not trip_sheet:
-        logger.warning(f"Путевой лист с ID {trip_sheet_id} не найден")
+        logger.warning("Путевой лист с ID %s не найден", trip_sheet_id)
         raise TripSheetNotFoundException
-    logger.info(f"Получен путевой лист с ID {trip_sheet_id}")
-    return trip_sheet
+    logger.info("Получен путевой лист с ID %s", trip_sheet_id)
+    return Response(dump_row(trip_sheet), media_type="application/json")
 
 
 @router.get(
     "/vehicle/{vehicle_id}",
     response_model=list[TripSheetResponse],
     summary="Получить все путевые листы для транспортного средства",
-    description="Возвращает все путевые листы для указанного транспортного средства по его ID.",
+    description=(
+        "Возвращает все путевые листы для указанного транспортного средства "
+        "по его ID в порядке начала поездки."
+    ),
     responses={404: {"description": "Транспортное средство не найдено"}},
 )
 async def get_trip_sheets_by_vehicle(
@@ -75,18 +132,23 @@ async def get_trip_sheets_by_vehicle(
         ...,
         description="ID транспортного средства, для которого нужно получить путевые листы",
     ),
-) -> list[TripSheetResponse]:
-    vehicle = await VehicleDAO.find_one_or_none_by_id(vehicle_id)
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    vehicle = await VehicleDAO.find_one_or_none_by_id(vehicle_id, session=session)
     if not vehicle:
-        logger.warning(f"Транспортное средство с ID {vehicle_id} не найдено")
+        logger.warning("Транспортное средство с ID %s не найдено", vehicle_id)
         raise VehicleNotFoundException
 
-    trip_sheets = await TripSheetDAO.find_all(vehicle_id=vehicle_id)
+    trip_sheets = await TripSheetDAO.find_by_vehicle(
+        vehicle_id, session=session, schema=TripSheetResponse
+    )
     logger.info(
-        f"Найдено путевых листов для транспортного средства с ID {vehicle_id}: {len(trip_sheets)}"
+        "Найдено путевых листов для транспортного средства с ID %s: %d",
+        vehicle_id,
+        len(trip_sheets),
     )
 
-    return trip_sheets
+    return Response(dump_rows(trip_sheets), media_type="application/json")
 
 
 @router.post(
@@ -94,7 +156,11 @@ async def get_trip_sheets_by_vehicle(
     response_model=TripSheetResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Создать путевой лист",
-    description="Создаёт новый путевой лист для указанного транспортного средства и заказа.",
+    description=(
+        "Создаёт новый путевой лист для указанного транспортного средства и "
+        "заказа. Заказ переводится в статус `in_progress` в фоне, вскоре после "
+        "ответа (изменение приходит в ленте `/events/`)."
+    ),
     responses={400: {"description": "Не удалось создать путевой лист"}},
 )
 async def create_trip_sheet(
@@ -102,49 +168,127 @@ async def create_trip_sheet(
         ..., description="Данные для создания нового путевого листа"
     ),
     _: User = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
 ) -> TripSheetResponse:
-    vehicle = await VehicleDAO.find_one_or_none_by_id(trip_sheet_data.vehicle_id)
+    vehicle = await VehicleDAO.find_one_or_none_by_id(
+        trip_sheet_data.vehicle_id, session=session
+    )
     if not vehicle:
-        logger.warning(f"Машина с ID {trip_sheet_data.vehicle_id} не найдена")
+        logger.warning("Машина с ID %s не найдена", trip_sheet_data.vehicle_id)
         raise VehicleNotFoundException
 
-    order = await OrderDAO.find_one_or_none_by_id(trip_sheet_data.order_id)
+    order = await OrderDAO.find_one_or_none_by_id(
+        trip_sheet_data.order_id, session=session
+    )
     if not order:
-        logger.warning(f"Заказ с ID {trip_sheet_data.order_id} не найден")
+        logger.warning("Заказ с ID %s не найден", trip_sheet_data.order_id)
         raise OrderNotFoundException
 
     overlap = await TripSheetDAO.check_time_overlap(
-        trip_sheet_data.vehicle_id, trip_sheet_data.start_time, trip_sheet_data.end_time
+        trip_sheet_data.vehicle_id,
+        trip_sheet_data.start_time,
+        trip_sheet_data.end_time,
+        session=session,
     )
     if overlap:
         logger.warning(
-            f"Путевой лист для машины с ID {trip_sheet_data.vehicle_id} уже существует на это время."
+            "Путевой лист для машины с ID %s уже существует на это время.",
+            trip_sheet_data.vehicle_id,
         )
         raise TripSheetConflictTimeException
 
     try:
-        created_trip_sheet = await TripSheetDAO.add(**trip_sheet_data.model_dump())
-        logger.info(f"Создан путевой лист с ID {created_trip_sheet.id}")
+        created_trip_sheet = await TripSheetDAO.add(
+            session=session, **trip_sheet_data.model_dump()
+        )
+        logger.info("Создан путевой лист с ID %s", created_trip_sheet.id)
 
-        await OrderDAO.update_status(trip_sheet_data.order_id, "IN_PROGRESS")
+        # Статус заказа меняет воркер outbox после ответа: сообщение
+        # фиксируется вместе с путевым листом.
+        await enqueue(
+            ORDER_STATUS,
+            {
+                "order_id": trip_sheet_data.order_id,
+                "trip_sheet_id": created_trip_sheet.id,
+                "status": OrderStatus.IN_PROGRESS.value,
+            },
+            idempotency_key=f"tripsheets:{created_trip_sheet.id}:order_status",
+            session=session,
+        )
         logger.info(
-            f"Статус заказа с ID {trip_sheet_data.order_id} обновлён на 'in_progress'"
+            "Статус заказа с ID %s будет обновлён на 'in_progress'",
+            trip_sheet_data.order_id,
         )
 
         return created_trip_sheet
     except IntegrityError as e:
-        logger.error(f"Ошибка при создании путевого листа: {e}")
+        if TripSheetDAO.is_time_conflict(e):
+            logger.warning(
+                "Путевой лист для машины с ID %s уже существует на это время.",
+                trip_sheet_data.vehicle_id,
+            )
+            raise TripSheetConflictTimeException from e
+        logger.error("Ошибка при создании путевого листа: %s", e)
         raise TripSheetConflictException from e
     except Exception as e:
-        logger.error(f"Ошибка при обновлении статуса заказа: {e}")
+        logger.error("Ошибка при создании путевого листа: %s", e)
         raise
 
 
+@router.post(
+    "/assign",
+    response_model=TripSheetAssignResult,
+    status_code=status.HTTP_201_CREATED,
+    summary="Автоматически распределить заказы по машинам",
+    description=(
+        "Распределяет все ожидающие заказы (от старых к новым) по ближайшим "
+        "свободным окнам машин и создаёт для них путевые листы. Распределённые "
+        "заказы переводятся в статус `in_progress`."
+    ),
+    responses={
+        409: {"description": "Машина занята путевым листом, созданным параллельно"}
+    },
+)
+async def assign_trip_sheets(
+    assign_data: TripSheetAssign = Body(
+        default_factory=TripSheetAssign, description="Параметры распределения"
+    ),
+    _: User = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
+) -> TripSheetAssignResult:
+    start_time = assign_data.start_time or datetime.now()
+    if assign_data.end_time is not None and assign_data.end_time <= start_time:
+        raise InvalidTimeRangeException
+
+    try:
+        trip_sheets, unassigned = await assign_pending_orders(
+            start_time,
+            timedelta(minutes=assign_data.trip_duration_minutes),
+            schema=TripSheetResponse,
+            end=assign_data.end_time,
+            vehicle_type=assign_data.vehicle_type,
+            session=session,
+        )
+    except IntegrityError as e:
+        if TripSheetDAO.is_time_conflict(e):
+            logger.warning("Путевой лист пересёкся с созданным параллельно")
+            raise TripSheetConflictTimeException from e
+        logger.error("Ошибка при распределении заказов: %s", e)
+        raise TripSheetConflictException from e
+
+    logger.info(
+        "Создано путевых листов: %d, в ожидании: %d", len(trip_sheets), unassigned
+    )
+    return TripSheetAssignResult(
+        assigned=len(trip_sheets), unassigned=unassigned, trip_sheets=trip_sheets
+    )
+
+
 @router.delete(
     "/{trip_sheet_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Удалить путевой лист",
-    description="Удаляет путевой лист по ID и возвращает статус заказа в pending. Возвращает статус 204, если удаление прошло успешно.",
+    description="Удаляет путевой лист по ID. Заказ возвращается в pending фоновым воркером, если на него не осталось других путевых листов. Возвращает статус 204, если удаление прошло успешно.",
     responses={404: {"description": "Путевой лист не найден"}},
 )
 async def delete_trip_sheet(
@@ -152,20 +296,30 @@ async def delete_trip_sheet(
         ..., description="ID путевого листа, который нужно удалить"
     ),
     _: User = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
 ) -> Response:
-    logger.info(f"Попытка удалить путевой лист с ID {trip_sheet_id}")
+    logger.info("Попытка удалить путевой лист с ID %s", trip_sheet_id)
 
-    trip_sheet = await TripSheetDAO.find_one_or_none_by_id(trip_sheet_id)
+    trip_sheet = await TripSheetDAO.find_one_or_none_by_id(
+        trip_sheet_id, session=session
+    )
     if not trip_sheet:
-        logger.warning(f"Путевой лист с ID {trip_sheet_id} не найден для удаления")
+        logger.warning("Путевой лист с ID %s не найден для удаления", trip_sheet_id)
         raise TripSheetNotFoundException
 
-    deleted_count = await TripSheetDAO.delete(id=trip_sheet_id)
+    deleted_count = await TripSheetDAO.delete(session=session, id=trip_sheet_id)
     if deleted_count == 0:
-        logger.warning(f"Путевой лист с ID {trip_sheet_id} не удален")
+        logger.warning("Путевой лист с ID %s не удален", trip_sheet_id)
         raise TripSheetNotFoundException
 
-    await OrderDAO.update_status(trip_sheet.order_id, "PENDING")
-    logger.info(f"Статус заказа с ID {trip_sheet.order_id} возвращен в pending")
+    # Заказ возвращает в pending воркер outbox, если на него не осталось
+    # других путевых листов.
+    await enqueue(
+        ORDER_RELEASED,
+        {"order_id": trip_sheet.order_id},
+        idempotency_key=f"tripsheets:{trip_sheet_id}:order_released",
+        session=session,
+    )
+    logger.info("Статус заказа с ID %s будет возвращен в pending", trip_sheet.order_id)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -5,8 +5,13 @@ from pydantic import (
     ConfigDict,
     Field,
     field_validator,
+    model_validator,
 )
 
+from app.enums import VehicleType
+from app.orders.schemas import OrderResponse
+from app.vehicles.schemas import VehicleResponse
+
 
 class TripSheetCreate(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -42,6 +47,13 @@ class TripSheetCreate(BaseModel):
             )
         return value
 
+    @model_validator(mode="after")
+    def validate_time_range(self):
+        """Проверка, что рейс заканчивается позже, чем начинается"""
+        if self.end_time <= self.start_time:
+            raise ValueError("Время завершения рейса должно быть позже времени начала.")
+        return self
+
 
 class TripSheetUpdate(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -89,3 +101,53 @@ class TripSheetResponse(BaseModel):
     order_id: int
     start_time: datetime
     end_time: datetime
+
+
+class TripSheetExpandedResponse(TripSheetResponse):
+    vehicle: VehicleResponse | None = Field(
+        None, description="Машина путевого листа (при expand=vehicle)"
+    )
+    order: OrderResponse | None = Field(
+        None, description="Заказ путевого листа (при expand=order)"
+    )
+
+
+class TripSheetAssign(BaseModel):
+    start_time: datetime | None = Field(
+        None,
+        description="Начало горизонта планирования (по умолчанию — текущее время)",
+        json_schema_extra={"example": datetime.now().strftime("%Y-%m-%d %H:%M:%S")},
+    )
+
+    end_time: datetime | None = Field(
+        None,
+        description=(
+            "Конец горизонта: заказы, рейс по которым не успевает завершиться, "
+            "остаются в ожидании. По умолчанию не ограничен"
+        ),
+    )
+
+    trip_duration_minutes: int = Field(
+        480, ge=1, le=7 * 24 * 60, description="Длительность одного рейса в минутах"
+    )
+
+    vehicle_type: VehicleType | None = Field(
+        None, description="Распределять только на машины этого типа"
+    )
+
+    @model_validator(mode="after")
+    def validate_time_range(self):
+        """Проверка, что горизонт заканчивается позже, чем начинается"""
+        if self.start_time and self.end_time and self.end_time <= self.start_time:
+            raise ValueError("Конец горизонта должен быть позже его начала.")
+        return self
+
+
+class TripSheetAssignResult(BaseModel):
+    assigned: int = Field(..., description="Количество распределённых заказов")
+    unassigned: int = Field(
+        ..., description="Количество заказов, оставшихся в ожидании"
+    )
+    trip_sheets: list[TripSheetResponse] = Field(
+        ..., description="Созданные путевые листы"
+    )
@@ -3,18 +3,26 @@ from datetime import UTC, datetime, timedelta
 from jose import jwt
 from passlib.context import CryptContext
 
-from app.config import get_auth_data
+from app.config import get_auth_data, settings
 from app.users.dao import UserDAO
+from app.users.hashing import PasswordHashPool
+from app.users.models import User
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    return await password_hash_pool.run(pwd_context.hash, password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run(
+        pwd_context.verify, plain_password, hashed_password
+    )
 
 
 def create_access_token(data: dict[str, str], expires_delta: timedelta) -> str:
@@ -33,8 +41,22 @@ def create_refresh_token(data: dict[str, str]) -> str:
     return create_access_token(data, expires)
 
 
-async def authenticate_user(username: str, password: str):
-    user = await UserDAO.find_one_or_none(username=username)
-    if not user or not verify_password(password, user.hashed_password):
+async def authenticate_user(username: str, password: str) -> int | None:
+    """
+    Проверить логин и пароль.
+
+    Пользователь читается в своей короткой транзакции, и соединение
+    возвращается в пул до проверки пароля: bcrypt может ждать в очереди
+    пула хеширования, и всплеск логинов не должен занимать соединения БД,
+    нужные остальным запросам.
+
+    :param username: Имя пользователя.
+    :param password: Пароль в открытом виде.
+    :return: ID пользователя или None, если логин или пароль неверны.
+    """
+    user = await UserDAO.find_one_or_none(
+        columns=[User.id, User.hashed_password], username=username
+    )
+    if not user or not await verify_password(password, user.hashed_password):
         return None
-    return user
+    return user.id
@@ -1,6 +1,17 @@
+from sqlalchemy.exc import IntegrityError
+
 from app.dao.base import BaseDAO
 from app.models import User
 
+# SQLSTATE unique_violation. Единственное уникальное ограничение users,
+# кроме первичного ключа из последовательности, — на username.
+UNIQUE_VIOLATION = "23505"
+
 
 class UserDAO(BaseDAO):
     model = User
+
+    @staticmethod
+    def is_username_taken(error: IntegrityError) -> bool:
+        """Нарушено ли ограничение уникальности имени пользователя."""
+        return getattr(error.orig, "sqlstate", None) == UNIQUE_VIOLATION
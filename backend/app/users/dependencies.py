@@ -1,7 +1,12 @@
+import time
+
 from fastapi import Depends, HTTPException, Request, status
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import get_auth_data
+from app.cache import TTLCache
+from app.config import get_auth_data, settings
+from app.database import get_session
 from app.enums import UserRole
 from app.exceptions import (
     InsufficientPermissionsException,
@@ -10,9 +15,28 @@ from app.exceptions import (
     TokenNoFoundException,
     UserNotFoundException,
 )
+from app.profiling import timed
 from app.users.dao import UserDAO
 from app.users.models import User
 
+# Пользователи, уже проверенные по токену: повторные запросы с тем же токеном
+# не декодируют JWT и не ходят в БД. Кэш локален для воркера: смена роли
+# сбрасывает его только в воркере, обработавшем запрос, остальные видят
+# прежнюю роль до AUTH_CACHE_TTL секунд.
+token_cache: TTLCache[str, User] = TTLCache(
+    maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL
+)
+
+
+async def invalidate_user_tokens(user_id: int) -> None:
+    """
+    Сбросить кэшированные токены пользователя, например после смены роли.
+
+    Вызывается после коммита изменения (after_commit): до него запрос
+    авторизации прочитал бы из БД прежнюю роль и снова её закэшировал.
+    """
+    token_cache.evict(lambda user: user.id == user_id)
+
 
 def get_bearer_token(request: Request):
     auth_header = request.headers.get("Authorization")
@@ -53,7 +77,22 @@ def get_bearer_token_dependency(request: Request):
     return get_bearer_token(request)
 
 
-async def get_current_user(token: str = Depends(get_bearer_token_dependency)):
+async def get_current_user(
+    token: str = Depends(get_bearer_token_dependency),
+    session: AsyncSession = Depends(get_session),
+):
+    with timed("auth"):
+        return await _authenticate(token, session)
+
+
+async def _authenticate(token: str, session: AsyncSession) -> User:
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+    # Пользователь, прочитанный из БД до сброса кэша, не кэшируется: иначе
+    # в кэш вернулась бы прежняя роль.
+    generation = token_cache.generation
+
     payload = decode_token(token)
     expire = payload.get("exp")
     if not expire:
@@ -63,9 +102,15 @@ async def get_current_user(token: str = Depends(get_bearer_token_dependency)):
     if not user_id:
         raise NoUserIdException
 
-    user = await UserDAO.find_one_or_none_by_id(int(user_id))
+    user = await UserDAO.find_one_or_none_by_id(int(user_id), session=session)
     if not user:
         raise UserNotFoundException
+
+    # Отвязываем пользователя от сессии, иначе откат транзакции запроса
+    # пометит его атрибуты устаревшими и кэшированный объект станет непригоден.
+    session.expunge(user)
+    if generation == token_cache.generation:
+        token_cache.set(token, user, ttl=expire - time.time())
     return user
 
 
@@ -73,3 +118,19 @@ async def get_current_admin_user(current_user: User = Depends(get_current_user))
     if current_user.role == UserRole.ADMIN:
         return current_user
     raise InsufficientPermissionsException
+
+
+async def require_monitoring_access(
+    request: Request, session: AsyncSession = Depends(get_session)
+) -> None:
+    """
+    Доступ к эндпоинтам мониторинга: по умолчанию только администратор.
+
+    С MONITORING_PUBLIC=true проверка отключается — например, чтобы
+    Prometheus собирал /metrics без токена. Тогда эндпоинты нужно закрыть
+    на уровне сети (доступны только из внутренней сети).
+    """
+    if settings.MONITORING_PUBLIC:
+        return
+    user = await get_current_user(get_bearer_token(request), session)
+    await get_current_admin_user(user)
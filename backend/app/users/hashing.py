@@ -0,0 +1,69 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from app.exceptions import PasswordHashingBusyException
+
+R = TypeVar("R")
+
+
+class PasswordHashPool:
+    """
+    Пул потоков для хеширования и проверки паролей.
+
+    bcrypt отпускает GIL, поэтому вычисления в потоках не блокируют event loop.
+    Число ожидающих задач ограничено: при переполнении запрос сразу получает
+    503, а не растягивает задержку для всех остальных.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.duration_total = 0.0
+        self.duration_max = 0.0
+
+    async def run(self, func: Callable[..., R], *args: Any) -> R:
+        """
+        Выполнить функцию в пуле.
+
+        :param func: Функция хеширования или проверки пароля.
+        :param args: Аргументы функции.
+        :return: Результат функции.
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHashingBusyException
+
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            duration = time.perf_counter() - start
+            self.pending -= 1
+            self.completed += 1
+            self.duration_total += duration
+            self.duration_max = max(self.duration_max, duration)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Текущая загрузка пула и накопленные счётчики."""
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "duration_avg_ms": (
+                self.duration_total / self.completed * 1000 if self.completed else 0.0
+            ),
+            "duration_max_ms": self.duration_max * 1000,
+        }
@@ -1,8 +1,12 @@
 from datetime import timedelta
+from functools import partial
 
 from fastapi import APIRouter, Depends, Header, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
+from app.database import after_commit, get_session
 from app.exceptions import (
     IncorrectUsernameOrPasswordException,
     InvalidRegisterToken,
@@ -23,9 +27,10 @@ from app.users.dependencies import (
     get_current_admin_user,
     get_current_user,
     get_refresh_token,
+    invalidate_user_tokens,
 )
 from app.users.models import User
-from app.users.schemas import UpdateUserRole, UserAuth, UserRegister
+from app.users.schemas import UpdateUserRole, UserAuth, UserRegister, UserResponse
 
 router = APIRouter(prefix="/auth", tags=["Авторизация"])
 
@@ -39,19 +44,28 @@ router = APIRouter(prefix="/auth", tags=["Авторизация"])
 async def register_user(
     user_data: UserRegister,
     x_register_token: str = Header(...),
+    session: AsyncSession = Depends(get_session),
 ) -> dict:
     if x_register_token != settings.REGISTER_SECRET_TOKEN:
         raise InvalidRegisterToken
 
-    user = await UserDAO.find_one_or_none(username=user_data.username)
-    if user:
-        raise UserAlreadyExistsException
-
     if user_data.password != user_data.password_check:
         raise PasswordMismatchException
 
-    hashed_password = get_password_hash(user_data.password)
-    await UserDAO.add(username=user_data.username, hashed_password=hashed_password)
+    # Хеш считается до первого запроса к БД: соединение берётся из пула
+    # только при INSERT и не ждёт очереди пула хеширования. Занятое имя
+    # определяется по ограничению уникальности, а не отдельной проверкой.
+    hashed_password = await get_password_hash(user_data.password)
+    try:
+        await UserDAO.add(
+            session=session,
+            username=user_data.username,
+            hashed_password=hashed_password,
+        )
+    except IntegrityError as e:
+        if UserDAO.is_username_taken(e):
+            raise UserAlreadyExistsException from e
+        raise
 
     return {"message": "Вы успешно зарегистрированы"}
 
@@ -78,16 +92,16 @@ async def register_user(
     },
 )
 async def auth_user(user_data: UserAuth, response: Response):
-    user = await authenticate_user(
+    user_id = await authenticate_user(
         username=user_data.username, password=user_data.password
     )
-    if not user:
+    if user_id is None:
         raise IncorrectUsernameOrPasswordException
 
     access_token = create_access_token(
-        {"sub": str(user.id)}, expires_delta=timedelta(minutes=15)
+        {"sub": str(user_id)}, expires_delta=timedelta(minutes=15)
     )
-    refresh_token = create_refresh_token({"sub": str(user.id)})
+    refresh_token = create_refresh_token({"sub": str(user_id)})
 
     response.set_cookie(key="access_token", value=access_token, httponly=True)
     response.set_cookie(key="refresh_token", value=refresh_token, httponly=True)
@@ -143,12 +157,16 @@ async def logout_user(response: Response):
 
 @router.get(
     "/all_users/",
+    response_model=list[UserResponse],
     summary="Получить всех пользователей",
     description="Возвращает список всех пользователей. Доступно только для администратора.",
     responses={200: {"description": "Список пользователей"}},
 )
-async def get_all_users(user_data: User = Depends(get_current_admin_user)):
-    return await UserDAO.find_all()
+async def get_all_users(
+    user_data: User = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
+):
+    return await UserDAO.find_all(session=session, schema=UserResponse)
 
 
 @router.patch(
@@ -163,16 +181,21 @@ async def get_all_users(user_data: User = Depends(get_current_admin_user)):
 async def update_user_role(
     data: UpdateUserRole,
     _: User = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
 ):
-    user = await UserDAO.find_one_or_none_by_id(data.user_id)
+    user = await UserDAO.find_one_or_none_by_id(data.user_id, session=session)
     if not user:
         raise UserNotFoundException
 
-    updated_rows = await UserDAO.update({"id": data.user_id}, role=data.new_role)
+    updated_rows = await UserDAO.update(
+        {"id": data.user_id}, session=session, role=data.new_role
+    )
 
     if updated_rows == 0:
         raise UnableUpdateRoleException
 
+    after_commit(session, partial(invalidate_user_tokens, data.user_id))
+
     return {
         "message": f"Роль пользователя с ID {data.user_id} успешно обновлена на {data.new_role}"
     }
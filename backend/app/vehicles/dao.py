@@ -1,28 +1,101 @@
-from sqlalchemy import select
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import Row, exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.dao.base import BaseDAO
-from app.database import async_session_maker
+from app.database import execute_read, session_scope
+from app.enums import VehicleType
 from app.models import Order, TripSheet, Vehicle
+from app.trip_sheets.dao import TripSheetDAO
 
 
 class VehicleDAO(BaseDAO):
     model = Vehicle
 
     @classmethod
-    async def get_orders_for_vehicle(cls, vehicle_id: int) -> list[Order]:
+    def _orders_for_vehicle_query(cls, vehicle_id: int):
+        return (
+            select(Order)
+            .join(TripSheet, TripSheet.order_id == Order.id)
+            .filter(TripSheet.vehicle_id == vehicle_id)
+            .options(joinedload(Order.created_by))
+        )
+
+    @classmethod
+    async def get_orders_for_vehicle(
+        cls, vehicle_id: int, session: AsyncSession | None = None
+    ) -> list[Order]:
         """
         Получить все заказы, связанные с машиной.
 
         :param vehicle_id: Идентификатор машины.
+        :param session: Сессия текущего запроса.
         :return: Список заказов для машины.
         """
-        async with async_session_maker() as session:
-            query = (
-                select(Order)
-                .join(TripSheet, TripSheet.order_id == Order.id)
-                .filter(TripSheet.vehicle_id == vehicle_id)
-                .options(joinedload(Order.created_by))
+        async with session_scope(session) as db_session:
+            result = await execute_read(
+                db_session, cls._orders_for_vehicle_query(vehicle_id)
             )
-            result = await session.execute(query)
             return result.scalars().all()
+
+    @classmethod
+    def _available_query(
+        cls,
+        start_time: datetime,
+        end_time: datetime,
+        vehicle_type: VehicleType | None = None,
+        schema: type[BaseModel] | None = None,
+    ):
+        # MATERIALIZED не даёт планировщику развернуть подзапрос в nested loop
+        # по индексу ограничения (по проходу на каждую машину): на длинных
+        # интервалах он недооценивает его стоимость. Так путевые листы
+        # интервала читаются один раз и отбрасываются через hash anti join.
+        busy = (
+            select(TripSheet.vehicle_id)
+            .where(TripSheetDAO._overlaps(start_time, end_time))
+            .cte("busy")
+            .prefix_with("MATERIALIZED")
+        )
+        query = (
+            cls._select(schema=schema)
+            .where(~exists().where(busy.c.vehicle_id == cls.model.id))
+            .order_by(cls.model.id)
+        )
+        if vehicle_type is not None:
+            query = query.where(cls.model.vehicle_type == vehicle_type)
+        return query
+
+    @classmethod
+    async def find_available(
+        cls,
+        start_time: datetime,
+        end_time: datetime,
+        vehicle_type: VehicleType | None = None,
+        schema: type[BaseModel] | None = None,
+        session: AsyncSession | None = None,
+    ) -> list[Vehicle] | list[Row[Any]]:
+        """
+        Найти машины, свободные в интервале [start_time, end_time).
+
+        Один запрос с анти-join: путевые листы, пересекающие интервал,
+        выбираются по GiST-индексу ix_tripsheets_time_range, и машины с
+        ними отбрасываются. Стоимость зависит от числа путевых листов в
+        интервале и размера парка, а не от общего числа путевых листов.
+
+        :param start_time: Начало интервала.
+        :param end_time: Конец интервала.
+        :param vehicle_type: Тип машины.
+        :param schema: Схема ответа: вернуть строки проекции по её полям.
+        :param session: Сессия текущего запроса.
+        :return: Список свободных машин или строк проекции.
+        """
+        async with session_scope(session) as db_session:
+            query = cls._available_query(start_time, end_time, vehicle_type, schema)
+            result = await execute_read(db_session, query)
+            if schema is None:
+                return list(result.scalars().all())
+            return list(result.all())
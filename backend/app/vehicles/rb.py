@@ -1,3 +1,8 @@
+from typing import Any
+
+from fastapi import Query
+
+from app.batch import IDS_DESCRIPTION, IDS_PATTERN, parse_ids
 from app.enums import VehicleType
 
 
@@ -7,16 +12,19 @@ class RBVehicle:
         driver_name: str | None = None,
         vehicle_type: VehicleType | None = None,
         license_plate: str | None = None,
+        ids: str | None = Query(None, pattern=IDS_PATTERN, description=IDS_DESCRIPTION),
     ):
         self.driver_name = driver_name
         self.vehicle_type = vehicle_type
         self.license_plate = license_plate
+        self.ids = parse_ids(ids)
 
-    def to_dict(self) -> dict[str, int]:
+    def to_dict(self) -> dict[str, Any]:
         data = {
             "driver_name": self.driver_name,
             "vehicle_type": self.vehicle_type,
             "license_plate": self.license_plate,
+            "ids": self.ids,
         }
         filtered_data = {key: value for key, value in data.items() if value is not None}
         return filtered_data
@@ -1,9 +1,15 @@
 import logging
+from datetime import datetime
 
-from fastapi import APIRouter, Body, Depends, Path, Response, status
+from fastapi import APIRouter, Body, Depends, Path, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.exceptions import VehicleNotFoundException
+from app.cache import response_cache
+from app.database import get_session
+from app.enums import VehicleType
+from app.exceptions import InvalidTimeRangeException, VehicleNotFoundException
 from app.orders.schemas import OrderResponse
+from app.serialization import dump_row, dump_rows
 from app.users.dependencies import get_current_admin_user
 from app.users.models import User
 from app.vehicles.dao import VehicleDAO
@@ -23,15 +29,54 @@ router = APIRouter(
     "/",
     response_model=list[VehicleResponse],
     summary="Получить все машины",
-    description="Возвращает список всех машин с возможностью фильтрации.",
+    description=(
+        "Возвращает список всех машин с возможностью фильтрации. С `ids=1,2,3` "
+        "возвращаются только машины с этими id — одним запросом вместо "
+        "`GET /vehicles/{id}` для каждой."
+    ),
+    responses={304: {"description": "Ответ не изменился (If-None-Match)"}},
 )
 async def get_all_vehicles(
+    request: Request,
     request_body: RBVehicle = Depends(),
-) -> list[VehicleResponse]:
+) -> Response:
     logger.info("Запрос на получение всех машин")
-    vehicles = await VehicleDAO.find_all(**request_body.to_dict())
-    logger.info(f"Найдено машин: {len(vehicles)}")
-    return vehicles
+    filters = request_body.to_dict()
+
+    async def load() -> bytes:
+        vehicles = await VehicleDAO.find_all(schema=VehicleResponse, **filters)
+        logger.info("Найдено машин: %d", len(vehicles))
+        return dump_rows(vehicles)
+
+    key = await response_cache.list_key(VehicleDAO.model.__tablename__, filters)
+    return await response_cache.respond(
+        request, VehicleDAO.model.__tablename__, key, load
+    )
+
+
+@router.get(
+    "/available",
+    response_model=list[VehicleResponse],
+    summary="Найти свободные машины",
+    description=(
+        "Возвращает машины, у которых нет путевых листов, пересекающихся "
+        "с интервалом `[start, end)`, с возможностью фильтрации по типу."
+    ),
+    responses={400: {"description": "Некорректный интервал"}},
+)
+async def get_available_vehicles(
+    start: datetime = Query(..., description="Начало интервала"),
+    end: datetime = Query(..., description="Конец интервала"),
+    vehicle_type: VehicleType | None = Query(None, description="Тип машины"),
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    if end <= start:
+        raise InvalidTimeRangeException
+    vehicles = await VehicleDAO.find_available(
+        start, end, vehicle_type, schema=VehicleResponse, session=session
+    )
+    logger.info("Свободных машин в интервале %s — %s: %d", start, end, len(vehicles))
+    return Response(dump_rows(vehicles), media_type="application/json")
 
 
 @router.get(
@@ -39,17 +84,29 @@ async def get_all_vehicles(
     response_model=VehicleResponse,
     summary="Получить машину по ID",
     description="Возвращает информацию о машине по его уникальному идентификатору.",
-    responses={404: {"description": "Машина не найдена"}},
+    responses={
+        304: {"description": "Ответ не изменился (If-None-Match)"},
+        404: {"description": "Машина не найдена"},
+    },
 )
 async def get_one_vehicle_by_id(
+    request: Request,
     vehicle_id: int = Path(..., description="ID машины, которую нужно получить"),
-) -> VehicleResponse:
-    vehicle = await VehicleDAO.find_one_or_none_by_id(vehicle_id)
-    if not vehicle:
-        logger.warning(f"Машина с ID {vehicle_id} не найдена")
-        raise VehicleNotFoundException
-    logger.info(f"Получена информация о машине с ID {vehicle_id}")
-    return vehicle
+) -> Response:
+    async def load() -> bytes:
+        vehicle = await VehicleDAO.find_one_or_none_by_id(
+            vehicle_id, schema=VehicleResponse
+        )
+        if not vehicle:
+            logger.warning("Машина с ID %s не найдена", vehicle_id)
+            raise VehicleNotFoundException
+        logger.info("Получена информация о машине с ID %s", vehicle_id)
+        return dump_row(vehicle)
+
+    key = await response_cache.item_key(VehicleDAO.model.__tablename__, vehicle_id)
+    return await response_cache.respond(
+        request, VehicleDAO.model.__tablename__, key, load
+    )
 
 
 @router.post(
@@ -64,10 +121,11 @@ async def create_vehicle(
         ..., description="Данные для создания нового автомобиля"
     ),
     _: User = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
 ) -> VehicleResponse:
-    logger.info(f"Создание машины: {vehicle_data}")
-    created_vehicle = await VehicleDAO.add(**vehicle_data.model_dump())
-    logger.info(f"Создана машина с ID {created_vehicle.id}")
+    logger.info("Создание машины: %s", vehicle_data)
+    created_vehicle = await VehicleDAO.add(session=session, **vehicle_data.model_dump())
+    logger.info("Создана машина с ID %s", created_vehicle.id)
     return created_vehicle
 
 
@@ -81,13 +139,14 @@ async def create_vehicle(
 async def delete_vehicle(
     vehicle_id: int = Path(..., description="ID машины, которую нужно удалить"),
     _: User = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
 ) -> Response:
-    logger.info(f"Попытка удалить машину с ID {vehicle_id}")
-    deleted_count = await VehicleDAO.delete(id=vehicle_id)
+    logger.info("Попытка удалить машину с ID %s", vehicle_id)
+    deleted_count = await VehicleDAO.delete(session=session, id=vehicle_id)
     if deleted_count == 0:
-        logger.warning(f"Машина с ID {vehicle_id} не найдена для удаления")
+        logger.warning("Машина с ID %s не найдена для удаления", vehicle_id)
         raise VehicleNotFoundException
-    logger.info(f"Удалена машина с ID {vehicle_id}")
+    logger.info("Удалена машина с ID %s", vehicle_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -102,13 +161,16 @@ async def get_vehicle_orders_history(
     vehicle_id: int = Path(
         ..., description="ID машины, для которой нужно получить историю заказов"
     ),
+    session: AsyncSession = Depends(get_session),
 ) -> list[OrderResponse]:
-    vehicle = await VehicleDAO.find_one_or_none_by_id(vehicle_id)
+    vehicle = await VehicleDAO.find_one_or_none_by_id(vehicle_id, session=session)
     if not vehicle:
-        logger.warning(f"Машина с ID {vehicle_id} не найдена")
+        logger.warning("Машина с ID %s не найдена", vehicle_id)
         raise VehicleNotFoundException
 
-    orders = await VehicleDAO.get_orders_for_vehicle(vehicle_id)
-    logger.info(f"История заказов для машины с ID {vehicle_id}: {len(orders)} заказов")
+    orders = await VehicleDAO.get_orders_for_vehicle(vehicle_id, session=session)
+    logger.info(
+        "История заказов для машины с ID %s: %d заказов", vehicle_id, len(orders)
+    )
 
     return orders
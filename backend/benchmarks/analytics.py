@@ -0,0 +1,139 @@
+"""
+Задержка аналитики: сводки по дням против GROUP BY по таблице orders.
+
+В транзакции, которая в конце откатывается, в orders добавляются
+синтетические заказы за несколько лет (сводки обновляет триггер на orders).
+Затем замеряются:
+
+* revenue — запрос GET /analytics/revenue по сводке order_daily_stats;
+* raw — тот же результат прямым GROUP BY по orders (как без сводки);
+* dashboard — плитки GET /analytics/dashboard;
+* insert — добавление одного заказа с триггером сводок и без него;
+* rebuild — пересборка всех сводок (python -m app.analytics.rebuild).
+
+Запуск (БД из .env, миграции применены):
+
+    python -m benchmarks.analytics --rows 1000000
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import date, timedelta
+from functools import partial
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analytics.dao import OrderDailyStatsDAO, OrderStatusTotalsDAO
+from app.analytics.rollups import rebuild_rollups
+from app.database import async_session_maker
+from app.enums import AnalyticsPeriod
+from benchmarks.stats import print_latency
+
+DATE_FROM = date(2020, 1, 1)
+DATE_TO = date(2024, 12, 31)
+RAW_PARAMS = {"date_from": DATE_FROM, "date_end": DATE_TO + timedelta(days=1)}
+
+SEED_SQL = [
+    """
+    INSERT INTO users (username, hashed_password, role)
+    VALUES ('bench_analytics', '-', 'DISPATCHER')
+    """,
+    """
+    INSERT INTO orders (client_name, cost, order_date, status, created_by_id)
+    SELECT
+        'Клиент ' || g,
+        1 + (g::bigint * 7919) % 100000,
+        timestamp '2020-01-01' + (g::bigint * 7907 % :rows) * (interval '5 years' / :rows),
+        (ARRAY['PENDING', 'IN_PROGRESS', 'COMPLETED'])[1 + g % 3]::orderstatus,
+        (SELECT id FROM users WHERE username = 'bench_analytics')
+    FROM generate_series(1, :rows) AS g
+    """,
+    "ANALYZE orders",
+]
+
+RAW_SQL = text(
+    """
+    SELECT
+        date_trunc('month', order_date)::date AS period_start,
+        count(*) AS orders_count,
+        sum(cost) AS revenue,
+        sum(sum(cost)) OVER (ORDER BY date_trunc('month', order_date)) AS cumulative_revenue
+    FROM orders
+    WHERE order_date >= :date_from AND order_date < :date_end
+    GROUP BY date_trunc('month', order_date)
+    ORDER BY 1
+    """
+)
+
+INSERT_ORDER_SQL = text(
+    """
+    INSERT INTO orders (client_name, cost, order_date, status, created_by_id)
+    SELECT 'Новый клиент', 100, timestamp '2022-06-15 12:00', 'PENDING', id
+    FROM users WHERE username = 'bench_analytics'
+    """
+)
+
+
+async def revenue(session: AsyncSession) -> list:
+    return await OrderDailyStatsDAO.revenue(
+        AnalyticsPeriod.MONTH, DATE_FROM, DATE_TO, session=session
+    )
+
+
+async def measure(
+    title: str, run: Callable[[], Awaitable[Any]], iterations: int
+) -> None:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await run()
+        samples.append(time.perf_counter() - start)
+    print_latency(title, samples)
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with async_session_maker() as session:
+        began = time.perf_counter()
+        for statement in SEED_SQL:
+            await session.execute(text(statement), {"rows": args.rows})
+        print(f"rows={args.rows}: seeded in {time.perf_counter() - began:.2f}s")
+
+        raw = (await session.execute(RAW_SQL, RAW_PARAMS)).all()
+        rollup = await revenue(session)
+        if [tuple(row) for row in rollup] != [tuple(row) for row in raw]:
+            raise SystemExit("Сводка расходится с GROUP BY по orders")
+
+        await measure("revenue (rollup)", lambda: revenue(session), args.iterations)
+        await measure(
+            "revenue (raw GROUP BY)",
+            lambda: session.execute(RAW_SQL, RAW_PARAMS),
+            args.iterations,
+        )
+
+        await measure(
+            "dashboard",
+            lambda: OrderStatusTotalsDAO.dashboard(date.today(), session=session),
+            args.iterations,
+        )
+        insert = partial(session.execute, INSERT_ORDER_SQL)
+        await measure("insert (rollup trigger)", insert, args.iterations)
+        await session.execute(text("ALTER TABLE orders DISABLE TRIGGER USER"))
+        await measure("insert (no trigger)", insert, args.iterations)
+        await session.execute(text("ALTER TABLE orders ENABLE TRIGGER USER"))
+
+        began = time.perf_counter()
+        await rebuild_rollups(session=session)
+        print(f"rebuild in {time.perf_counter() - began:.2f}s")
+
+        await session.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,119 @@
+"""
+Время автоматического распределения ожидающих заказов (POST /tripsheets/assign).
+
+В транзакции, которая в конце откатывается, добавляются ожидающие заказы,
+машины и уже существующие путевые листы этих машин в горизонте
+планирования. Затем распределение запускается несколько раз, каждый раз
+в точке сохранения, которая после замера откатывается.
+
+Запуск (БД из .env, миграции применены):
+
+    python -m benchmarks.auto_assign --orders 10000 --vehicles 500
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app.database import async_session_maker
+from app.trip_sheets.assignment import assign_pending_orders
+from app.trip_sheets.schemas import TripSheetResponse
+from benchmarks.stats import print_latency
+
+START = datetime(2030, 1, 1)
+TRIP = timedelta(hours=4)
+
+SEED_SQL = [
+    """
+    INSERT INTO users (username, hashed_password, role)
+    VALUES ('bench_assign', '-', 'DISPATCHER')
+    """,
+    """
+    INSERT INTO vehicles (driver_name, vehicle_type, license_plate)
+    SELECT 'Водитель ' || g, 'TRUCK', 'AA' || g
+    FROM generate_series(1, :vehicles) AS g
+    """,
+    """
+    INSERT INTO orders (client_name, cost, order_date, status, created_by_id)
+    SELECT
+        'Клиент ' || g,
+        1000 + g % 9000,
+        timestamp '2029-01-01' + g * interval '1 minute',
+        'PENDING',
+        (SELECT id FROM users WHERE username = 'bench_assign')
+    FROM generate_series(1, :orders) AS g
+    """,
+    """
+    INSERT INTO orders (client_name, cost, order_date, status, created_by_id)
+    SELECT
+        'Выполненный ' || g,
+        1000,
+        timestamp '2029-01-01',
+        'COMPLETED',
+        (SELECT id FROM users WHERE username = 'bench_assign')
+    FROM generate_series(1, :busy) AS g
+    """,
+    # По :busy рейсов на машину: каждый в своём дне горизонта, со сдвигом
+    # и длительностью, зависящими от машины.
+    """
+    INSERT INTO tripsheets (vehicle_id, order_id, start_time, end_time)
+    SELECT v.id, o.id, t.start_time, t.start_time + (1 + (v.n + o.k) % 4) * interval '1 hour'
+    FROM (
+        SELECT id, row_number() OVER (ORDER BY id) AS n
+        FROM vehicles WHERE license_plate LIKE 'AA%'
+    ) AS v
+    CROSS JOIN (
+        SELECT o.id, row_number() OVER (ORDER BY o.id) AS k
+        FROM orders o JOIN users u ON u.id = o.created_by_id
+        WHERE u.username = 'bench_assign' AND o.status = 'COMPLETED'
+    ) AS o
+    CROSS JOIN LATERAL (
+        SELECT CAST(:start AS timestamp) + (o.k - 1) * interval '1 day'
+            + (v.n * 7 + o.k * 3) % 20 * interval '1 hour' AS start_time
+    ) AS t
+    """,
+    "ANALYZE vehicles, orders, tripsheets",
+]
+
+
+async def main(args: argparse.Namespace) -> None:
+    params = {
+        "orders": args.orders,
+        "vehicles": args.vehicles,
+        "busy": args.busy,
+        "start": START,
+    }
+    async with async_session_maker() as session:
+        for statement in SEED_SQL:
+            await session.execute(text(statement), params)
+
+        samples = []
+        for _ in range(args.iterations):
+            savepoint = await session.begin_nested()
+            began = time.perf_counter()
+            trip_sheets, unassigned = await assign_pending_orders(
+                START, TRIP, schema=TripSheetResponse, session=session
+            )
+            samples.append(time.perf_counter() - began)
+            await savepoint.rollback()
+
+        last_end = max(trip_sheet.end_time for trip_sheet in trip_sheets)
+        print(
+            f"orders={args.orders} vehicles={args.vehicles} "
+            f"busy={args.vehicles * args.busy}: assigned={len(trip_sheets)} "
+            f"unassigned={unassigned} horizon={last_end - START}"
+        )
+        print_latency("assign_pending_orders", samples)
+        await session.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--vehicles", type=int, default=500)
+    parser.add_argument("--busy", type=int, default=20, help="рейсов на машину")
+    parser.add_argument("--iterations", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,89 @@
+"""
+Загрузка заказов по списку id: по одному запросу на id против пакета.
+
+В транзакции, которая в конце откатывается, в orders добавляются
+синтетические заказы. Затем одни и те же заказы загружаются двумя
+способами:
+
+* single — отдельный запрос на каждый id (как N вызовов GET /orders/{id});
+* ids — фильтр GET /orders/?ids=1,2,3.
+
+Запуск (БД из .env, миграции применены):
+
+    python -m benchmarks.batch_lookup --ids 100
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+
+from app.database import async_session_maker
+from app.orders.dao import OrderDAO
+from app.orders.schemas import OrderResponse
+from benchmarks.stats import print_latency
+
+SEED_SQL = [
+    """
+    INSERT INTO users (username, hashed_password, role)
+    VALUES ('bench_batch_lookup', '-', 'DISPATCHER')
+    """,
+    """
+    INSERT INTO orders (client_name, cost, order_date, status, created_by_id)
+    SELECT
+        'Клиент ' || g,
+        1000 + g,
+        timestamp '2020-01-01' + g * interval '1 minute',
+        'PENDING',
+        (SELECT id FROM users WHERE username = 'bench_batch_lookup')
+    FROM generate_series(1, :ids) AS g
+    """,
+]
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with async_session_maker() as session:
+        for statement in SEED_SQL:
+            await session.execute(text(statement), {"ids": args.ids})
+        result = await session.execute(
+            text(
+                "SELECT o.id FROM orders o JOIN users u ON u.id = o.created_by_id "
+                "WHERE u.username = 'bench_batch_lookup'"
+            )
+        )
+        ids = list(result.scalars().all())
+
+        async def single() -> None:
+            for order_id in ids:
+                await OrderDAO.find_one_or_none(
+                    session=session, schema=OrderResponse, id=order_id
+                )
+
+        async def batch() -> None:
+            await OrderDAO.find_all_filtered(
+                ids=ids, schema=OrderResponse, session=session
+            )
+
+        runs: list[tuple[str, Callable[[], Awaitable[None]]]] = [
+            ("single", single),
+            ("ids", batch),
+        ]
+        print(f"ids={len(ids)}")
+        for name, run in runs:
+            samples = []
+            for _ in range(args.iterations):
+                start = time.perf_counter()
+                await run()
+                samples.append(time.perf_counter() - start)
+            print_latency(name, samples)
+
+        await session.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ids", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
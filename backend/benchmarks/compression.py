@@ -0,0 +1,103 @@
+"""
+Большие списки заказов: сжатие ответа и повторный запрос с If-None-Match.
+
+В транзакции, которая в конце откатывается, в orders добавляются
+синтетические заказы. Затем для списка GET /orders/ замеряются:
+
+* full — выборка и сериализация списка (ответ 200);
+* fingerprint — отпечаток выборки для ETag (всё, что нужно для ответа 304);
+* gzip, br, zstd — размер тела и время сжатия каждой доступной кодировкой
+  (br и zstd — после uv sync --extra compression).
+
+Запуск (БД из .env, миграции применены):
+
+    python -m benchmarks.compression --rows 100000
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.compression import ENCODERS
+from app.database import async_session_maker
+from app.orders.dao import OrderDAO
+from app.orders.schemas import OrderResponse
+from app.serialization import dump_rows
+from benchmarks.stats import print_latency
+
+SEED_SQL = [
+    """
+    INSERT INTO users (username, hashed_password, role)
+    VALUES ('bench_compression', '-', 'DISPATCHER')
+    """,
+    """
+    INSERT INTO orders (client_name, cost, order_date, status, created_by_id)
+    SELECT
+        'ООО Клиент ' || g,
+        1 + (g * 7919) % 100000,
+        timestamp '2020-01-01' + g * interval '1 minute',
+        (ARRAY['PENDING', 'IN_PROGRESS', 'COMPLETED'])[1 + g % 3]::orderstatus,
+        (SELECT id FROM users WHERE username = 'bench_compression')
+    FROM generate_series(1, :rows) AS g
+    """,
+    "ANALYZE orders",
+]
+
+
+async def measure(
+    title: str, run: Callable[[], Awaitable[Any]], iterations: int
+) -> None:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await run()
+        samples.append(time.perf_counter() - start)
+    print_latency(title, samples)
+
+
+async def full(session: AsyncSession) -> bytes:
+    orders = await OrderDAO.find_all_filtered(schema=OrderResponse, session=session)
+    return dump_rows(orders)
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    encoder = ENCODERS[encoding]()
+    return encoder.compress(body) + encoder.finish()
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with async_session_maker() as session:
+        for statement in SEED_SQL:
+            await session.execute(text(statement), {"rows": args.rows})
+
+        body = await full(session)
+        print(f"rows={args.rows}: body={len(body) / 1024:.0f}KiB")
+        await measure("full (200)", lambda: full(session), args.iterations)
+        await measure(
+            "fingerprint (304)",
+            lambda: OrderDAO.fingerprint(session=session),
+            args.iterations,
+        )
+
+        for encoding in ENCODERS:
+            size = len(compress(encoding, body))
+            print(f"{encoding:<28} size={size / 1024:.0f}KiB ({size / len(body):.1%})")
+
+            async def run(encoding: str = encoding) -> bytes:
+                return compress(encoding, body)
+
+            await measure(f"{encoding} compress", run, args.iterations)
+
+        await session.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
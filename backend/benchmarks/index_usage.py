@@ -0,0 +1,155 @@
+"""
+Проверка, что запросы API используют предназначенные для них индексы.
+
+В транзакции, которая в конце откатывается, таблицы наполняются
+синтетическими данными и обновляется статистика. Затем для каждого запроса
+снимается EXPLAIN (FORMAT JSON) и проверяется, что в плане есть ожидаемый
+индекс. Запросы строятся теми же методами DAO, что и в API, поэтому
+изменение запроса, ломающее использование индекса, тоже будет замечено.
+
+Запуск (БД из .env, миграции применены; код возврата 1 при провале):
+
+    python -m benchmarks.index_usage --rows 200000
+"""
+
+import argparse
+import asyncio
+import sys
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Select, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker
+from app.enums import OrderStatus
+from app.models import Order, TripSheet
+from app.orders.dao import OrderDAO
+from app.trip_sheets.dao import TripSheetDAO
+from app.vehicles.dao import VehicleDAO
+from benchmarks.seed import rolled_back, seed_trip_sheets, seed_users, seed_vehicles
+
+USERS = 500
+VEHICLES = 200
+USERNAME_PREFIX = "index_usage_"
+PLATE_PREFIX = "IU"
+START = datetime(2020, 1, 1)
+STATUSES = [OrderStatus.COMPLETED] * 3 + [OrderStatus.IN_PROGRESS, OrderStatus.PENDING]
+
+
+@dataclass
+class Case:
+    name: str
+    query: Select
+    indexes: tuple[str, ...]
+
+
+def build_cases(user_id: int, vehicle_id: int, order_id: int) -> list[Case]:
+    return [
+        Case(
+            "GET /orders/?status=",
+            OrderDAO._filtered_query(status=OrderStatus.PENDING).limit(50),
+            ("ix_orders_status_order_date_id",),
+        ),
+        Case(
+            "GET /orders/?cost_from=&cost_to=",
+            OrderDAO._filtered_query(cost_from=5000, cost_to=5100).limit(50),
+            ("ix_orders_cost",),
+        ),
+        Case(
+            "GET /orders/?client_name=",
+            OrderDAO._filtered_query(client_name="Клиент 4321").limit(50),
+            ("ix_orders_client_name_trgm", "ix_orders_client_name_trgm_gist"),
+        ),
+        Case(
+            "orders by created_by_id",
+            select(Order.id).where(Order.created_by_id == user_id),
+            ("ix_orders_created_by_id",),
+        ),
+        Case(
+            "GET /tripsheets/vehicle/{id}",
+            TripSheetDAO._by_vehicle_query(vehicle_id),
+            # Рейсов одной машины немного, и их сортировка после
+            # uix_vehicle_order бывает дешевле упорядоченного чтения.
+            ("ix_tripsheets_vehicle_id_start_time", "uix_vehicle_order"),
+        ),
+        Case(
+            "GET /vehicles/{id}/orders",
+            VehicleDAO._orders_for_vehicle_query(vehicle_id),
+            ("ix_tripsheets_vehicle_id_start_time", "uix_vehicle_order"),
+        ),
+        Case(
+            "tripsheets by order_id",
+            select(TripSheet.id).where(TripSheet.order_id == order_id),
+            ("ix_tripsheets_order_id",),
+        ),
+    ]
+
+
+def plan_indexes(node: dict[str, Any]) -> Iterator[str]:
+    if "Index Name" in node:
+        yield node["Index Name"]
+    for child in node.get("Plans", []):
+        yield from plan_indexes(child)
+
+
+async def explain(session: AsyncSession, query: Select) -> dict[str, Any]:
+    connection = await session.connection()
+    sql = query.compile(
+        dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    return result.scalar_one()[0]["Plan"]
+
+
+async def seed(session: AsyncSession, rows: int) -> tuple[int, int, int]:
+    await seed_users(session, USERS, prefix=USERNAME_PREFIX)
+    await seed_vehicles(session, VEHICLES, prefix=PLATE_PREFIX)
+    await seed_trip_sheets(
+        session,
+        rows,
+        prefix=USERNAME_PREFIX,
+        plate_prefix=PLATE_PREFIX,
+        start=START,
+        statuses=STATUSES,
+    )
+    await session.execute(text("ANALYZE users, vehicles, orders, tripsheets"))
+
+    user_id, vehicle_id, order_id = (
+        await session.execute(
+            text(
+                "SELECT max(o.created_by_id), max(t.vehicle_id), max(t.order_id) "
+                "FROM tripsheets t JOIN orders o ON o.id = t.order_id"
+            )
+        )
+    ).one()
+    return user_id, vehicle_id, order_id
+
+
+async def main(args: argparse.Namespace) -> int:
+    failed = 0
+    async with async_session_maker() as session, rolled_back(session):
+        ids = await seed(session, args.rows)
+        for case in build_cases(*ids):
+            plan = await explain(session, case.query)
+            used = set(plan_indexes(plan))
+            ok = bool(used.intersection(case.indexes))
+            failed += not ok
+            print(
+                f"{'OK  ' if ok else 'FAIL'} {case.name:<34} used={sorted(used) or '-'}"
+            )
+            if not ok:
+                print(f"     expected one of {list(case.indexes)}")
+
+    async with async_session_maker() as session:
+        await session.execute(text("ANALYZE users, vehicles, orders, tripsheets"))
+        await session.commit()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,342 @@
+"""
+Нагрузочный бенчмарк API: пропускная способность и задержка p50/p95/p99.
+
+Работает с набором из benchmarks.seed того же размера (--scale). Каждый
+сценарий идёт отдельно: --concurrency клиентов в течение --duration секунд
+отправляют запросы без пауз, первые --warmup секунд не учитываются.
+
+* list — GET /orders/?limit=100 (первая страница заказов);
+* filter — GET /orders/ с фильтрами по статусу, стоимости, клиенту и дате;
+* trip_sheets — GET /tripsheets/?vehicle_id=...&expand=vehicle,order;
+* create_trip_sheet — POST /tripsheets/ (путевые листы создаются в 2100
+  году и удаляются после сценария, статусы заказов восстанавливаются);
+* login — POST /auth/login/ (bcrypt в пуле PASSWORD_HASH_WORKERS).
+
+С --save результаты записываются в benchmarks/baselines/<scale>.json, с
+--compare сравниваются с этим файлом: сценарий, у которого p95 выросла или
+пропускная способность упала больше чем на --tolerance, считается
+регрессией (код возврата 1). Базовые значения зависят от машины: их нужно
+снимать на той же машине и в том же режиме, что и сравнение.
+
+Запуск (БД из .env с набором seed; сервер поднят или --in-process):
+
+    python -m benchmarks.seed --scale 10k
+    python -m benchmarks.load --scale 10k --compare
+
+С --in-process запросы идут в приложение напрямую через ASGI, без uvicorn
+и сети: так в цифрах остаются DAO, сериализация и БД.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy import text
+
+from app.database import async_session_maker
+from benchmarks.seed import (
+    ADMIN_USERNAME,
+    PLATE_PREFIX,
+    SCALES,
+    SEED_PASSWORD,
+    USERNAME_PREFIX,
+)
+from benchmarks.stats import percentiles, print_latency
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+PAGE_SIZE = 100
+CREATE_START = datetime(2100, 1, 1)
+TRIP_DURATION = timedelta(minutes=30)
+
+FILTERS = [
+    {"status": "pending", "limit": PAGE_SIZE},
+    {"status": "completed", "cost_from": 50000, "cost_to": 60000, "limit": PAGE_SIZE},
+    {"client_name": "Клиент 12", "limit": PAGE_SIZE},
+    {"order_date": "2022-06-15"},
+    {"cost_from": 99000, "limit": PAGE_SIZE},
+]
+
+Scenario = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+@dataclass
+class Context:
+    users: int
+    admin_headers: dict[str, str]
+    vehicle_ids: list[int]
+    pending_order_ids: list[int]
+
+
+@dataclass
+class Result:
+    samples: list[float]
+    errors: int
+    elapsed: float
+
+    def summary(self) -> dict[str, float]:
+        stats = percentiles([sample * 1000 for sample in self.samples])
+        return {
+            "rps": round(len(self.samples) / self.elapsed, 1),
+            "p50": round(stats["p50"], 1),
+            "p95": round(stats["p95"], 1),
+            "p99": round(stats["p99"], 1),
+            "errors": self.errors,
+        }
+
+
+async def load_context(client: httpx.AsyncClient) -> Context:
+    async with async_session_maker() as session:
+        params = {"prefix": USERNAME_PREFIX, "plate_prefix": PLATE_PREFIX}
+        users = (
+            await session.execute(
+                text("SELECT count(*) FROM users WHERE username LIKE :prefix || '%'"),
+                params,
+            )
+        ).scalar_one()
+        vehicle_ids = (
+            await session.execute(
+                text(
+                    "SELECT id FROM vehicles WHERE license_plate LIKE "
+                    ":plate_prefix || '%' ORDER BY id"
+                ),
+                params,
+            )
+        ).scalars()
+        pending_order_ids = (
+            await session.execute(
+                text(
+                    "SELECT o.id FROM orders o JOIN users u ON u.id = o.created_by_id "
+                    "WHERE u.username LIKE :prefix || '%' AND o.status = 'PENDING' "
+                    "ORDER BY o.id LIMIT 10000"
+                ),
+                params,
+            )
+        ).scalars()
+        context = Context(users, {}, list(vehicle_ids), list(pending_order_ids))
+
+    if not context.users or not context.vehicle_ids or not context.pending_order_ids:
+        raise SystemExit("Набор не найден: сначала python -m benchmarks.seed")
+    response = await client.post(
+        "/auth/login/", json={"username": ADMIN_USERNAME, "password": SEED_PASSWORD}
+    )
+    response.raise_for_status()
+    context.admin_headers = {
+        "Authorization": f"Bearer {response.json()['access_token']}"
+    }
+    return context
+
+
+async def cleanup_created(context: Context) -> None:
+    """Удалить путевые листы сценария create_trip_sheet и вернуть статусы."""
+    async with async_session_maker() as session:
+        await session.execute(
+            text(
+                "DELETE FROM tripsheets WHERE start_time >= :start AND vehicle_id = "
+                "ANY(:vehicle_ids)"
+            ),
+            {"start": CREATE_START, "vehicle_ids": context.vehicle_ids},
+        )
+        await session.execute(
+            text("UPDATE orders SET status = 'PENDING' WHERE id = ANY(:ids)"),
+            {"ids": context.pending_order_ids},
+        )
+        await session.commit()
+
+
+def scenarios(context: Context) -> dict[str, Scenario]:
+    vehicles = len(context.vehicle_ids)
+
+    async def list_orders(client: httpx.AsyncClient, k: int) -> httpx.Response:
+        return await client.get("/orders/", params={"limit": PAGE_SIZE})
+
+    async def filter_orders(client: httpx.AsyncClient, k: int) -> httpx.Response:
+        return await client.get("/orders/", params=FILTERS[k % len(FILTERS)])
+
+    async def trip_sheets(client: httpx.AsyncClient, k: int) -> httpx.Response:
+        return await client.get(
+            "/tripsheets/",
+            params={
+                "vehicle_id": context.vehicle_ids[k % vehicles],
+                "expand": "vehicle,order",
+            },
+        )
+
+    async def create_trip_sheet(client: httpx.AsyncClient, k: int) -> httpx.Response:
+        # k-й рейс: машина k % vehicles, слот k // vehicles — рейсы одной
+        # машины не пересекаются, пара (машина, заказ) не повторяется.
+        slot = k // vehicles
+        order_id = context.pending_order_ids[slot % len(context.pending_order_ids)]
+        start = CREATE_START + slot * TRIP_DURATION
+        return await client.post(
+            "/tripsheets/",
+            headers=context.admin_headers,
+            json={
+                "vehicle_id": context.vehicle_ids[k % vehicles],
+                "order_id": order_id,
+                "start_time": start.isoformat(),
+                "end_time": (start + TRIP_DURATION).isoformat(),
+            },
+        )
+
+    async def login(client: httpx.AsyncClient, k: int) -> httpx.Response:
+        return await client.post(
+            "/auth/login/",
+            json={
+                "username": f"{USERNAME_PREFIX}{1 + k % context.users}",
+                "password": SEED_PASSWORD,
+            },
+        )
+
+    return {
+        "list": list_orders,
+        "filter": filter_orders,
+        "trip_sheets": trip_sheets,
+        "create_trip_sheet": create_trip_sheet,
+        "login": login,
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> Result:
+    counter = itertools.count()
+    samples: list[float] = []
+    errors = 0
+    began = time.perf_counter()
+    measure_from = began + warmup
+    deadline = measure_from + duration
+
+    async def worker() -> None:
+        nonlocal errors
+        while (start := time.perf_counter()) < deadline:
+            try:
+                response = await scenario(client, next(counter))
+                ok = response.is_success
+            except httpx.HTTPError:
+                ok = False
+            if start >= measure_from:
+                samples.append(time.perf_counter() - start)
+                errors += not ok
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return Result(samples, errors, time.perf_counter() - measure_from)
+
+
+def compare(
+    results: dict[str, dict[str, float]], baseline: dict[str, Any], tolerance: float
+) -> int:
+    failed = 0
+    for name, current in results.items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            print(f"SKIP {name:<24} нет базового значения")
+            continue
+        p95_change = current["p95"] / base["p95"] - 1
+        rps_change = current["rps"] / base["rps"] - 1
+        ok = (
+            p95_change <= tolerance
+            and rps_change >= -tolerance
+            and not (current["errors"] > base["errors"])
+        )
+        failed += not ok
+        print(
+            f"{'OK  ' if ok else 'FAIL'} {name:<24} "
+            f"p95 {base['p95']:.1f} -> {current['p95']:.1f}ms ({p95_change:+.0%})  "
+            f"rps {base['rps']:.0f} -> {current['rps']:.0f} ({rps_change:+.0%})  "
+            f"errors {base['errors']} -> {current['errors']}"
+        )
+    return failed
+
+
+def make_client(args: argparse.Namespace) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    if not args.in_process:
+        return httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60)
+
+    from main import app  # noqa: PLC0415
+
+    logging.disable(logging.INFO)
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app), base_url="http://load", timeout=60
+    )
+
+
+async def main(args: argparse.Namespace) -> int:
+    baseline_path = BASELINES_DIR / f"{args.scale}.json"
+    async with make_client(args) as client:
+        context = await load_context(client)
+        available = scenarios(context)
+        results = {}
+        for name in args.scenarios.split(","):
+            if name == "create_trip_sheet":
+                await cleanup_created(context)
+            result = await run_scenario(
+                client, available[name], args.concurrency, args.duration, args.warmup
+            )
+            if name == "create_trip_sheet":
+                await cleanup_created(context)
+            results[name] = result.summary()
+            print_latency(name, result.samples)
+            print(f"{'':<28} rps={results[name]['rps']:.1f}  errors={result.errors}")
+
+    report = {
+        "scale": args.scale,
+        "mode": "in-process" if args.in_process else "http",
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "scenarios": results,
+    }
+    if args.save:
+        BASELINES_DIR.mkdir(exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline saved to {baseline_path}")
+    if args.compare:
+        baseline = json.loads(baseline_path.read_text())
+        if (baseline["mode"], baseline["concurrency"]) != (
+            report["mode"],
+            report["concurrency"],
+        ):
+            print(
+                f"Базовые значения сняты в режиме {baseline['mode']} с "
+                f"concurrency={baseline['concurrency']}: сравнение некорректно"
+            )
+            return 1
+        return 1 if compare(results, baseline, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument(
+        "--in-process", action="store_true", help="запросы в приложение через ASGI"
+    )
+    parser.add_argument(
+        "--scenarios", default="list,filter,trip_sheets,create_trip_sheet,login"
+    )
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument(
+        "--save", action="store_true", help="записать результаты как базовые"
+    )
+    parser.add_argument(
+        "--compare", action="store_true", help="сравнить с базовыми значениями"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,123 @@
+"""
+Задержка посторонних эндпоинтов во время всплеска логинов.
+
+Сначала замеряется задержка пробного запроса без нагрузки, затем — пока
+параллельно идут логины. Пробный запрос по умолчанию (GET /orders/?limit=20)
+читает основную БД, поэтому замер ловит оба способа остановить остальные
+эндпоинты: bcrypt, блокирующий event loop, и логины, которые держат
+соединения пула, пока ждут хеширования. В обоих случаях p99 пробного
+запроса во второй фазе вырастает до сотен миллисекунд или упирается
+в pool_timeout.
+
+Запуск (сервер уже поднят):
+
+    python -m benchmarks.login_storm --base-url http://localhost:8000 \\
+        --logins 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.config import settings
+from benchmarks.stats import print_latency
+
+
+async def probe(
+    client: httpx.AsyncClient, path: str, stop: asyncio.Event, interval: float
+) -> tuple[list[float], int]:
+    samples = []
+    failed = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get(path)
+        samples.append(time.perf_counter() - start)
+        failed += response.is_error
+        await asyncio.sleep(interval)
+    return samples, failed
+
+
+def print_probe(label: str, result: tuple[list[float], int]) -> None:
+    samples, failed = result
+    print_latency(label, samples)
+    print(f"{'':29}failed={failed}")
+
+
+async def login_storm(
+    client: httpx.AsyncClient,
+    credentials: dict[str, str],
+    logins: int,
+    concurrency: int,
+) -> tuple[list[float], int]:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+    rejected = 0
+
+    async def login() -> None:
+        nonlocal rejected
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/auth/login/", json=credentials)
+            samples.append(time.perf_counter() - start)
+            if response.status_code == httpx.codes.SERVICE_UNAVAILABLE:
+                rejected += 1
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+    return samples, rejected
+
+
+async def ensure_user(client: httpx.AsyncClient, credentials: dict[str, str]) -> None:
+    await client.post(
+        "/auth/register/",
+        json={**credentials, "password_check": credentials["password"]},
+        headers={"X-Register-Token": settings.REGISTER_SECRET_TOKEN},
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    credentials = {"username": args.username, "password": args.password}
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=60
+    ) as client:
+        await ensure_user(client, credentials)
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(
+            probe(client, args.probe_path, stop, args.interval)
+        )
+        await asyncio.sleep(args.warmup)
+        stop.set()
+        print_probe(f"{args.probe_path} idle", await probe_task)
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(
+            probe(client, args.probe_path, stop, args.interval)
+        )
+        start = time.perf_counter()
+        login_samples, rejected = await login_storm(
+            client, credentials, args.logins, args.concurrency
+        )
+        elapsed = time.perf_counter() - start
+        stop.set()
+        print_probe(f"{args.probe_path} during logins", await probe_task)
+        print_latency("/auth/login/", login_samples)
+        print(
+            f"logins/s={args.logins / elapsed:.1f}  rejected(503)={rejected}  "
+            f"elapsed={elapsed:.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="bench_user")
+    parser.add_argument("--password", default="bench_password")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--probe-path", default="/orders/?limit=20")
+    parser.add_argument("--interval", type=float, default=0.01)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    asyncio.run(main(parser.parse_args()))
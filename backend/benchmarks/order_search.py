@@ -0,0 +1,205 @@
+"""
+Задержка поиска заказов по имени клиента на больших объёмах.
+
+Скрипт добавляет в orders синтетические заказы от отдельного пользователя,
+затем замеряет задержку фильтра client_name из GET /orders/ (ILIKE с limit)
+и ранжированного поиска GET /orders/search. Каждый замер повторяется без
+триграммных индексов (GIN и GiST): индексы удаляются внутри транзакции,
+которая потом откатывается.
+
+Запуск (БД из .env, миграции применены):
+
+    python -m benchmarks.order_search --rows 1000000
+    python -m benchmarks.order_search --rows 10000000 --keep
+
+С --keep данные остаются в базе, и повторный запуск досеивает только
+недостающие строки. Удалить их: --rows 0 --cleanup.
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker
+from app.orders.dao import OrderDAO
+from benchmarks.stats import print_latency
+
+BENCH_USERNAME = "bench_search"
+SEED_BATCH = 1_000_000
+
+PREFIXES = ["ООО", "ИП", "АО", "ЗАО", "ПАО"]
+SURNAMES = [
+    "Иванов", "Петров", "Сидоров", "Смирнов", "Кузнецов", "Попов", "Васильев",
+    "Соколов", "Михайлов", "Новиков", "Фёдоров", "Морозов", "Волков",
+    "Алексеев", "Лебедев", "Семёнов", "Егоров", "Павлов", "Козлов",
+    "Степанов", "Николаев", "Орлов", "Андреев", "Макаров", "Никитин",
+    "Захаров", "Зайцев", "Соловьёв", "Борисов", "Яковлев",
+]  # fmt: skip
+SUFFIXES = [
+    "Логистик", "Транс", "Строй", "Торг", "Агро", "Снаб", "Маркет", "Сервис",
+    "Групп", "Импорт", "Экспорт", "Пром", "Техно", "Авто", "Склад",
+]  # fmt: skip
+QUERIES = [
+    "Иванов",
+    "Логистик",
+    "Сидоров Агро",
+    "ООО Зайцев",
+    "Иван",
+    "Лебедев Склад 42",
+    "Транс",
+    "Соловьёв",
+    "Пром 7",
+    "Яковлев Экспорт",
+]
+
+SEED_SQL = text(
+    """
+    WITH words AS (
+        SELECT
+            CAST(:prefixes AS text[]) AS prefixes,
+            CAST(:surnames AS text[]) AS surnames,
+            CAST(:suffixes AS text[]) AS suffixes
+    )
+    INSERT INTO orders (client_name, cost, order_date, status, created_by_id)
+    SELECT
+        prefixes[1 + floor(random() * cardinality(prefixes))::int] || ' '
+        || surnames[1 + floor(random() * cardinality(surnames))::int] || ' '
+        || suffixes[1 + floor(random() * cardinality(suffixes))::int] || ' '
+        || (1 + floor(random() * 100))::int,
+        1 + floor(random() * 100000)::int,
+        now()::timestamp - random() * interval '3 years',
+        'PENDING',
+        :user_id
+    FROM words, generate_series(1, :rows)
+    """
+)
+
+
+async def ensure_user(session: AsyncSession) -> int:
+    result = await session.execute(
+        text(
+            "INSERT INTO users (username, hashed_password, role) "
+            "VALUES (:username, '-', 'DISPATCHER') "
+            "ON CONFLICT (username) DO UPDATE SET username = EXCLUDED.username "
+            "RETURNING id"
+        ),
+        {"username": BENCH_USERNAME},
+    )
+    return result.scalar_one()
+
+
+async def seed(rows: int) -> int:
+    async with async_session_maker() as session:
+        user_id = await ensure_user(session)
+        existing = (
+            await session.execute(
+                text("SELECT count(*) FROM orders WHERE created_by_id = :user_id"),
+                {"user_id": user_id},
+            )
+        ).scalar_one()
+        await session.commit()
+
+        missing = rows - existing
+        print(f"orders from {BENCH_USERNAME}: {existing}, seeding {max(missing, 0)}")
+        await session.execute(text("SELECT setseed(0.42)"))
+        while missing > 0:
+            batch = min(missing, SEED_BATCH)
+            start = time.perf_counter()
+            await session.execute(
+                SEED_SQL,
+                {
+                    "prefixes": PREFIXES,
+                    "surnames": SURNAMES,
+                    "suffixes": SUFFIXES,
+                    "user_id": user_id,
+                    "rows": batch,
+                },
+            )
+            await session.commit()
+            missing -= batch
+            print(f"  +{batch} rows in {time.perf_counter() - start:.1f}s")
+
+        await session.execute(text("ANALYZE orders"))
+        await session.commit()
+        return user_id
+
+
+async def cleanup() -> None:
+    async with async_session_maker() as session:
+        user_id = await ensure_user(session)
+        await session.execute(
+            text("DELETE FROM orders WHERE created_by_id = :user_id"),
+            {"user_id": user_id},
+        )
+        await session.execute(
+            text("DELETE FROM users WHERE id = :user_id"), {"user_id": user_id}
+        )
+        await session.commit()
+
+
+async def measure(
+    session: AsyncSession,
+    search: Callable[[str, AsyncSession], Awaitable[object]],
+    iterations: int,
+) -> list[float]:
+    samples = []
+    for i in range(iterations):
+        query = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        await search(query, session)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def ilike_filter(query: str, session: AsyncSession) -> None:
+    await OrderDAO.find_all_filtered(client_name=query, limit=20, session=session)
+
+
+async def ranked_search(query: str, session: AsyncSession) -> None:
+    await OrderDAO.search_by_client_name(query, limit=20, session=session)
+
+
+async def run(iterations: int, without_index: bool) -> None:
+    label = "seq scan" if without_index else "trgm index"
+    async with async_session_maker() as session:
+        if without_index:
+            await session.execute(text("DROP INDEX ix_orders_client_name_trgm"))
+            await session.execute(text("DROP INDEX ix_orders_client_name_trgm_gist"))
+        for name, search in (("ilike", ilike_filter), ("search", ranked_search)):
+            await search(QUERIES[0], session)
+            print_latency(
+                f"{name} ({label})", await measure(session, search, iterations)
+            )
+        await session.rollback()
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.rows:
+        await seed(args.rows)
+        async with async_session_maker() as session:
+            total = (
+                await session.execute(text("SELECT count(*) FROM orders"))
+            ).scalar_one()
+        print(f"orders total: {total}")
+
+        await run(args.iterations, without_index=False)
+        if not args.skip_seq_scan:
+            await run(args.seq_scan_iterations, without_index=True)
+
+    if args.cleanup or (args.rows and not args.keep):
+        await cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--seq-scan-iterations", type=int, default=20)
+    parser.add_argument("--skip-seq-scan", action="store_true")
+    parser.add_argument("--keep", action="store_true")
+    parser.add_argument("--cleanup", action="store_true")
+    asyncio.run(main(parser.parse_args()))
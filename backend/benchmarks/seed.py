@@ -0,0 +1,380 @@
+"""
+Воспроизводимый набор данных для нагрузочного бенчмарка (benchmarks.load).
+
+Создаёт пользователей, машины, заказы и путевые листы одного из размеров
+SCALES. Значения берутся из random() после setseed(), поэтому при том же
+--seed получается тот же набор (кроме id). Заказы идут в хронологическом
+порядке за пять лет, как в рабочей базе. Путевой лист есть у каждого заказа
+не в статусе PENDING. Рейсы одной машины не пересекаются: i-й заказ
+получает машину i % vehicles и слот i // vehicles.
+
+Данные помечены: пользователи bench_seed_N (bench_seed_1 — администратор,
+у всех пароль SEED_PASSWORD), номера машин BS.... Повторный запуск сначала
+удаляет прежний набор. Удалить его без пересоздания: --cleanup.
+
+Остальные бенчмарки наполняют базу теми же функциями (seed_users,
+seed_vehicles, seed_trip_sheets, cleanup) со своими префиксами, а данные,
+которые не должны остаться в базе, вставляют внутри rolled_back.
+
+Запуск (БД из .env, миграции применены):
+
+    python -m benchmarks.seed --scale 10k
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from passlib.context import CryptContext
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker
+from app.enums import OrderStatus
+
+
+@dataclass(frozen=True, slots=True)
+class Scale:
+    users: int
+    vehicles: int
+    orders: int
+
+
+SCALES = {
+    "10k": Scale(users=100, vehicles=100, orders=10_000),
+    "1m": Scale(users=1_000, vehicles=1_000, orders=1_000_000),
+    "10m": Scale(users=10_000, vehicles=10_000, orders=10_000_000),
+}
+
+USERNAME_PREFIX = "bench_seed_"
+ADMIN_USERNAME = f"{USERNAME_PREFIX}1"
+PLATE_PREFIX = "BS"
+SEED_PASSWORD = "bench-password"  # noqa: S105 — пароль тестовых пользователей
+START = datetime(2020, 1, 1)
+PERIOD = timedelta(days=5 * 365)
+SEED_BATCH = 1_000_000
+
+SEED_USERS_SQL = text(
+    """
+    INSERT INTO users (username, hashed_password, role)
+    SELECT
+        :prefix || g,
+        :hashed_password,
+        (CASE WHEN g = 1 THEN 'ADMIN' ELSE 'DISPATCHER' END)::userrole
+    FROM generate_series(1, :users) AS g
+    ON CONFLICT (username) DO NOTHING
+    """
+)
+
+SEED_VEHICLES_SQL = text(
+    """
+    INSERT INTO vehicles (driver_name, vehicle_type, license_plate)
+    SELECT
+        'Водитель ' || g,
+        (ARRAY['TRUCK', 'VAN', 'CAR'])[1 + floor(random() * 3)::int]::vehicletype,
+        :prefix || g
+    FROM generate_series(1, :vehicles) AS g
+    ON CONFLICT (license_plate) DO NOTHING
+    """
+)
+
+# i — номер заказа в наборе (с нуля); по нему же строится путевой лист.
+SEED_ORDERS_SQL = text(
+    """
+    WITH u AS (
+        SELECT array_agg(id ORDER BY id) AS ids
+        FROM users WHERE username LIKE :prefix || '%'
+    )
+    INSERT INTO orders (client_name, cost, order_date, status, created_by_id)
+    SELECT
+        'Клиент ' || (1 + floor(random() * CAST(:orders AS int) / 10)::int),
+        100 + floor(random() * 100000)::int,
+        CAST(:start AS timestamp)
+            + (i + random()) * CAST(:step AS float8) * interval '1 second',
+        CASE
+            WHEN random() < 0.1 THEN 'PENDING'
+            WHEN random() < 0.25 THEN 'IN_PROGRESS'
+            ELSE 'COMPLETED'
+        END::orderstatus,
+        u.ids[1 + floor(random() * cardinality(u.ids))::int]
+    FROM generate_series(
+        CAST(:done AS int), CAST(:done AS int) + CAST(:batch AS int) - 1
+    ) AS i, u
+    ORDER BY i
+    """
+)
+
+# Рейс занимает от 1 до 12 часов внутри своего слота машины, поэтому рейсы
+# одной машины не пересекаются.
+SEED_TRIPS_SQL = text(
+    """
+    WITH o AS (
+        SELECT id, id - CAST(:first_id AS int) AS i
+        FROM orders
+        WHERE created_by_id IN
+                (SELECT id FROM users WHERE username LIKE :prefix || '%')
+            AND status <> 'PENDING'
+            AND id >= CAST(:first_id AS int) + CAST(:done AS int)
+            AND id < CAST(:first_id AS int) + CAST(:done AS int) + CAST(:batch AS int)
+        ORDER BY id
+    ), slots AS (
+        SELECT
+            o.id AS order_id,
+            v.ids[1 + o.i % CAST(:vehicles AS int)] AS vehicle_id,
+            CAST(:start AS timestamp)
+                + (
+                    o.i / CAST(:vehicles AS int) * CAST(:slot AS float8)
+                    + random() * (CAST(:slot AS float8) - 43200)
+                )
+                * interval '1 second' AS start_time,
+            (3600 + random() * 39600) * interval '1 second' AS duration
+        FROM o, (
+            SELECT array_agg(id ORDER BY id) AS ids
+            FROM vehicles WHERE license_plate LIKE :plate_prefix || '%'
+        ) AS v
+    )
+    INSERT INTO tripsheets (vehicle_id, order_id, start_time, end_time)
+    SELECT vehicle_id, order_id, start_time, start_time + duration
+    FROM slots
+    ORDER BY start_time
+    """
+)
+
+# Синтетические заказы без random(): j-й заказ (с нуля) создаёт пользователь
+# j % users, статусы идут по кругу из :statuses.
+SYNTHETIC_ORDERS_SQL = text(
+    """
+    WITH u AS (
+        SELECT array_agg(id ORDER BY id) AS ids
+        FROM users WHERE username LIKE :prefix || '%'
+    ), s AS (
+        SELECT CAST(CAST(:statuses AS text[]) AS orderstatus[]) AS statuses
+    )
+    INSERT INTO orders (client_name, cost, order_date, status, created_by_id)
+    SELECT
+        'Клиент ' || (g % 5000),
+        1 + (g * 7919) % 100000,
+        CAST(:start AS timestamp) + (g % 1500) * interval '1 day',
+        s.statuses[1 + g % cardinality(s.statuses)],
+        u.ids[1 + g % cardinality(u.ids)]
+    FROM generate_series(0, CAST(:orders AS int) - 1) AS g, u, s
+    """
+)
+
+# Путевой лист на каждый заказ не в статусе PENDING: k-й такой заказ едет
+# на машине k % vehicles в день k // vehicles, поэтому рейсы одной машины
+# не пересекаются.
+SYNTHETIC_TRIPS_SQL = text(
+    """
+    INSERT INTO tripsheets (vehicle_id, order_id, start_time, end_time)
+    SELECT
+        v.ids[1 + o.k % cardinality(v.ids)],
+        o.id,
+        CAST(:start AS timestamp) + o.k / cardinality(v.ids) * interval '1 day',
+        CAST(:start AS timestamp) + o.k / cardinality(v.ids) * interval '1 day'
+            + interval '8 hours'
+    FROM (
+        SELECT o.id, row_number() OVER (ORDER BY o.id) - 1 AS k
+        FROM orders o JOIN users u ON u.id = o.created_by_id
+        WHERE u.username LIKE :prefix || '%' AND o.status <> 'PENDING'
+    ) AS o, (
+        SELECT array_agg(id ORDER BY id) AS ids
+        FROM vehicles WHERE license_plate LIKE :plate_prefix || '%'
+    ) AS v
+    """
+)
+
+CLEANUP_SQL = [
+    """
+    DELETE FROM tripsheets WHERE vehicle_id IN
+        (SELECT id FROM vehicles WHERE license_plate LIKE :plate_prefix || '%')
+    """,
+    """
+    DELETE FROM orders WHERE created_by_id IN
+        (SELECT id FROM users WHERE username LIKE :prefix || '%')
+    """,
+    "DELETE FROM vehicles WHERE license_plate LIKE :plate_prefix || '%'",
+    "DELETE FROM users WHERE username LIKE :prefix || '%'",
+]
+
+PREFIXES = {"prefix": USERNAME_PREFIX, "plate_prefix": PLATE_PREFIX}
+
+
+async def set_seed(session: AsyncSession, seed: int, batch: int = 0) -> None:
+    """Зафиксировать random() для очередного запроса вставки."""
+    value = ((seed * 1_000_003 + batch) % 2_000_001) / 1_000_000 - 1
+    await session.execute(text("SELECT setseed(:value)"), {"value": value})
+
+
+@asynccontextmanager
+async def rolled_back(session: AsyncSession) -> AsyncIterator[None]:
+    """Точка сохранения, которая откатывается при выходе из блока."""
+    savepoint = await session.begin_nested()
+    try:
+        yield
+    finally:
+        await savepoint.rollback()
+
+
+async def seed_users(
+    session: AsyncSession,
+    users: int,
+    prefix: str = USERNAME_PREFIX,
+    hashed_password: str = "-",  # noqa: S107 — под такими пользователями войти нельзя
+) -> None:
+    """
+    Добавить пользователей prefix1..prefixN; prefix1 — администратор.
+
+    Уже существующие пользователи пропускаются. С хешем по умолчанию
+    войти под ними нельзя.
+    """
+    await session.execute(
+        SEED_USERS_SQL,
+        {"prefix": prefix, "hashed_password": hashed_password, "users": users},
+    )
+
+
+async def seed_vehicles(
+    session: AsyncSession, vehicles: int, prefix: str = PLATE_PREFIX
+) -> None:
+    """Добавить машины с номерами prefix1..prefixN; существующие пропускаются."""
+    await session.execute(SEED_VEHICLES_SQL, {"prefix": prefix, "vehicles": vehicles})
+
+
+async def seed_trip_sheets(  # noqa: PLR0913 — размер и вид синтетического набора
+    session: AsyncSession,
+    orders: int,
+    *,
+    prefix: str,
+    plate_prefix: str,
+    start: datetime,
+    statuses: Sequence[OrderStatus],
+) -> None:
+    """
+    Добавить заказы пользователей prefix* и путевые листы на машинах
+    plate_prefix* для всех заказов не в статусе PENDING.
+
+    Пользователи и машины должны уже быть (seed_users, seed_vehicles).
+
+    :param orders: Количество заказов.
+    :param start: Дата первого заказа и начало первого рейса.
+    :param statuses: Статусы заказов, выдаются по кругу.
+    """
+    params = {"prefix": prefix, "plate_prefix": plate_prefix, "start": start}
+    await session.execute(
+        SYNTHETIC_ORDERS_SQL,
+        {
+            **params,
+            "orders": orders,
+            "statuses": [status.name for status in statuses],
+        },
+    )
+    await session.execute(SYNTHETIC_TRIPS_SQL, params)
+
+
+async def cleanup(
+    session: AsyncSession,
+    prefix: str = USERNAME_PREFIX,
+    plate_prefix: str = PLATE_PREFIX,
+) -> None:
+    """Удалить пользователей prefix*, машины plate_prefix* и их данные."""
+    began = time.perf_counter()
+    for statement in CLEANUP_SQL:
+        await session.execute(
+            text(statement), {"prefix": prefix, "plate_prefix": plate_prefix}
+        )
+    await session.commit()
+    print(f"previous data removed in {time.perf_counter() - began:.1f}s")
+
+
+async def seed(session: AsyncSession, scale: Scale, seed: int) -> None:
+    hashed_password = CryptContext(schemes=["bcrypt"]).hash(SEED_PASSWORD)
+    await set_seed(session, seed)
+    await seed_users(session, scale.users, hashed_password=hashed_password)
+    await seed_vehicles(session, scale.vehicles)
+    await session.commit()
+
+    step = PERIOD.total_seconds() / scale.orders
+    first_id = None
+    for done in range(0, scale.orders, SEED_BATCH):
+        batch = min(SEED_BATCH, scale.orders - done)
+        began = time.perf_counter()
+        await set_seed(session, seed, 1 + done // SEED_BATCH)
+        await session.execute(
+            SEED_ORDERS_SQL,
+            {
+                "prefix": USERNAME_PREFIX,
+                "orders": scale.orders,
+                "start": START,
+                "step": step,
+                "done": done,
+                "batch": batch,
+            },
+        )
+        await session.commit()
+        if first_id is None:
+            first_id = (
+                await session.execute(
+                    text(
+                        "SELECT min(id) FROM orders WHERE created_by_id IN "
+                        "(SELECT id FROM users WHERE username LIKE :prefix || '%')"
+                    ),
+                    PREFIXES,
+                )
+            ).scalar_one()
+        print(
+            f"  orders +{batch} ({done + batch}/{scale.orders}) "
+            f"in {time.perf_counter() - began:.1f}s"
+        )
+
+    slot = step * scale.vehicles
+    for done in range(0, scale.orders, SEED_BATCH):
+        began = time.perf_counter()
+        await set_seed(session, -seed, 1 + done // SEED_BATCH)
+        result = await session.execute(
+            SEED_TRIPS_SQL,
+            {
+                **PREFIXES,
+                "first_id": first_id,
+                "vehicles": scale.vehicles,
+                "start": START,
+                "slot": slot,
+                "done": done,
+                "batch": SEED_BATCH,
+            },
+        )
+        await session.commit()
+        print(f"  trip sheets +{result.rowcount} in {time.perf_counter() - began:.1f}s")
+
+    await session.execute(text("ANALYZE users, vehicles, orders, tripsheets"))
+    await session.commit()
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with async_session_maker() as session:
+        await cleanup(session)
+        if args.cleanup:
+            return
+
+        scale = SCALES[args.scale]
+        began = time.perf_counter()
+        await seed(session, scale, args.seed)
+        print(
+            f"scale={args.scale} seed={args.seed}: users={scale.users} "
+            f"vehicles={scale.vehicles} orders={scale.orders} "
+            f"in {time.perf_counter() - began:.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--cleanup", action="store_true", help="только удалить прежний набор"
+    )
+    asyncio.run(main(parser.parse_args()))
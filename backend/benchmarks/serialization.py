@@ -0,0 +1,128 @@
+"""
+Сравнение путей сериализации списка заказов: ORM + Pydantic и Row + orjson.
+
+В транзакции, которая в конце откатывается, в orders добавляются
+синтетические заказы. Затем один и тот же список (GET /orders/ с limit)
+получается двумя способами:
+
+* orm — объекты модели из сессии, валидация через OrderResponse
+  (from_attributes) и json.dumps, как это делает FastAPI с response_model;
+* rows — проекция по схеме (кортежи Row) и orjson (dump_rows).
+
+Для каждого пути отдельно замеряются выборка и сериализация. Перед замерами
+проверяется, что тела ответов совпадают побайтно.
+
+Запуск (БД из .env, миграции применены):
+
+    python -m benchmarks.serialization --rows 100000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from pydantic import TypeAdapter
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker
+from app.orders.dao import OrderDAO
+from app.orders.schemas import OrderResponse
+from app.serialization import dump_rows
+from benchmarks.stats import print_latency
+
+ORDER_LIST = TypeAdapter(list[OrderResponse])
+
+SEED_SQL = [
+    """
+    INSERT INTO users (username, hashed_password, role)
+    VALUES ('bench_serialization', '-', 'DISPATCHER')
+    """,
+    """
+    INSERT INTO orders (client_name, cost, order_date, status, created_by_id)
+    SELECT
+        'ООО Клиент ' || g,
+        1 + (g * 7919) % 100000,
+        timestamp '2020-01-01' + g * interval '1 minute',
+        (ARRAY['PENDING', 'IN_PROGRESS', 'COMPLETED'])[1 + g % 3]::orderstatus,
+        (SELECT id FROM users WHERE username = 'bench_serialization')
+    FROM generate_series(1, :rows) AS g
+    """,
+    "ANALYZE orders",
+]
+
+
+def fastapi_render(orders: list[Any]) -> bytes:
+    """Сериализация ответа так, как это делает FastAPI для response_model."""
+    content = ORDER_LIST.dump_python(
+        ORDER_LIST.validate_python(orders, from_attributes=True), mode="json"
+    )
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+async def fetch_orm(session: AsyncSession, rows: int) -> list[Any]:
+    session.expunge_all()
+    return await OrderDAO.find_all_filtered(limit=rows, session=session)
+
+
+async def fetch_rows(session: AsyncSession, rows: int) -> list[Any]:
+    return await OrderDAO.find_all_filtered(
+        limit=rows, schema=OrderResponse, session=session
+    )
+
+
+async def measure(
+    session: AsyncSession,
+    rows: int,
+    fetch: Callable[[AsyncSession, int], Awaitable[list[Any]]],
+    render: Callable[[list[Any]], bytes],
+    iterations: int,
+) -> tuple[list[float], list[float], list[float]]:
+    fetched, rendered, total = [], [], []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        items = await fetch(session, rows)
+        middle = time.perf_counter()
+        render(items)
+        end = time.perf_counter()
+        fetched.append(middle - start)
+        rendered.append(end - middle)
+        total.append(end - start)
+    return fetched, rendered, total
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with async_session_maker() as session:
+        for statement in SEED_SQL:
+            await session.execute(text(statement), {"rows": args.rows})
+
+        orm_body = fastapi_render(await fetch_orm(session, args.rows))
+        rows_body = dump_rows(await fetch_rows(session, args.rows))
+        if orm_body != rows_body:
+            raise SystemExit("Тела ответов различаются")
+        print(f"rows={args.rows} body={len(rows_body) / 1024 / 1024:.1f}MiB")
+
+        for name, fetch, render in (
+            ("orm", fetch_orm, fastapi_render),
+            ("rows", fetch_rows, dump_rows),
+        ):
+            fetched, rendered, total = await measure(
+                session, args.rows, fetch, render, args.iterations
+            )
+            print_latency(f"{name} fetch", fetched)
+            print_latency(f"{name} serialize", rendered)
+            print_latency(f"{name} total", total)
+
+        await session.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
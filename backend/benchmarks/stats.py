@@ -0,0 +1,12 @@
+import statistics
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98], "max": max(samples)}
+
+
+def print_latency(title: str, samples: list[float]) -> None:
+    stats = percentiles([s * 1000 for s in samples])
+    line = "  ".join(f"{name}={value:.1f}ms" for name, value in stats.items())
+    print(f"{title:<28} n={len(samples):<6} {line}")
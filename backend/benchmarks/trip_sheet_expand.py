@@ -0,0 +1,120 @@
+"""
+Путевые листы с машинами и заказами: expand против запросов на каждую связь.
+
+Для каждого размера выборки в точке сохранения добавляются синтетические
+машины, заказы и путевые листы, после замера точка откатывается. Замеряются:
+
+* expand — GET /tripsheets/?expand=vehicle,order (find_all_expanded);
+* n+1 — список путевых листов и отдельные запросы машины и заказа для
+  каждого из них, как делал клиент без expand.
+
+Для expand проверяется, что число SQL-запросов не зависит от размера
+выборки.
+
+Запуск (БД из .env, миграции применены; код возврата 1 при провале):
+
+    python -m benchmarks.trip_sheet_expand --sizes 10,1000,10000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker, engine
+from app.enums import OrderStatus, TripSheetExpand
+from app.orders.dao import OrderDAO
+from app.trip_sheets.dao import TripSheetDAO
+from app.vehicles.dao import VehicleDAO
+from benchmarks.seed import rolled_back, seed_trip_sheets, seed_users, seed_vehicles
+from benchmarks.stats import print_latency
+
+EXPAND = frozenset(TripSheetExpand)
+TRIPS_PER_VEHICLE = 10
+
+USERNAME_PREFIX = "bench_expand_"
+PLATE_PREFIX = "EX"
+START = datetime(2031, 1, 1)
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *_) -> None:
+        self.count += 1
+
+
+async def seed(session: AsyncSession, trips: int) -> None:
+    """Добавить trips путевых листов, по TRIPS_PER_VEHICLE на машину."""
+    await seed_users(session, 1, prefix=USERNAME_PREFIX)
+    await seed_vehicles(
+        session, max(1, trips // TRIPS_PER_VEHICLE), prefix=PLATE_PREFIX
+    )
+    await seed_trip_sheets(
+        session,
+        trips,
+        prefix=USERNAME_PREFIX,
+        plate_prefix=PLATE_PREFIX,
+        start=START,
+        statuses=[OrderStatus.IN_PROGRESS],
+    )
+    await session.execute(text("ANALYZE vehicles, orders, tripsheets"))
+
+
+async def expanded(session: AsyncSession) -> int:
+    trip_sheets = await TripSheetDAO.find_all_expanded(EXPAND, session=session)
+    return len(trip_sheets)
+
+
+async def n_plus_one(session: AsyncSession) -> int:
+    trip_sheets = await TripSheetDAO.find_all(session=session)
+    for trip_sheet in trip_sheets:
+        await VehicleDAO.find_one_or_none(session=session, id=trip_sheet.vehicle_id)
+        await OrderDAO.find_one_or_none(session=session, id=trip_sheet.order_id)
+    return len(trip_sheets)
+
+
+async def main(args: argparse.Namespace) -> int:
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    statements = {}
+    async with async_session_maker() as session:
+        for size in args.sizes:
+            async with rolled_back(session):
+                await seed(session, size)
+                for name, run in [("expand", expanded), ("n+1", n_plus_one)]:
+                    samples = []
+                    for _ in range(args.iterations):
+                        # Пустая identity map: каждый прогон загружает всё заново.
+                        session.expunge_all()
+                        counter.count = 0
+                        began = time.perf_counter()
+                        rows = await run(session)
+                        samples.append(time.perf_counter() - began)
+                    print_latency(f"{name} rows={rows}", samples)
+                    print(f"{'':29}statements={counter.count}")
+                    if name == "expand":
+                        statements[size] = counter.count
+
+    constant = len(set(statements.values())) == 1
+    print(
+        f"{'OK  ' if constant else 'FAIL'} expand: SQL-запросов по размерам "
+        f"выборки {statements}"
+    )
+    return 0 if constant else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=[10, 1000, 10_000],
+    )
+    parser.add_argument("--iterations", type=int, default=5)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,221 @@
+"""
+Задержка поиска свободных машин (GET /vehicles/available) на большом парке.
+
+Скрипт добавляет машины и путевые листы: у каждой машины идут подряд
+непересекающиеся рейсы, по одному в каждом 8-часовом слоте, со случайным
+сдвигом и длительностью. Путевые листы вставляются в хронологическом порядке,
+как в рабочей базе. Затем замеряется запрос VehicleDAO.find_available для
+набора интервалов разной длины с фильтром по типу и без него, с индексом
+ix_tripsheets_time_range и без него (индекс удаляется внутри транзакции,
+которая потом откатывается).
+
+Запуск (БД из .env, миграции применены):
+
+    python -m benchmarks.vehicle_availability --vehicles 5000 --trips 2000
+
+5000 машин по 2000 рейсов — 10M путевых листов. С --keep данные остаются
+в базе, и повторный запуск досеивает только недостающие рейсы. Удалить
+их: --vehicles 0 --cleanup.
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker
+from app.enums import VehicleType
+from app.vehicles.dao import VehicleDAO
+from app.vehicles.schemas import VehicleResponse
+from benchmarks.index_usage import explain, plan_indexes
+from benchmarks.seed import (
+    cleanup,
+    rolled_back,
+    seed_users,
+    seed_vehicles,
+    set_seed,
+)
+from benchmarks.stats import print_latency
+
+USERNAME_PREFIX = "bench_availability_"
+PLATE_PREFIX = "AV"
+START = datetime(2020, 1, 1)
+SLOT = timedelta(hours=8)
+SEED_BATCH = 1_000_000
+
+WINDOWS = [
+    (timedelta(hours=3, minutes=30), timedelta(hours=1)),
+    (timedelta(hours=6), timedelta(hours=2)),
+    (timedelta(hours=1), timedelta(hours=4)),
+    (timedelta(hours=4), timedelta(hours=24)),
+]
+
+SEED_ORDERS_SQL = text(
+    """
+    INSERT INTO orders (client_name, cost, order_date, status, created_by_id)
+    SELECT 'Бенчмарк доступности ' || g, 1000, :start, 'COMPLETED', :user_id
+    FROM generate_series(
+        (SELECT count(*) + 1 FROM orders WHERE created_by_id = :user_id), :trips
+    ) AS g
+    """
+)
+
+SEED_TRIPS_SQL = text(
+    """
+    WITH v AS (
+        SELECT id, row_number() OVER (ORDER BY id) AS n
+        FROM vehicles WHERE license_plate LIKE :prefix || '%'
+    ), o AS (
+        SELECT id, row_number() OVER (ORDER BY id) AS k
+        FROM orders WHERE created_by_id = :user_id
+    ), slots AS (
+        SELECT
+            v.id AS vehicle_id,
+            o.id AS order_id,
+            CAST(:start AS timestamp) + (o.k - 1) * interval '8 hours'
+                + (v.n * 37 + o.k * 11) % 60 * interval '1 minute' AS start_time,
+            120 + (v.n * 53 + o.k * 97) % 300 AS minutes
+        FROM o CROSS JOIN v
+        WHERE o.k > :done AND o.k <= :done + :slots
+    )
+    INSERT INTO tripsheets (vehicle_id, order_id, start_time, end_time)
+    SELECT vehicle_id, order_id, start_time, start_time + minutes * interval '1 minute'
+    FROM slots
+    ORDER BY start_time
+    """
+)
+
+
+async def bench_user_id(session: AsyncSession) -> int:
+    await seed_users(session, 1, prefix=USERNAME_PREFIX)
+    result = await session.execute(
+        text("SELECT id FROM users WHERE username = :username"),
+        {"username": f"{USERNAME_PREFIX}1"},
+    )
+    return result.scalar_one()
+
+
+async def seed(vehicles: int, trips: int) -> None:
+    async with async_session_maker() as session:
+        user_id = await bench_user_id(session)
+        # Типы машин берутся из random(): setseed делает их одинаковыми
+        # от запуска к запуску.
+        await set_seed(session, 0)
+        await seed_vehicles(session, vehicles, prefix=PLATE_PREFIX)
+        await session.execute(
+            SEED_ORDERS_SQL, {"start": START, "user_id": user_id, "trips": trips}
+        )
+        await session.commit()
+
+        existing = (
+            await session.execute(
+                text(
+                    "SELECT count(*) FROM tripsheets t JOIN vehicles v "
+                    "ON v.id = t.vehicle_id WHERE v.license_plate LIKE :prefix"
+                ),
+                {"prefix": PLATE_PREFIX + "%"},
+            )
+        ).scalar_one()
+        done = existing // vehicles
+        print(
+            f"trip sheets on {PLATE_PREFIX}* vehicles: {existing}, slots done: {done}"
+        )
+
+        slots_per_batch = max(SEED_BATCH // vehicles, 1)
+        while done < trips:
+            slots = min(slots_per_batch, trips - done)
+            start = time.perf_counter()
+            await session.execute(
+                SEED_TRIPS_SQL,
+                {
+                    "prefix": PLATE_PREFIX,
+                    "user_id": user_id,
+                    "start": START,
+                    "done": done,
+                    "slots": slots,
+                },
+            )
+            await session.commit()
+            done += slots
+            print(
+                f"  +{slots * vehicles} rows ({done}/{trips} slots) "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+
+        await session.execute(text("ANALYZE vehicles, orders, tripsheets"))
+        await session.commit()
+
+
+def cases(trips: int) -> list[tuple[datetime, datetime, VehicleType | None]]:
+    """Интервалы в разных местах периода, с фильтром по типу и без."""
+    period = SLOT * trips
+    result = []
+    for i in range(50):
+        position = START + period * ((i * 7919) % 1000) / 1000
+        offset, duration = WINDOWS[i % len(WINDOWS)]
+        slot_start = START + SLOT * ((position - START) // SLOT)
+        vehicle_type = VehicleType.TRUCK if i % 2 else None
+        result.append(
+            (slot_start + offset, slot_start + offset + duration, vehicle_type)
+        )
+    return result
+
+
+async def run(trips: int, iterations: int, without_index: bool) -> None:
+    label = "no range index" if without_index else "range index"
+    windows = cases(trips)
+    async with async_session_maker() as session, rolled_back(session):
+        if without_index:
+            await session.execute(text("DROP INDEX ix_tripsheets_time_range"))
+
+        start, end, _ = windows[0]
+        plan = await explain(session, VehicleDAO._available_query(start, end))
+        print(
+            f"{label}: {plan['Node Type']}, indexes={sorted(set(plan_indexes(plan)))}"
+        )
+
+        free = []
+        samples = []
+        for i in range(iterations):
+            start, end, vehicle_type = windows[i % len(windows)]
+            began = time.perf_counter()
+            vehicles = await VehicleDAO.find_available(
+                start, end, vehicle_type, schema=VehicleResponse, session=session
+            )
+            samples.append(time.perf_counter() - began)
+            free.append(len(vehicles))
+        print_latency(f"available ({label})", samples)
+        print(f"{'':<28} free vehicles: min={min(free)} max={max(free)}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.vehicles:
+        await seed(args.vehicles, args.trips)
+        async with async_session_maker() as session:
+            total = (
+                await session.execute(text("SELECT count(*) FROM tripsheets"))
+            ).scalar_one()
+        print(f"trip sheets total: {total}")
+
+        await run(args.trips, args.iterations, without_index=False)
+        if not args.skip_without_index:
+            await run(args.trips, args.without_index_iterations, without_index=True)
+
+    if args.cleanup or (args.vehicles and not args.keep):
+        async with async_session_maker() as session:
+            await cleanup(session, prefix=USERNAME_PREFIX, plate_prefix=PLATE_PREFIX)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vehicles", type=int, default=5000)
+    parser.add_argument("--trips", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--without-index-iterations", type=int, default=50)
+    parser.add_argument("--skip-without-index", action="store_true")
+    parser.add_argument("--keep", action="store_true")
+    parser.add_argument("--cleanup", action="store_true")
+    asyncio.run(main(parser.parse_args()))
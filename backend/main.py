@@ -1,15 +1,46 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import APIRouter, Body, Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.analytics.rollups import rollup_refresher
+from app.analytics.router import router as router_analytics
+from app.cache import response_cache
+from app.compression import CompressionMiddleware
+from app.config import settings
+from app.database import engine, pool_metrics, replica_pool
+from app.events.broadcaster import change_broadcaster
+from app.events.router import router as router_events
 from app.logging_config import setup_logging
 from app.orders.router import router as router_orders
+from app.outbox.dao import OutboxDAO
+from app.outbox.worker import outbox_worker
+from app.profiling import ProfilingMiddleware, registry, slow_query_log
+from app.profiling.schemas import SlowQueryLogResponse, SlowQueryLogUpdate
+from app.request_context import REQUEST_ID_HEADER, RequestContextMiddleware
+from app.serialization import TimedJSONResponse
 from app.trip_sheets.router import router as router_trip_sheets
+from app.users.auth import password_hash_pool
+from app.users.dependencies import get_current_admin_user, require_monitoring_access
+from app.users.models import User
 from app.users.router import router as router_users
 from app.vehicles.router import router as router_vehicles
 
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    outbox_worker.start()
+    rollup_refresher.start()
+    yield
+    await rollup_refresher.stop()
+    await outbox_worker.stop()
+
+
 app = FastAPI(
     title="🚚 Logistics API",
     description="API для управления заказами, машинами и путевыми листами",
@@ -21,6 +52,8 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=TimedJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -29,6 +62,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", REQUEST_ID_HEADER],
+)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+app.add_middleware(ProfilingMiddleware, server_timing=settings.SERVER_TIMING)
+app.add_middleware(RequestContextMiddleware, sample_rate=settings.LOG_SAMPLE_RATE)
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4"
+
+# Состояние воркера и метрики: только для администратора или, при
+# MONITORING_PUBLIC=true, для всех (см. require_monitoring_access).
+router_monitoring = APIRouter(
+    tags=["Мониторинг"],
+    dependencies=[Depends(require_monitoring_access)],
 )
 
 
@@ -40,10 +86,121 @@ def root() -> dict[str, str]:
     return {"message": "Добро пожаловать в Logistics API 🚚"}
 
 
+@router_monitoring.get("/db/pool", summary="Состояние пула соединений")
+def get_pool_stats() -> dict[str, Any]:
+    """
+    Метрики пула соединений с БД текущего воркера: занятые соединения,
+    время ожидания соединения и выдачи сверх pool_size (overflow).
+    """
+    return pool_metrics.snapshot(engine)
+
+
+@router_monitoring.get("/db/replicas", summary="Состояние реплик для чтения")
+def get_replica_stats() -> dict[str, Any]:
+    """
+    Реплики для чтения текущего воркера: доступность, время до повторной
+    попытки для исключённых реплик, число чтений и сбоев.
+    """
+    return replica_pool.snapshot()
+
+
+@router_monitoring.get("/auth/hash-pool", summary="Состояние пула хеширования")
+def get_password_hash_pool_stats() -> dict[str, Any]:
+    """
+    Метрики пула потоков bcrypt текущего воркера: задачи в очереди,
+    отклонённые из-за переполнения и время хеширования.
+    """
+    return password_hash_pool.snapshot()
+
+
+@router_monitoring.get("/cache", summary="Состояние кэша ответов")
+def get_response_cache_stats() -> dict[str, Any]:
+    """
+    Счётчики кэша ответов текущего воркера: попадания, промахи,
+    ответы 304 и инвалидации после записи.
+    """
+    return response_cache.snapshot()
+
+
+@router_monitoring.get("/events/stats", summary="Состояние ленты изменений")
+def get_change_feed_stats() -> dict[str, Any]:
+    """
+    Лента изменений текущего воркера: подключено ли соединение LISTEN,
+    число клиентов, горизонт журнала, разосланные сообщения и клиенты,
+    отключённые за переполнение очереди.
+    """
+    return change_broadcaster.snapshot()
+
+
+@router_monitoring.get("/outbox", summary="Состояние очереди outbox")
+async def get_outbox_stats() -> dict[str, Any]:
+    """
+    Сообщения outbox по статусам (pending, done, failed) и счётчики
+    воркера текущего процесса: выполненные, повторённые и неудавшиеся.
+    """
+    return {
+        "messages": await OutboxDAO.count_by_status(),
+        "worker": outbox_worker.snapshot(),
+    }
+
+
+@router_monitoring.get("/analytics/rollups", summary="Фоновый пересчёт сводок")
+def get_rollup_refresher_stats() -> dict[str, Any]:
+    """
+    Состояние фонового пересчёта сводки загрузки машин в текущем процессе:
+    интервал и число пересчитанных дней.
+    """
+    return rollup_refresher.snapshot()
+
+
+@router_monitoring.get("/metrics", summary="Метрики в формате Prometheus")
+def get_metrics() -> Response:
+    """
+    Гистограммы времени HTTP-запросов по маршрутам, фазам запроса (auth,
+    pool, db, serialize, app) и числа SQL-запросов, а также время
+    SQL-запросов текущего воркера.
+    """
+    return Response(registry.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+@router_monitoring.get(
+    "/db/slow-queries",
+    response_model=SlowQueryLogResponse,
+    summary="Настройки лога медленных запросов",
+)
+def get_slow_query_log() -> dict[str, Any]:
+    """
+    Включён ли лог медленных SQL-запросов текущего воркера, его порог
+    и число записанных запросов.
+    """
+    return slow_query_log.snapshot()
+
+
+@router_monitoring.put(
+    "/db/slow-queries",
+    response_model=SlowQueryLogResponse,
+    summary="Включить или настроить лог медленных запросов",
+)
+def update_slow_query_log(
+    data: SlowQueryLogUpdate = Body(...),
+    _: User = Depends(get_current_admin_user),
+) -> dict[str, Any]:
+    """
+    Включает, выключает или меняет порог лога медленных SQL-запросов без
+    перезапуска. Запросы дольше порога пишутся в лог с параметрами.
+    Настройка действует в воркере, обработавшем запрос.
+    """
+    slow_query_log.configure(**data.model_dump())
+    return slow_query_log.snapshot()
+
+
+app.include_router(router_monitoring)
 app.include_router(router_users)
 app.include_router(router_orders)
 app.include_router(router_vehicles)
 app.include_router(router_trip_sheets)
+app.include_router(router_analytics)
+app.include_router(router_events)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", port=8000, reload=True)
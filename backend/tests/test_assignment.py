@@ -0,0 +1,115 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.trip_sheets.assignment import Assignment, Interval, plan_assignments
+
+START = datetime(2024, 5, 1, 8)
+HOUR = timedelta(hours=1)
+
+
+def at(hours: float) -> datetime:
+    return START + hours * HOUR
+
+
+def test_without_busy_intervals_fills_vehicles_in_turn() -> None:
+    plan = plan_assignments([10, 11, 12, 13, 14], [2, 1], {}, START, 2 * HOUR)
+
+    assert plan == [
+        Assignment(10, 1, at(0), at(2)),
+        Assignment(11, 2, at(0), at(2)),
+        Assignment(12, 1, at(2), at(4)),
+        Assignment(13, 2, at(2), at(4)),
+        Assignment(14, 1, at(4), at(6)),
+    ]
+
+
+def test_skips_busy_intervals_and_short_gaps() -> None:
+    busy = {
+        # Окно между рейсами короче рейса.
+        1: [(at(0), at(1)), (at(2), at(3))],
+        2: [(at(-5), at(0.5)), (at(6), at(7))],
+    }
+
+    plan = plan_assignments([10, 11, 12, 13], [1, 2], busy, START, 2 * HOUR)
+
+    assert plan == [
+        Assignment(10, 2, at(0.5), at(2.5)),
+        Assignment(11, 2, at(2.5), at(4.5)),
+        Assignment(12, 1, at(3), at(5)),
+        # Машина 2 освобождается в 4.5, но рейс упирается в её занятость с 6.
+        Assignment(13, 1, at(5), at(7)),
+    ]
+
+
+def test_trip_may_end_where_next_busy_interval_starts() -> None:
+    plan = plan_assignments([10], [1], {1: [(at(2), at(3))]}, START, 2 * HOUR)
+
+    assert plan == [Assignment(10, 1, at(0), at(2))]
+
+
+def test_orders_beyond_horizon_are_left_out() -> None:
+    plan = plan_assignments(
+        [10, 11, 12], [1], {1: [(at(1), at(2))]}, START, HOUR, end=at(3)
+    )
+
+    assert plan == [
+        Assignment(10, 1, at(0), at(1)),
+        Assignment(11, 1, at(2), at(3)),
+    ]
+
+
+@pytest.mark.parametrize(("order_ids", "vehicle_ids"), [([], [1]), ([10], [])])
+def test_nothing_to_plan(order_ids: list[int], vehicle_ids: list[int]) -> None:
+    assert plan_assignments(order_ids, vehicle_ids, {}, START, HOUR) == []
+
+
+def brute_force(
+    order_ids: list[int],
+    vehicle_ids: list[int],
+    busy: dict[int, list[Interval]],
+    duration: timedelta,
+    end: datetime | None,
+) -> list[Assignment]:
+    """Самое раннее окно перебором всех машин для каждого заказа."""
+    taken = {vehicle_id: list(busy.get(vehicle_id, [])) for vehicle_id in vehicle_ids}
+    plan = []
+    for order_id in order_ids:
+        options = []
+        for vehicle_id in vehicle_ids:
+            time = START
+            for start, finish in sorted(taken[vehicle_id]):
+                if finish > time and start < time + duration:
+                    time = finish
+            options.append((time, vehicle_id))
+        if not options:
+            break
+        time, vehicle_id = min(options)
+        if end is not None and time + duration > end:
+            break
+        taken[vehicle_id].append((time, time + duration))
+        plan.append(Assignment(order_id, vehicle_id, time, time + duration))
+    return plan
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_matches_brute_force(seed: int) -> None:
+    rng = random.Random(seed)
+    vehicle_ids = rng.sample(range(1, 100), rng.randint(1, 6))
+    busy = {}
+    for vehicle_id in vehicle_ids:
+        time, intervals = at(rng.uniform(-3, 1)), []
+        for _ in range(rng.randint(0, 8)):
+            time += rng.randint(0, 4) * HOUR / 2
+            length = rng.randint(1, 6) * HOUR / 2
+            intervals.append((time, time + length))
+            time += length
+        busy[vehicle_id] = intervals
+    order_ids = list(range(rng.randint(0, 40)))
+    duration = rng.randint(1, 4) * HOUR / 2
+    end = at(rng.randint(4, 24)) if rng.random() < 0.5 else None
+
+    plan = plan_assignments(order_ids, vehicle_ids, busy, START, duration, end=end)
+
+    assert plan == brute_force(order_ids, vehicle_ids, busy, duration, end)
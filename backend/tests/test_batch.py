@@ -0,0 +1,44 @@
+import re
+
+import pytest
+from fastapi import HTTPException
+
+from app.batch import IDS_PATTERN, MAX_BATCH_IDS, parse_ids
+from app.exceptions import TooManyIdsException
+
+
+def test_missing_parameter() -> None:
+    assert parse_ids(None) is None
+
+
+@pytest.mark.parametrize(
+    ("ids", "expected"),
+    [
+        ("7", [7]),
+        ("3,1,2", [1, 2, 3]),
+        ("5,5,1,5", [1, 5]),
+        ("010,9", [9, 10]),
+    ],
+)
+def test_sorted_and_unique(ids: str, expected: list[int]) -> None:
+    assert parse_ids(ids) == expected
+
+
+def test_limit_counts_unique_ids() -> None:
+    ids = ",".join(str(item_id) for item_id in range(1, MAX_BATCH_IDS + 1))
+
+    assert len(parse_ids(f"{ids},1,2")) == MAX_BATCH_IDS
+
+    with pytest.raises(HTTPException) as error:
+        parse_ids(f"{ids},{MAX_BATCH_IDS + 1}")
+    assert error.value is TooManyIdsException
+
+
+@pytest.mark.parametrize("ids", ["1,2", "42"])
+def test_pattern_accepts(ids: str) -> None:
+    assert re.fullmatch(IDS_PATTERN, ids)
+
+
+@pytest.mark.parametrize("ids", ["", ",", "1,", ",1", "1,,2", "1, 2", "-1", "a"])
+def test_pattern_rejects(ids: str) -> None:
+    assert re.fullmatch(IDS_PATTERN, ids) is None
@@ -0,0 +1,115 @@
+from collections.abc import AsyncIterator, Iterable
+
+import pytest
+from fastapi import HTTPException
+
+from app.exceptions import UnsupportedBulkFormatException
+from app.orders.bulk import OrderChunk, read_order_chunks
+
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+
+
+async def stream(parts: Iterable[bytes]) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+def ndjson_order(number: int) -> str:
+    return (
+        f'{{"client_name": "Клиент {number}", "cost": {100 + number}, '
+        f'"order_date": "2024-05-01T12:00:00", "created_by_id": 1}}'
+    )
+
+
+async def read(
+    parts: Iterable[bytes], media_type: str, chunk_size: int = 100
+) -> list[OrderChunk]:
+    return [
+        chunk
+        async for chunk in read_order_chunks(stream(parts), media_type, chunk_size)
+    ]
+
+
+async def test_ndjson() -> None:
+    body = "\n".join(ndjson_order(number) for number in range(3)).encode()
+
+    [(rows, errors)] = await read([body], NDJSON)
+
+    assert errors == []
+    assert [row for row, _ in rows] == [1, 2, 3]
+    assert [order.client_name for _, order in rows] == [
+        "Клиент 0",
+        "Клиент 1",
+        "Клиент 2",
+    ]
+
+
+async def test_lines_split_across_stream_parts() -> None:
+    # Разрыв приходится и на середину строки, и на многобайтовый символ UTF-8.
+    body = f"{ndjson_order(1)}\r\n{ndjson_order(2)}".encode()
+    cut = body.index("Клиент".encode()) + 1
+
+    [(rows, errors)] = await read([body[:cut], body[cut:40], body[40:]], NDJSON)
+
+    assert errors == []
+    assert [order.cost for _, order in rows] == [101, 102]
+
+
+async def test_invalid_rows_are_reported_with_row_numbers() -> None:
+    lines = [
+        ndjson_order(1),
+        "",
+        "not json",
+        '{"client_name": "Клиент", "cost": 0, '
+        '"order_date": "2024-05-01T12:00:00", "created_by_id": 1}',
+        ndjson_order(2),
+    ]
+
+    [(rows, errors)] = await read(["\n".join(lines).encode()], NDJSON)
+
+    assert [row for row, _ in rows] == [1, 4]
+    assert [error.row for error in errors] == [2, 3]
+    assert errors[1].errors[0].startswith("cost:")
+
+
+async def test_chunks_count_valid_and_invalid_rows() -> None:
+    lines = [ndjson_order(number) for number in range(5)]
+    lines.insert(2, "{}")
+
+    chunks = await read(["\n".join(lines).encode()], NDJSON, chunk_size=2)
+
+    assert [(len(rows), len(errors)) for rows, errors in chunks] == [
+        (2, 0),
+        (1, 1),
+        (2, 0),
+    ]
+
+
+async def test_csv() -> None:
+    # Заголовок с BOM, как CSV из Excel.
+    body = (
+        "\ufeffclient_name,cost,order_date,created_by_id\n"
+        '"Иванов, ИП",500,2024-05-01 12:00:00,1\n'
+        "Петров,600,2024-05-02 12:00:00\n"
+        "\n"
+        "Сидоров,-1,2024-05-03 12:00:00,1\n"
+    ).encode()
+
+    [(rows, errors)] = await read([body], CSV)
+
+    assert [(row, order.client_name) for row, order in rows] == [(1, "Иванов, ИП")]
+    assert [error.row for error in errors] == [2, 3]
+    assert errors[0].errors == ["Ожидалось колонок: 4, получено: 3"]
+
+
+async def test_unsupported_media_type() -> None:
+    with pytest.raises(HTTPException) as error:
+        await read([b"<orders/>"], "application/xml")
+
+    assert error.value is UnsupportedBulkFormatException
+
+
+async def test_empty_body() -> None:
+    assert await read([], NDJSON) == []
+    assert await read([b""], CSV) == []
@@ -0,0 +1,42 @@
+import pytest
+
+from app.compression import GzipEncoder, choose_encoding
+
+
+@pytest.fixture(autouse=True)
+def encoders(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Набор кодировок не зависит от того, установлены ли brotli и zstandard.
+    monkeypatch.setattr(
+        "app.compression.ENCODERS",
+        {"zstd": GzipEncoder, "br": GzipEncoder, "gzip": GzipEncoder},
+    )
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("GZIP", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("gzip, deflate, br, zstd", "zstd"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br; q=0.9, gzip;q=0.8", "br"),
+        ("zstd;q=0, br;q=0, gzip;q=0", None),
+        ("*", "zstd"),
+        ("*;q=0.1, gzip;q=0.5", "gzip"),
+        ("*, zstd;q=0", "br"),
+        ("gzip;q=abc, br;q=0.1", "br"),
+        ("deflate", None),
+    ],
+)
+def test_choose_encoding(accept_encoding: str, expected: str | None) -> None:
+    assert choose_encoding(accept_encoding) == expected
+
+
+def test_only_available_encodings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("app.compression.ENCODERS", {"gzip": GzipEncoder})
+
+    assert choose_encoding("br, zstd, gzip;q=0.1") == "gzip"
+    assert choose_encoding("br, zstd") is None
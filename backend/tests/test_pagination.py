@@ -0,0 +1,61 @@
+import base64
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.exceptions import InvalidCursorException
+from app.orders.pagination import decode_cursor, encode_cursor
+
+
+def order(order_date: datetime, order_id: int) -> SimpleNamespace:
+    return SimpleNamespace(order_date=order_date, id=order_id)
+
+
+@pytest.mark.parametrize(
+    ("order_date", "order_id"),
+    [
+        (datetime(2024, 5, 1, 12, 30), 1),
+        (datetime(2024, 5, 1, 12, 30, 15, 123456), 987_654_321),
+        (datetime(1999, 12, 31), 7),
+    ],
+)
+def test_round_trip(order_date: datetime, order_id: int) -> None:
+    assert decode_cursor(encode_cursor(order(order_date, order_id))) == (
+        order_date,
+        order_id,
+    )
+
+
+def test_cursor_is_url_safe_without_padding() -> None:
+    cursor = encode_cursor(order(datetime(2024, 5, 1), 1))
+
+    assert "=" not in cursor
+    assert set(cursor) <= set(
+        "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    )
+
+
+def b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "not base64!",
+        b64(b"not json"),
+        b64(b'{"order_date": "2024-05-01", "id": 1}'),
+        b64(b'["2024-05-01"]'),
+        b64(b'["yesterday", 1]'),
+        b64(b'["2024-05-01", "one"]'),
+        b64(b"[null, 1]"),
+    ],
+)
+def test_invalid_cursor(cursor: str) -> None:
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+
+    assert error.value is InvalidCursorException
@@ -0,0 +1,111 @@
+import pytest
+
+from app.cache.ttl import TTLCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr("app.cache.ttl.time.monotonic", clock)
+    return clock
+
+
+def test_get_missing() -> None:
+    assert TTLCache[str, int](maxsize=2, ttl=10).get("a") is None
+
+
+def test_expires_after_ttl(clock: Clock) -> None:
+    cache = TTLCache[str, int](maxsize=2, ttl=10)
+    cache.set("a", 1)
+
+    clock.now += 9.9
+    assert cache.get("a") == 1
+
+    clock.now += 0.1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_entry_ttl_is_capped_by_cache_ttl(clock: Clock) -> None:
+    cache = TTLCache[str, int](maxsize=2, ttl=10)
+    cache.set("short", 1, ttl=2)
+    cache.set("long", 2, ttl=60)
+
+    clock.now += 5
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+
+    clock.now += 5
+    assert cache.get("long") is None
+
+
+@pytest.mark.parametrize(("maxsize", "ttl"), [(0, 10), (2, 0)])
+def test_disabled_cache_stores_nothing(maxsize: int, ttl: float) -> None:
+    cache = TTLCache[str, int](maxsize=maxsize, ttl=ttl)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_evicts_least_recently_used() -> None:
+    cache = TTLCache[str, int](maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_set_existing_key_refreshes_position() -> None:
+    cache = TTLCache[str, int](maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 10)
+    cache.set("c", 3)
+
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_pop() -> None:
+    cache = TTLCache[str, int](maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.pop("a")
+    cache.pop("missing")
+
+    assert cache.get("a") is None
+
+
+def test_evict_by_predicate_bumps_generation() -> None:
+    cache = TTLCache[str, int](maxsize=4, ttl=10)
+    for key, value in [("a", 1), ("b", 2), ("c", 3)]:
+        cache.set(key, value)
+
+    assert cache.evict(lambda value: value % 2 == 1) == 2
+    assert cache.generation == 1
+    assert cache.get("b") == 2
+    assert len(cache) == 1
+
+    assert cache.evict(lambda _: False) == 0
+    assert cache.generation == 2
+
+
+def test_clear_bumps_generation() -> None:
+    cache = TTLCache[str, int](maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.generation == 1
@@ -0,0 +1,92 @@
+import type { Ref } from "vue";
+
+const API_URL = "http://localhost:8000";
+
+export type ChangeSource = "orders" | "tripsheets";
+
+export interface Change<T> {
+  source: ChangeSource;
+  op: "insert" | "update" | "delete" | "reset";
+  // Нет у reset; data нет у delete.
+  id?: number;
+  data?: T;
+}
+
+interface WatchOptions<T> {
+  // Загрузка списка целиком: при подключении и по событию reset.
+  load: () => Promise<void>;
+  // Попадает ли строка в список (фильтры страницы); по умолчанию — да.
+  matches?: (item: T) => boolean;
+}
+
+/**
+ * Держит список в актуальном состоянии по ленте изменений GET /events/
+ * (Server-Sent Events) вместо периодических запросов списка.
+ *
+ * Список загружается после первого события ready: изменения, сделанные
+ * после подписки, придут в ленте, поэтому между загрузкой и подпиской
+ * ничего не теряется. Изменения, пришедшие во время загрузки, применяются
+ * после неё. При обрыве EventSource переподключается сам и передаёт
+ * Last-Event-ID — сервер досылает пропущенное.
+ *
+ * Возвращает функцию, закрывающую соединение (вызывать в onUnmounted).
+ */
+export function watchList<T extends { id: number }>(
+  source: ChangeSource,
+  items: Ref<T[]>,
+  { load, matches = () => true }: WatchOptions<T>
+): () => void {
+  const events = new EventSource(`${API_URL}/events/`, {
+    withCredentials: true,
+  });
+  let connected = false;
+  let pending: Change<T>[] | null = null;
+
+  const reload = async () => {
+    if (pending) return;
+    pending = [];
+    try {
+      await load();
+    } finally {
+      const changes = pending.filter((change) => change.op !== "reset");
+      pending = null;
+      changes.forEach(apply);
+    }
+  };
+
+  const apply = (change: Change<T>) => {
+    if (pending) {
+      pending.push(change);
+      return;
+    }
+    if (change.op === "reset") {
+      reload();
+      return;
+    }
+    const rest = items.value.filter((item) => item.id !== change.id);
+    if (change.data && matches(change.data)) {
+      const index = items.value.findIndex((item) => item.id === change.id);
+      if (index >= 0) {
+        rest.splice(index, 0, change.data);
+      } else {
+        rest.push(change.data);
+      }
+    }
+    items.value = rest;
+  };
+
+  events.addEventListener("ready", () => {
+    if (!connected) {
+      connected = true;
+      reload();
+    }
+  });
+  events.addEventListener("changes", (event) => {
+    const { changes } = JSON.parse((event as MessageEvent).data);
+    for (const change of changes as Change<T>[]) {
+      if (change.source === source) apply(change);
+    }
+  });
+
+  return () => events.close();
+}
@@ -9,14 +9,23 @@ export async function getAllOrders(filters = {}) {
   return await response.json();
 }
 
-export async function getOrderById(orderId: number) {
-  const res = await fetch(`${API_URL}/orders/${orderId}`, {
+// Заказы по списку id одним запросом GET /orders/?ids= (не больше 1000 id).
+export async function getOrdersByIds(orderIds: number[]) {
+  if (!orderIds.length) return [];
+  const params = new URLSearchParams({ ids: orderIds.join(",") }).toString();
+  const res = await fetch(`${API_URL}/orders/?${params}`, {
     credentials: "include",
   });
-  if (!res.ok) throw new Error("Ошибка загрузки заказа");
+  if (!res.ok) throw new Error("Ошибка загрузки заказов");
   return res.json();
 }
 
+export async function getOrderById(orderId: number) {
+  const [order] = await getOrdersByIds([orderId]);
+  if (!order) throw new Error("Заказ не найден");
+  return order;
+}
+
 export async function createOrder(order: {
   client_name: string;
   cost: number;
@@ -6,17 +6,18 @@ interface Tripsheet {
   order_id: number;
   start_time: string;
   end_time: string;
-  vehicle: {
+  // Есть в ответе только при запросе с expand=vehicle,order.
+  vehicle?: {
     license_plate: string;
     driver_name: string;
   };
-  order: {
+  order?: {
     client_name: string;
   };
 }
 
 export async function getAllTripsheets(): Promise<Tripsheet[]> {
-  const res = await fetch(`${API_URL}/tripsheets/`, {
+  const res = await fetch(`${API_URL}/tripsheets/?expand=vehicle,order`, {
     credentials: "include",
   });
 
@@ -10,14 +10,23 @@ export async function getAllVehicles(params: Record<string, string>) {
   return res.json();
 }
 
-export async function getVehicleById(vehicleId: number) {
-  const res = await fetch(`${API_URL}/vehicles/${vehicleId}`, {
+// Машины по списку id одним запросом GET /vehicles/?ids= (не больше 1000 id).
+export async function getVehiclesByIds(vehicleIds: number[]) {
+  if (!vehicleIds.length) return [];
+  const params = new URLSearchParams({ ids: vehicleIds.join(",") }).toString();
+  const res = await fetch(`${API_URL}/vehicles/?${params}`, {
     credentials: "include",
   });
-  if (!res.ok) throw new Error("Ошибка загрузки машины");
+  if (!res.ok) throw new Error("Ошибка загрузки машин");
   return res.json();
 }
 
+export async function getVehicleById(vehicleId: number) {
+  const [vehicle] = await getVehiclesByIds([vehicleId]);
+  if (!vehicle) throw new Error("Машина не найдена");
+  return vehicle;
+}
+
 export async function createVehicle(vehicle: {
   driver_name: string;
   vehicle_type: string;